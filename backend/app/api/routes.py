@@ -1,20 +1,23 @@
 """API routes for the video testing platform."""
 
+import asyncio
 import time
 import uuid
 from datetime import datetime
-from typing import Dict
+from typing import Any, Awaitable, Dict
 import shutil
 import os
 import json
 from pathlib import Path
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse, FileResponse
 
 from app.api.schemas import (
     StartTestRequest,
+    StartSweepRequest,
+    RerunTestRequest,
     StartTestResponse,
     TestResultsResponse,
     HealthResponse,
@@ -25,11 +28,32 @@ from app.api.schemas import (
     ChatAvailablePersonasResponse,
     PersonaAvailableForChat,
 )
-from app.graph.graph import video_test_graph
+from app.graph.checkpointing import pipeline_checkpointer
+from app.graph.graph import count_pipeline_nodes, new_test_deadline, route_content_analysis
+from app.graph.rerun import NODE_OUTPUTS, plan_rerun
+from app.graph.orchestration import (
+    SWEEP_RANK_METRICS,
+    analyze_content,
+    child_run_keys,
+    combine_platform_results,
+    generate_shared_network,
+    platform_state,
+    rank_variants,
+    replicate_seeds,
+    replicate_state,
+    run_concurrently,
+    summarize_replicates,
+    variant_state,
+)
 from app.graph.state import VideoTestState
 from app.services.chat_service import chat_service
 from app.services.storage_service import storage_service
+from app.services.gemini_client import gemini_client
+from app.services.call_profiler import call_profiler, current_test_id
+from app.services.job_queue import Job, job_queue
+from app.services.test_events import test_event_broker
 from app.models.chat import ChatMessage
+from app.config import settings
 
 
 router = APIRouter()
@@ -42,6 +66,9 @@ VIDEOS_DIR.mkdir(exist_ok=True)
 TEST_RESULTS_DIR = Path("test_results")
 TEST_RESULTS_DIR.mkdir(exist_ok=True)
 
+# Per-test call profiles live in a subdirectory so they are not loaded as results
+TEST_PROFILES_DIR = TEST_RESULTS_DIR / "profiles"
+
 @router.post("/upload")
 async def upload_video(file: UploadFile = File(...)):
     """Upload a video file to R2 storage."""
@@ -116,6 +143,21 @@ def save_test_result_to_file(test_id: str, state: dict):
         print(f"Error saving test result {test_id}: {e}")
 
 
+def save_test_profile_to_file(test_id: str, profile: dict):
+    """Save a test's call profile to a JSON file.
+
+    Args:
+        test_id: The test identifier
+        profile: Profile produced by the call profiler
+    """
+    try:
+        TEST_PROFILES_DIR.mkdir(exist_ok=True)
+        with open(TEST_PROFILES_DIR / f"{test_id}.json", "w") as f:
+            json.dump(profile, f, indent=2)
+    except Exception as e:
+        print(f"Error saving test profile {test_id}: {e}")
+
+
 def load_test_results_from_files():
     """Load test results from JSON files in test_results directory."""
     global test_results_store
@@ -145,6 +187,403 @@ def load_test_results_from_files():
 # Load existing test results on module import
 load_test_results_from_files()
 
+# State fields streamed as events the first time a node produces them
+STREAMED_STATE_FIELDS = {
+    "video_analysis": "content_analysis",
+    "text_analysis": "content_analysis",
+    "persona_network": "network",
+    "final_metrics": "metrics",
+    "platform_predictions": "predictions",
+}
+
+
+def new_test_state(request, **inputs) -> VideoTestState:
+    """Build a test's initial state from a start or sweep request.
+
+    Args:
+        request: StartTestRequest or StartSweepRequest
+        **inputs: State fields to set on top of the request's
+
+    Returns:
+        Initial pipeline state
+    """
+    state: VideoTestState = {
+        "video_id": request.video_id,
+        "video_url": request.video_url,
+        "platform": request.platform,
+        "content_type": request.content_type,
+        "text_content": request.text_content,
+        "simulation_params": request.simulation_params or {},
+        "user_context": request.user_context,
+        "platform_metrics": request.platform_metrics,
+        "deadline": new_test_deadline(request.simulation_params),
+        "video_analysis": None,
+        "text_analysis": None,
+        "personas": None,
+        "initial_reactions": None,
+        "persona_network": None,
+        "interaction_results": None,
+        "interaction_events": None,
+        "second_reactions": None,
+        "final_metrics": None,
+        "node_graph_data": None,
+        "engagement_timeline": None,
+        "reaction_insights": None,
+        "platform_predictions": None,
+        "platforms": None,
+        "platform_results": None,
+        "variants": None,
+        "variant_rank_by": None,
+        "variant_results": None,
+        "variant_ranking": None,
+        "replicate_results": None,
+        "replicate_stats": None,
+        "rerun_of": None,
+        "reused_nodes": None,
+        "errors": [],
+        "status": "initializing",
+    }
+    state.update(inputs)
+    return state
+
+
+def validate_deadline(simulation_params: dict):
+    """Reject a simulation_params.deadline_seconds that is not a non-negative number.
+
+    Args:
+        simulation_params: Test simulation parameters
+
+    Raises:
+        HTTPException: 400 if the deadline is invalid
+    """
+    seconds = (simulation_params or {}).get("deadline_seconds")
+    if seconds is not None and (not isinstance(seconds, (int, float)) or seconds < 0):
+        raise HTTPException(
+            status_code=400, detail="deadline_seconds must be a non-negative number (0 = none)"
+        )
+
+
+async def stream_graph(
+    job: Job, run_id: str, graph_input, config: dict, tags: dict = None
+) -> VideoTestState:
+    """Run the graph for a test (or one run of a multi-platform test or sweep).
+
+    Node start/finish events from the graph stream update the job's
+    progress and are published to the job's event stream, and every
+    intermediate state is published to the results store under ``run_id``
+    so status requests see partial progress.
+
+    Args:
+        job: Job being executed
+        run_id: Test ID the run's state is stored under
+        graph_input: Initial state, or None to continue from ``config``'s checkpoint
+        config: Run config (checkpoint thread)
+        tags: Tags added to the events of a multi-platform or sweep run
+
+    Returns:
+        The run's final state
+    """
+    tag = tags or {}
+    final_state = graph_input or test_results_store[run_id]["state"]
+    # Fields given in the input (a shared analysis) were published already
+    streamed_fields = {field for field in STREAMED_STATE_FIELDS if (graph_input or {}).get(field)}
+
+    async for mode, chunk in pipeline_checkpointer.graph.astream(
+        graph_input, config, stream_mode=["tasks", "values"]
+    ):
+        if mode == "tasks":
+            if "input" in chunk:
+                job.node_started(chunk["name"])
+                test_event_broker.publish(
+                    job.test_id, "node_started", {"node": chunk["name"], **tag}
+                )
+            else:
+                job.node_finished(chunk["name"])
+                test_event_broker.publish(
+                    job.test_id,
+                    "node_finished",
+                    {
+                        "node": chunk["name"],
+                        "error": str(chunk["error"]) if chunk.get("error") else None,
+                        "progress": round(job.progress, 3),
+                        **tag,
+                    },
+                )
+            continue
+
+        final_state = chunk
+        test_results_store[run_id]["state"] = chunk
+        for field, event in STREAMED_STATE_FIELDS.items():
+            if chunk.get(field) is not None and field not in streamed_fields:
+                streamed_fields.add(field)
+                test_event_broker.publish(job.test_id, event, {field: chunk[field], **tag})
+
+    return final_state
+
+
+def finish_run(run_id: str, final_state: VideoTestState, profile: dict = None):
+    """Store a finished run's final state and duration and save it to disk."""
+    entry = test_results_store[run_id]
+    entry["state"] = final_state
+    entry["end_time"] = time.time()
+    entry["duration"] = entry["end_time"] - entry["start_time"]
+    if profile is not None:
+        profile["duration"] = entry["duration"]
+        entry["profile"] = profile
+
+    save_test_result_to_file(run_id, final_state)
+    if profile is not None:
+        save_test_profile_to_file(run_id, profile)
+
+
+async def run_shared_stage(job: Job, node: str, stage: Awaitable[dict]) -> dict:
+    """Run a stage shared by every run of a test as one of the job's nodes.
+
+    Args:
+        job: Job being executed
+        node: Node name reported in progress and events
+        stage: Coroutine producing the stage's state update
+
+    Returns:
+        The stage's state update (also merged into the test's stored state)
+    """
+    test_id = job.test_id
+    job.node_started(node)
+    test_event_broker.publish(test_id, "node_started", {"node": node})
+    update = await stage
+    job.node_finished(node)
+    test_event_broker.publish(
+        test_id,
+        "node_finished",
+        {"node": node, "error": None, "progress": round(job.progress, 3)},
+    )
+
+    entry = test_results_store[test_id]
+    entry["state"] = {**entry["state"], **update}
+    for field, event in STREAMED_STATE_FIELDS.items():
+        if update.get(field) is not None:
+            test_event_broker.publish(test_id, event, {field: update[field]})
+    return update
+
+
+async def run_shared_analysis(job: Job) -> dict:
+    """Analyze a test's content once for all of its runs.
+
+    Args:
+        job: Job being executed
+
+    Returns:
+        The analysis node's state update
+    """
+    analysis_node = route_content_analysis(job.initial_state)
+    return await run_shared_stage(job, analysis_node, analyze_content(job.initial_state))
+
+
+async def run_child_tests(
+    job: Job, states: Dict[str, VideoTestState], tags: Dict[str, dict]
+) -> tuple[Dict[str, Any], Dict[str, str]]:
+    """Run the graph for each run of a test concurrently, each as its own test.
+
+    Every run is stored as ``{test_id}_{key}`` with its own results entry,
+    checkpoint thread and results file, so its results, chat and resume
+    work like any test's. Its events go to the parent test's stream.
+
+    Args:
+        job: Job being executed
+        states: Run key to the run's initial state
+        tags: Run key to the tags its events carry
+
+    Returns:
+        Tuple of (run key to final state or exception, run key to test ID)
+    """
+    run_ids = {key: f"{job.test_id}_{key}" for key in states}
+    for key, run_id in run_ids.items():
+        test_results_store[run_id] = {
+            "test_id": run_id,
+            "parent_test_id": job.test_id,
+            "tenant_id": job.tenant_id,
+            "start_time": time.time(),
+            "state": states[key],
+        }
+
+    async def run_child(key: str) -> VideoTestState:
+        run_id = run_ids[key]
+        final_state = await stream_graph(
+            job,
+            run_id,
+            states[key],
+            pipeline_checkpointer.thread_config(run_id),
+            tags=tags[key],
+        )
+        finish_run(run_id, final_state)
+        return final_state
+
+    return await run_concurrently(tags, run_child), run_ids
+
+
+async def run_multi_platform(job: Job) -> VideoTestState:
+    """Analyze a multi-platform test's content once, then simulate every platform.
+
+    Args:
+        job: Job taken off the queue
+
+    Returns:
+        Combined final state with per-platform results
+    """
+    state = job.initial_state
+    analysis_update = await run_shared_analysis(job)
+    if not (analysis_update.get("video_analysis") or analysis_update.get("text_analysis")):
+        # Nothing to simulate without the analysis
+        return {**state, **analysis_update}
+
+    results, run_ids = await run_child_tests(
+        job,
+        {p: platform_state(state, analysis_update, p) for p in state["platforms"]},
+        {p: {"platform": p} for p in state["platforms"]},
+    )
+    return combine_platform_results(state, analysis_update, results, run_ids)
+
+
+async def run_sweep(job: Job) -> VideoTestState:
+    """Run every variant of a sweep over one shared persona network.
+
+    Args:
+        job: Job taken off the queue
+
+    Returns:
+        Combined final state with per-variant results and the ranking
+    """
+    test_id = job.test_id
+    state = job.initial_state
+    network_update = await run_shared_stage(
+        job, "network_generation", generate_shared_network(state)
+    )
+
+    variants = {variant["variant_id"]: variant for variant in state["variants"]}
+    results, run_ids = await run_child_tests(
+        job,
+        {v: variant_state(state, variant, network_update) for v, variant in variants.items()},
+        {v: {"variant": v} for v in variants},
+    )
+    final_state = rank_variants(state, network_update, results, run_ids)
+    test_event_broker.publish(test_id, "ranking", {"variant_ranking": final_state["variant_ranking"]})
+    return final_state
+
+
+async def run_replicates(job: Job) -> VideoTestState:
+    """Run a test's Monte Carlo replicates concurrently.
+
+    Content analysis runs once and, unless ``replicate_share_network`` is
+    false, so does the network; each replicate then runs the rest of the
+    pipeline with its own seed.
+
+    Args:
+        job: Job taken off the queue
+
+    Returns:
+        Final state with per-replicate results and metric statistics
+    """
+    state = job.initial_state
+    simulation_params = state["simulation_params"]
+    analysis_update = await run_shared_analysis(job)
+    if not (analysis_update.get("video_analysis") or analysis_update.get("text_analysis")):
+        return {**state, **analysis_update}
+
+    network_update = None
+    if simulation_params.get("replicate_share_network", True):
+        network_update = await run_shared_stage(
+            job, "network_generation", generate_shared_network(state)
+        )
+
+    seeds = {f"r{i}": seed for i, seed in enumerate(replicate_seeds(simulation_params))}
+    results, run_ids = await run_child_tests(
+        job,
+        {
+            key: replicate_state(state, analysis_update, network_update, seed)
+            for key, seed in seeds.items()
+        },
+        {key: {"replicate": key} for key in seeds},
+    )
+    return summarize_replicates(state, analysis_update, network_update, results, run_ids, seeds)
+
+
+async def run_test_job(job: Job):
+    """Execute a queued test: run the graph and store its results.
+
+    Resumed jobs continue from their checkpoint instead of the initial
+    state. Multi-platform tests run through run_multi_platform(), variant
+    sweeps through run_sweep() and replicated tests through run_replicates().
+
+    Args:
+        job: Job taken off the queue
+    """
+    test_id = job.test_id
+    test_results_store[test_id]["start_time"] = time.time()
+
+    print(f"\n{'='*60}")
+    print(f"{'Resuming' if job.resume_config else 'Running'} test: {test_id} (tenant: {job.tenant_id})")
+    print(f"{'='*60}\n")
+
+    test_event_broker.publish(
+        test_id,
+        "test_started",
+        {"tenant_id": job.tenant_id, "resumed_after": job.completed_nodes},
+    )
+
+    # Attribute every Gemini call made by the graph to this test
+    token = current_test_id.set(test_id)
+    try:
+        if job.initial_state.get("platforms") and job.resume_config is None:
+            final_state = await run_multi_platform(job)
+        elif job.initial_state.get("variants") and job.resume_config is None:
+            final_state = await run_sweep(job)
+        elif (
+            replicate_seeds(job.initial_state["simulation_params"])
+            and job.resume_config is None
+        ):
+            final_state = await run_replicates(job)
+        elif job.resume_config is not None:
+            # A resume continues from its checkpoint with no new input
+            final_state = await stream_graph(job, test_id, None, job.resume_config)
+        else:
+            # Checkpoint every node under the test's thread
+            final_state = await stream_graph(
+                job, test_id, job.initial_state, pipeline_checkpointer.thread_config(test_id)
+            )
+    except asyncio.CancelledError:
+        test_results_store[test_id]["state"] = {
+            **test_results_store[test_id]["state"],
+            "status": "cancelled",
+        }
+        test_event_broker.publish(test_id, "test_cancelled", {})
+        print(f"Test cancelled: {test_id}")
+        raise
+    except Exception as e:
+        test_event_broker.publish(test_id, "test_failed", {"error": str(e)})
+        raise
+    finally:
+        current_test_id.reset(token)
+        profile = call_profiler.pop_profile(test_id)
+
+    # Store final results and save to disk
+    finish_run(test_id, final_state, profile)
+
+    print(f"\n{'='*60}")
+    print(f"Test complete: {test_id}")
+    print(f"Status: {final_state.get('status')}")
+    print(f"Duration: {test_results_store[test_id]['duration']:.2f}s")
+    print(f"{'='*60}\n")
+
+    test_event_broker.publish(
+        test_id,
+        "test_completed",
+        {
+            "status": final_state.get("status"),
+            "duration": test_results_store[test_id]["duration"],
+            "errors": final_state.get("errors", []),
+        },
+    )
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -152,11 +591,32 @@ async def health_check():
     return HealthResponse(status="healthy", version="1.0.0")
 
 
+@router.get("/gemini/stats")
+async def get_gemini_stats():
+    """Get Gemini client metrics.
+
+    Returns:
+        Response cache hit/miss counters per node, thread pool queue waits,
+        per-model rate limiter state, hedging and request coalescing counters
+    """
+    return {
+        "cache": gemini_client.get_cache_stats(),
+        "executors": gemini_client.get_executor_stats(),
+        "rate_limits": gemini_client.rate_limiter.get_stats(),
+        "video_uploads": gemini_client.video_registry.get_stats(),
+        "hedging": gemini_client.hedge_stats,
+        "single_flight": gemini_client.single_flight_stats,
+    }
+
+
 @router.post("/test/start", response_model=StartTestResponse)
 async def start_test(request: StartTestRequest):
-    """Start a new video test simulation.
+    """Queue a new video test simulation.
 
-    This endpoint initiates the 6-node LangGraph pipeline:
+    The test runs in the background on the job queue; poll
+    /test/{test_id}/status for queue position and progress.
+
+    The pipeline runs these nodes:
     1. Video Analysis
     2. Initial Reactions (parallel)
     3. Network Generation
@@ -164,88 +624,419 @@ async def start_test(request: StartTestRequest):
     5. Second Reactions (parallel)
     6. Results Compilation
 
+    With ``platforms``, the content is analyzed once and nodes 2-6 run for
+    every platform in parallel; the results hold each platform's
+    final_metrics and platform_predictions under ``platform_results``.
+
+    With ``simulation_params.replicates`` > 1, the simulation is repeated
+    that many times with seeds ``seed + i``, concurrently, reusing the
+    content analysis and (unless ``replicate_share_network`` is false) the
+    network. The replicates share the text pool's slots fairly rather than
+    splitting it up front, so many replicates never oversubscribe the pool
+    and a few never leave it idle. ``replicate_stats`` gives each metric's
+    mean, stdev and percentile bands.
+
+    The test must finish within ``simulation_params.deadline_seconds``
+    (default settings.TEST_DEADLINE_SECONDS) of being queued. Each node gets
+    a share of the time left and its Gemini calls time out with it; reactions
+    that miss it fall back to defaults rather than holding up the test.
+
     Args:
         request: Test configuration
 
     Returns:
         Test ID and status
+
+    Raises:
+        HTTPException: 400 if no platform is given or the replicates or
+            deadline are invalid, 429 if the job queue is full
     """
+    # Keep the order, drop duplicates
+    platforms = list(dict.fromkeys(request.platforms or []))
+    if not platforms and not request.platform:
+        raise HTTPException(status_code=400, detail="Either platform or platforms is required")
+
+    simulation_params = request.simulation_params or {}
+    validate_deadline(simulation_params)
+    try:
+        replicates = len(replicate_seeds(simulation_params))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="replicates and seed must be integers")
+    if replicates > settings.MAX_REPLICATES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.MAX_REPLICATES} replicates are allowed"
+        )
+    if replicates and platforms:
+        raise HTTPException(
+            status_code=400, detail="Replicates are not supported for multi-platform tests"
+        )
+
     try:
         # Generate unique test ID
         test_id = str(uuid.uuid4())
 
         # Create initial state
-        initial_state: VideoTestState = {
-            "video_id": request.video_id,
-            "video_url": request.video_url,
-            "platform": request.platform,
-            "content_type": request.content_type,
-            "text_content": request.text_content,
-            "simulation_params": request.simulation_params or {},
-            "user_context": request.user_context,
-            "platform_metrics": request.platform_metrics,
-            "video_analysis": None,
-            "text_analysis": None,
-            "personas": None,
-            "initial_reactions": None,
-            "persona_network": None,
-            "interaction_results": None,
-            "interaction_events": None,
-            "second_reactions": None,
-            "final_metrics": None,
-            "node_graph_data": None,
-            "engagement_timeline": None,
-            "reaction_insights": None,
-            "platform_predictions": None,
-            "errors": [],
-            "status": "initializing",
-        }
+        initial_state = new_test_state(
+            request,
+            platform="multi" if platforms else request.platform,
+            platforms=platforms or None,
+        )
 
         # Store initial state
         test_results_store[test_id] = {
             "test_id": test_id,
+            "tenant_id": request.tenant_id or "default",
             "start_time": time.time(),
             "state": initial_state,
         }
 
         print(f"\n{'='*60}")
-        print(f"Starting new test: {test_id}")
+        print(f"Queueing new test: {test_id}")
         print(f"Video: {request.video_id}")
-        print(f"Platform: {request.platform}")
+        print(f"Platform: {', '.join(platforms) if platforms else request.platform}")
         print(f"User Context: {request.user_context}")
         print(f"Platform Metrics: {request.platform_metrics}")
         print(f"{'='*60}\n")
 
-        # Run the graph asynchronously
-        # Note: In production, this should be run in a background task
-        # For now, we'll run it directly (may cause timeout for large simulations)
-        final_state = await video_test_graph.ainvoke(initial_state)
-
-        # Store final results
-        test_results_store[test_id]["state"] = final_state
-        test_results_store[test_id]["end_time"] = time.time()
-        test_results_store[test_id]["duration"] = (
-            test_results_store[test_id]["end_time"]
-            - test_results_store[test_id]["start_time"]
+        # Run the graph in the background so the request returns immediately
+        job = Job(
+            test_id=test_id,
+            tenant_id=request.tenant_id or "default",
+            initial_state=initial_state,
+            expected_nodes=count_pipeline_nodes(
+                simulation_params, run_count=len(platforms) or replicates or 1
+            )
+            # The network generated once for all replicates
+            + int(bool(replicates) and simulation_params.get("replicate_share_network", True)),
+        )
+        try:
+            position = await job_queue.submit(job)
+        except OverflowError as e:
+            del test_results_store[test_id]
+            raise HTTPException(status_code=429, detail=str(e))
+
+        test_event_broker.open(test_id)
+        test_event_broker.publish(test_id, "queued", {"position": position})
+
+        return StartTestResponse(
+            test_id=test_id,
+            status="queued",
+            message=f"Test queued at position {position}",
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start test: {str(e)}")
+
+
+@router.post("/test/sweep", response_model=StartTestResponse)
+async def start_sweep(request: StartSweepRequest):
+    """Queue a sweep comparing variants of a post (captions, hooks, thumbnails).
+
+    Every variant gets its own content analysis and simulation, but all of
+    them share the persona network (generated once) and the cached persona
+    prompt context, and their Gemini calls share the text pool's slots
+    fairly: slots a finished variant no longer needs go to the variants
+    still running. Each variant is stored as its own test,
+    ``{test_id}_{variant_id}``; the sweep's results rank them in
+    ``variant_ranking``.
+
+    Args:
+        request: Base content, variants and ranking metric
+
+    Returns:
+        Sweep test ID and status
+
+    Raises:
+        HTTPException: 400 for invalid variants, ranking metric or deadline,
+            429 if the job queue is full
+    """
+    if not request.variants:
+        raise HTTPException(status_code=400, detail="A sweep needs at least one variant")
+    if len(request.variants) > settings.SWEEP_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A sweep can have at most {settings.SWEEP_MAX_VARIANTS} variants",
+        )
+    if request.rank_by not in SWEEP_RANK_METRICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"rank_by must be one of: {', '.join(SWEEP_RANK_METRICS)}",
+        )
+
+    if int((request.simulation_params or {}).get("replicates") or 1) > 1:
+        raise HTTPException(status_code=400, detail="Replicates are not supported in sweeps")
+    validate_deadline(request.simulation_params)
+
+    content_field = "text_content" if request.content_type == "text" else "video_url"
+    variants = [{"variant_id": "base", "label": "base"}] if request.include_base else []
+    for i, variant in enumerate(request.variants, start=1):
+        variants.append({**variant.model_dump(), "variant_id": variant.variant_id or f"variant_{i}"})
+
+    variant_ids = [variant["variant_id"] for variant in variants]
+    if len(set(variant_ids)) != len(variant_ids):
+        raise HTTPException(status_code=400, detail="Variant IDs must be unique ('base' is reserved)")
+    for variant in variants:
+        if not (variant.get(content_field) or getattr(request, content_field)):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Variant {variant['variant_id']} has no {content_field} and the base has none",
+            )
+
+    try:
+        test_id = str(uuid.uuid4())
+        simulation_params = request.simulation_params or {}
+        initial_state = new_test_state(
+            request, variants=variants, variant_rank_by=request.rank_by
         )
 
-        # Save to disk
-        save_test_result_to_file(test_id, final_state)
+        test_results_store[test_id] = {
+            "test_id": test_id,
+            "tenant_id": request.tenant_id or "default",
+            "start_time": time.time(),
+            "state": initial_state,
+        }
 
         print(f"\n{'='*60}")
-        print(f"Test complete: {test_id}")
-        print(f"Status: {final_state.get('status')}")
-        print(f"Duration: {test_results_store[test_id]['duration']:.2f}s")
+        print(f"Queueing sweep: {test_id}")
+        print(f"Video: {request.video_id}")
+        print(f"Platform: {request.platform}")
+        print(f"Variants: {', '.join(variant_ids)}")
         print(f"{'='*60}\n")
 
+        # One shared network, then a full run per variant
+        job = Job(
+            test_id=test_id,
+            tenant_id=request.tenant_id or "default",
+            initial_state=initial_state,
+            expected_nodes=1 + len(variants) * count_pipeline_nodes(simulation_params),
+        )
+        try:
+            position = await job_queue.submit(job)
+        except OverflowError as e:
+            del test_results_store[test_id]
+            raise HTTPException(status_code=429, detail=str(e))
+
+        test_event_broker.open(test_id)
+        test_event_broker.publish(test_id, "queued", {"position": position})
+
         return StartTestResponse(
             test_id=test_id,
-            status=final_state.get("status", "unknown"),
-            message=f"Test completed with status: {final_state.get('status')}",
+            status="queued",
+            message=f"Sweep of {len(variants)} variants queued at position {position}",
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start test: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start sweep: {str(e)}")
+
+
+@router.post("/test/{test_id}/rerun", response_model=StartTestResponse)
+async def rerun_test(test_id: str, request: RerunTestRequest):
+    """Queue a new test that changes some of a previous test's inputs.
+
+    Nodes whose inputs (and upstream nodes) are unchanged are not rerun:
+    their outputs are copied from the previous test and only the
+    invalidated suffix of the graph executes. Changing only
+    ``platform_metrics`` or ``user_context`` reruns just platform
+    prediction.
+
+    Args:
+        test_id: The previous test identifier
+        request: Inputs to change
+
+    Returns:
+        New test ID and status
+
+    Raises:
+        HTTPException: 404 if the test is unknown, 409 if it is still
+            running, is made of several runs or no input changed, 400 for
+            replicates or an invalid deadline, 429 if the job queue is full
+    """
+    if test_id not in test_results_store:
+        raise HTTPException(status_code=404, detail=f"Test {test_id} not found")
+
+    job = job_queue.get(test_id)
+    if job is not None and job.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Test {test_id} is still {job.status}")
+
+    previous = test_results_store[test_id]["state"]
+    if child_run_keys(previous):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Test {test_id} is made of several runs; rerun them individually",
+        )
+
+    overrides = request.model_dump(exclude_unset=True, exclude={"tenant_id"})
+    base = StartTestRequest(
+        **{
+            **{
+                field: previous.get(field)
+                for field in (
+                    "video_id",
+                    "video_url",
+                    "platform",
+                    "content_type",
+                    "text_content",
+                    "simulation_params",
+                    "user_context",
+                    "platform_metrics",
+                )
+            },
+            **overrides,
+        }
+    )
+    validate_deadline(base.simulation_params)
+    inputs = new_test_state(base)
+    if child_run_keys(inputs):
+        raise HTTPException(status_code=400, detail="Reruns cannot request replicates")
+
+    plan = plan_rerun(previous, inputs)
+    if plan is None:
+        raise HTTPException(
+            status_code=409, detail=f"No inputs changed; the results of {test_id} still apply"
+        )
+
+    new_test_id = str(uuid.uuid4())
+    reused_nodes = plan["reused_nodes"]
+    state = plan["state"]
+    resume_config = None
+    if reused_nodes and pipeline_checkpointer.saver is not None:
+        # Record the reused state as if the last reused node had just run,
+        # so the graph continues with the invalidated nodes
+        resume_config = await pipeline_checkpointer.graph.aupdate_state(
+            pipeline_checkpointer.thread_config(new_test_id),
+            {**state, "rerun_of": test_id, "reused_nodes": reused_nodes},
+            as_node=plan["as_node"],
+        )
+    elif len(reused_nodes) > 1:
+        # Without checkpoints the graph can only skip content analysis
+        for node in reused_nodes[1:]:
+            for field in NODE_OUTPUTS[node]:
+                state[field] = None
+        reused_nodes = reused_nodes[:1]
+    state = {**state, "rerun_of": test_id, "reused_nodes": reused_nodes}
+
+    tenant_id = request.tenant_id or test_results_store[test_id].get("tenant_id", "default")
+    test_results_store[new_test_id] = {
+        "test_id": new_test_id,
+        "tenant_id": tenant_id,
+        "start_time": time.time(),
+        "state": state,
+    }
+
+    job = Job(
+        test_id=new_test_id,
+        tenant_id=tenant_id,
+        initial_state=state,
+        expected_nodes=count_pipeline_nodes(state["simulation_params"]),
+        resume_config=resume_config,
+        completed_nodes=reused_nodes,
+    )
+    try:
+        position = await job_queue.submit(job)
+    except OverflowError as e:
+        del test_results_store[new_test_id]
+        raise HTTPException(status_code=429, detail=str(e))
+
+    test_event_broker.open(new_test_id)
+    test_event_broker.publish(new_test_id, "queued", {"position": position})
+
+    reused = ", ".join(reused_nodes) or "nothing"
+    print(f"Rerun of {test_id} queued as {new_test_id}, reusing {reused}")
+
+    return StartTestResponse(
+        test_id=new_test_id,
+        status="queued",
+        message=f"Rerun queued at position {position}, reusing {reused} from {test_id}",
+    )
+
+
+@router.post("/test/{test_id}/resume", response_model=StartTestResponse)
+async def resume_test(test_id: str):
+    """Re-queue a failed, cancelled or interrupted test from its last good node.
+
+    Nodes that completed without errors are not rerun; their results come
+    from the test's checkpoints, so their Gemini calls are not paid for
+    again. The resumed run's events continue the test's event stream.
+
+    Args:
+        test_id: The test identifier
+
+    Returns:
+        Test ID and status
+
+    Raises:
+        HTTPException: 404 if the test has no checkpoints, 409 if it is still
+            queued or running or has nothing to resume, 429 if the job queue
+            is full
+    """
+    job = job_queue.get(test_id)
+    if job is not None and job.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Test {test_id} is already {job.status}")
+
+    entry = test_results_store.get(test_id)
+    runs = child_run_keys(entry["state"]) if entry is not None else []
+    if runs:
+        run_ids = ", ".join(f"{test_id}_{run}" for run in runs)
+        raise HTTPException(
+            status_code=409,
+            detail=f"Test {test_id} is made of several runs; resume them individually ({run_ids})",
+        )
+
+    resume_point = await pipeline_checkpointer.find_resume_point(test_id)
+    if resume_point is None:
+        if entry is not None:
+            stored = entry["state"]
+            if stored.get("errors") or str(stored.get("status", "")).endswith("_failed"):
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Test {test_id} failed but has no checkpoints to resume from; start it again",
+                )
+            raise HTTPException(
+                status_code=409, detail=f"Test {test_id} has no failed or unfinished nodes to resume"
+            )
+        raise HTTPException(status_code=404, detail=f"No checkpoints found for test {test_id}")
+
+    # The resumed run gets a fresh deadline
+    state = resume_point["state"]
+    deadline = new_test_deadline(state.get("simulation_params"))
+    resume_config = await pipeline_checkpointer.update_resume_point(
+        resume_point, {"deadline": deadline}
+    )
+    state = {**state, "deadline": deadline}
+
+    # Rebuild the entry if the process restarted since the test was started
+    entry = test_results_store.setdefault(
+        test_id, {"test_id": test_id, "tenant_id": "default", "start_time": time.time()}
+    )
+    entry["state"] = state
+
+    job = Job(
+        test_id=test_id,
+        tenant_id=entry.get("tenant_id", "default"),
+        initial_state=state,
+        expected_nodes=count_pipeline_nodes(state.get("simulation_params")),
+        resume_config=resume_config,
+        completed_nodes=resume_point["completed_nodes"],
+    )
+    try:
+        position = await job_queue.submit(job)
+    except OverflowError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    test_event_broker.reopen(test_id)
+    test_event_broker.publish(test_id, "queued", {"position": position})
+
+    print(f"Test {test_id} queued to resume at {', '.join(resume_point['next_nodes'])}")
+
+    return StartTestResponse(
+        test_id=test_id,
+        status="queued",
+        message=f"Test queued at position {position} to resume at {', '.join(resume_point['next_nodes'])}",
+    )
 
 
 @router.get("/test/{test_id}/results")
@@ -278,11 +1069,48 @@ async def get_test_results(test_id: str):
         "final_metrics": state.get("final_metrics", {}),
         "platform_predictions": state.get("platform_predictions", {}),
         "video_analysis": state.get("video_analysis", {}),
+        "platforms": state.get("platforms"),
+        "platform_results": state.get("platform_results"),
+        "variant_results": state.get("variant_results"),
+        "variant_ranking": state.get("variant_ranking"),
+        "replicate_results": state.get("replicate_results"),
+        "replicate_stats": state.get("replicate_stats"),
+        "rerun_of": state.get("rerun_of"),
+        "reused_nodes": state.get("reused_nodes"),
         "status": state.get("status"),
         "errors": state.get("errors", []),
     }
 
 
+@router.get("/test/{test_id}/profile")
+async def get_test_profile(test_id: str):
+    """Get per-node call, latency, token and cost accounting for a test.
+
+    Running tests return the metrics collected so far.
+
+    Args:
+        test_id: The test identifier
+
+    Returns:
+        Per-node and total calls, retries, latency percentiles, queue and
+        rate-limit waits, token counts and estimated cost
+    """
+    test_data = test_results_store.get(test_id, {})
+    if "profile" in test_data:
+        return test_data["profile"]
+
+    profile = call_profiler.get_profile(test_id)
+    if profile is not None:
+        return profile
+
+    profile_path = TEST_PROFILES_DIR / f"{test_id}.json"
+    if profile_path.exists():
+        with open(profile_path, "r") as f:
+            return json.load(f)
+
+    raise HTTPException(status_code=404, detail=f"No profile for test {test_id}")
+
+
 @router.get("/test/{test_id}/status")
 async def get_test_status(test_id: str):
     """Get the current status of a test.
@@ -291,19 +1119,116 @@ async def get_test_status(test_id: str):
         test_id: The test identifier
 
     Returns:
-        Current status information
+        Current status information, plus queue position, current node and
+        progress for tests run through the job queue
     """
     if test_id not in test_results_store:
         raise HTTPException(status_code=404, detail=f"Test {test_id} not found")
 
     state = test_results_store[test_id]["state"]
-
-    return {
+    status = {
         "test_id": test_id,
         "status": state.get("status"),
         "errors": state.get("errors", []),
     }
 
+    job = job_queue.get(test_id)
+    if job is not None:
+        status.update(
+            {
+                "job_status": job.status,
+                "queue_position": job_queue.queue_position(test_id),
+                "current_node": job.current_node,
+                "running_nodes": job.running_nodes,
+                "completed_nodes": job.completed_nodes,
+                "progress": round(job.progress, 3),
+                "job_error": job.error,
+            }
+        )
+
+    return status
+
+
+@router.get("/test/{test_id}/events")
+async def stream_test_events(test_id: str, request: Request):
+    """Stream a test's progress as server-sent events.
+
+    Events: queued, test_started, node_started, node_finished,
+    persona_reaction (with running engagement totals), content_analysis,
+    network, metrics, predictions, and a final test_completed, test_failed
+    or test_cancelled. Earlier events are replayed on connect; reconnecting
+    clients resume after their Last-Event-ID.
+
+    Args:
+        test_id: The test identifier
+        request: Incoming request (for the Last-Event-ID header)
+
+    Returns:
+        Streaming response of SSE events
+    """
+    if test_id not in test_results_store:
+        raise HTTPException(status_code=404, detail=f"Test {test_id} not found")
+
+    try:
+        after_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        after_id = 0
+
+    async def generate():
+        """Generate SSE messages."""
+        if not test_event_broker.has_stream(test_id):
+            # Finished before this process started (or long ago): report the outcome
+            state = test_results_store[test_id]["state"]
+            data = json.dumps({"status": state.get("status"), "errors": state.get("errors", [])})
+            yield f"event: test_completed\ndata: {data}\n\n"
+            return
+
+        async for message in test_event_broker.subscribe(test_id, after_id):
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            data = json.dumps(message["data"], default=str)
+            yield f"id: {message['id']}\nevent: {message['event']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/test/{test_id}/cancel")
+async def cancel_test(test_id: str):
+    """Abort a queued or running test.
+
+    Args:
+        test_id: The test identifier
+
+    Returns:
+        Test ID and status
+    """
+    if test_id not in test_results_store:
+        raise HTTPException(status_code=404, detail=f"Test {test_id} not found")
+
+    job = job_queue.get(test_id)
+    was_queued = job is not None and job.status == "queued"
+    if not await job_queue.cancel(test_id):
+        raise HTTPException(status_code=409, detail=f"Test {test_id} is not queued or running")
+
+    if was_queued:
+        # The job never started, so the runner will not report it
+        state = test_results_store[test_id]["state"]
+        test_results_store[test_id]["state"] = {**state, "status": "cancelled"}
+        test_event_broker.publish(test_id, "test_cancelled", {})
+
+    return {"test_id": test_id, "status": "cancelled"}
+
+
+@router.get("/jobs/stats")
+async def get_job_stats():
+    """Get job queue depth and running jobs per tenant."""
+    return job_queue.get_stats()
+
 
 @router.get("/test-results/latest")
 async def get_latest_test_results():
@@ -334,6 +1259,14 @@ async def get_latest_test_results():
         "final_metrics": state.get("final_metrics", {}),
         "platform_predictions": state.get("platform_predictions", {}),
         "video_analysis": state.get("video_analysis", {}),
+        "platforms": state.get("platforms"),
+        "platform_results": state.get("platform_results"),
+        "variant_results": state.get("variant_results"),
+        "variant_ranking": state.get("variant_ranking"),
+        "replicate_results": state.get("replicate_results"),
+        "replicate_stats": state.get("replicate_stats"),
+        "rerun_of": state.get("rerun_of"),
+        "reused_nodes": state.get("reused_nodes"),
         "status": state.get("status"),
         "errors": state.get("errors", []),
     }
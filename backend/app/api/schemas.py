@@ -9,8 +9,16 @@ class StartTestRequest(BaseModel):
 
     video_id: str = Field(..., description="Unique identifier for the video/post")
     video_url: Optional[str] = Field(default=None, description="URL or path to the video file (required for video content)")
-    platform: str = Field(
-        ..., description="Platform to test on (instagram, tiktok, linkedin, x)"
+    platform: Optional[str] = Field(
+        default=None,
+        description="Platform to test on (instagram, tiktok, linkedin, x); required unless platforms is given",
+    )
+    platforms: Optional[List[str]] = Field(
+        default=None,
+        description=(
+            "Platforms to test on in one run: the content is analyzed once and simulated on each. "
+            "platform_metrics may then be keyed by platform"
+        ),
     )
     content_type: Optional[str] = Field(
         default="video", description="Type of content: 'video' or 'text'"
@@ -27,6 +35,9 @@ class StartTestRequest(BaseModel):
     platform_metrics: Optional[dict] = Field(
         default=None, description="Platform-specific metrics for the user"
     )
+    tenant_id: Optional[str] = Field(
+        default=None, description="Tenant running the test (for per-tenant concurrency limits)"
+    )
 
     class Config:
         json_schema_extra = {
@@ -44,11 +55,113 @@ class StartTestRequest(BaseModel):
                     "content_type": "text",
                     "text_content": "Excited to announce our new product launch! Our team has been working tirelessly to bring this innovative solution to market.",
                     "simulation_params": {},
+                },
+                {
+                    "video_id": "test_post_002",
+                    "platforms": ["linkedin", "x"],
+                    "content_type": "text",
+                    "text_content": "Excited to announce our new product launch!",
+                    "simulation_params": {},
+                }
+            ]
+        }
+
+
+class SweepVariant(BaseModel):
+    """One variant of the base content in a sweep."""
+
+    variant_id: Optional[str] = Field(
+        default=None, description="Identifier for this variant (defaults to variant_<n>)"
+    )
+    label: Optional[str] = Field(default=None, description="Human-readable label, e.g. 'question hook'")
+    video_id: Optional[str] = Field(default=None, description="Video/post identifier (defaults to the base's)")
+    video_url: Optional[str] = Field(default=None, description="Video for this variant (defaults to the base video)")
+    text_content: Optional[str] = Field(
+        default=None, description="Text for this variant (defaults to the base text)"
+    )
+
+
+class StartSweepRequest(BaseModel):
+    """Request to test several variants of a post against each other."""
+
+    video_id: str = Field(..., description="Unique identifier for the base video/post")
+    video_url: Optional[str] = Field(default=None, description="URL or path to the base video (video content)")
+    platform: str = Field(
+        ..., description="Platform to test on (instagram, tiktok, linkedin, x)"
+    )
+    content_type: Optional[str] = Field(
+        default="video", description="Type of content: 'video' or 'text'"
+    )
+    text_content: Optional[str] = Field(
+        default=None, description="Base text post content (text content)"
+    )
+    variants: List[SweepVariant] = Field(
+        ..., description="Variants overriding the base content's video or text"
+    )
+    include_base: bool = Field(
+        default=True, description="Also run the base content, as variant 'base'"
+    )
+    rank_by: str = Field(
+        default="engagement_rate", description="Metric the comparison table is ranked by"
+    )
+    simulation_params: Optional[dict] = Field(
+        default_factory=dict, description="Optional simulation parameters"
+    )
+    user_context: Optional[dict] = Field(
+        default=None, description="User information and context"
+    )
+    platform_metrics: Optional[dict] = Field(
+        default=None, description="Platform-specific metrics for the user"
+    )
+    tenant_id: Optional[str] = Field(
+        default=None, description="Tenant running the sweep (for per-tenant concurrency limits)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "examples": [
+                {
+                    "video_id": "launch_post",
+                    "platform": "linkedin",
+                    "content_type": "text",
+                    "text_content": "Excited to announce our new product launch!",
+                    "variants": [
+                        {"label": "question hook", "text_content": "Ever wished launches were easier? Meet our new product."},
+                        {"label": "numbers hook", "text_content": "3 years, 12 engineers, 1 product. It's launch day."},
+                    ],
+                    "rank_by": "engagement_rate",
                 }
             ]
         }
 
 
+class RerunTestRequest(BaseModel):
+    """Inputs to change when rerunning a test; omitted fields keep the previous test's values."""
+
+    video_url: Optional[str] = Field(default=None, description="URL or path to the video file")
+    platform: Optional[str] = Field(default=None, description="Platform to test on")
+    text_content: Optional[str] = Field(default=None, description="Text post content")
+    simulation_params: Optional[dict] = Field(
+        default=None, description="Simulation parameters (replace the previous ones)"
+    )
+    user_context: Optional[dict] = Field(
+        default=None, description="User information and context"
+    )
+    platform_metrics: Optional[dict] = Field(
+        default=None, description="Platform-specific metrics for the user"
+    )
+    tenant_id: Optional[str] = Field(
+        default=None, description="Tenant running the test (for per-tenant concurrency limits)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "examples": [
+                {"platform_metrics": {"followers": "25K"}},
+            ]
+        }
+
+
 class StartTestResponse(BaseModel):
     """Response after starting a test."""
 
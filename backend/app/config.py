@@ -23,12 +23,92 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.0-flash-exp"  # Main model (for video analysis)
     GEMINI_FAST_MODEL: str = "gemini-2.0-flash-exp"  # Fast model (for persona reactions, etc.)
     GEMINI_MAX_CONCURRENT: int = 50  # Max concurrent API calls
-    GEMINI_TIMEOUT: int = 60  # Timeout in seconds
+    GEMINI_TIMEOUT: int = 60  # Seconds per API call attempt (capped by the test's remaining budget)
+    GEMINI_MIN_OUTPUT_RATE: int = 100  # Output tokens/s a call is given time for; larger max_output_tokens extend GEMINI_TIMEOUT
     GEMINI_MAX_RETRIES: int = 3
+    GEMINI_TEXT_WORKERS: Optional[int] = None  # Threads for text generation (defaults to GEMINI_MAX_CONCURRENT)
+    GEMINI_UPLOAD_WORKERS: int = 4  # Threads for video uploads/processing polls
+    GEMINI_SINGLE_FLIGHT: bool = True  # Collapse concurrent identical requests into one call
+    GEMINI_MAX_CONTINUATIONS: int = 3  # Follow-up requests for truncated JSON output
+
+    # Gemini Rate Limits (per model, requests and tokens per minute)
+    GEMINI_RATE_LIMITS: dict = {
+        "gemini-2.0-flash-lite": {"rpm": 4000, "tpm": 4_000_000},
+        "gemini-2.0-flash-exp": {"rpm": 2000, "tpm": 4_000_000},
+    }
+    GEMINI_DEFAULT_RPM: int = 1000  # For models missing from GEMINI_RATE_LIMITS
+    GEMINI_DEFAULT_TPM: int = 1_000_000
+
+    # Gemini Pricing (USD per 1M tokens) for per-test cost estimates
+    GEMINI_PRICING: dict = {
+        "gemini-2.0-flash-lite": {"input": 0.075, "output": 0.30},
+        "gemini-2.0-flash-exp": {"input": 0.10, "output": 0.40},
+    }
+
+    # Hedged requests for persona fan-out
+    GEMINI_HEDGE_REQUESTS: bool = True  # Default for simulation_params.hedge_requests
+    GEMINI_HEDGE_PERCENTILE: float = 95.0  # Hedge calls slower than this latency percentile
+    GEMINI_HEDGE_MIN_SAMPLES: int = 20  # Observed calls needed before hedging starts
+
+    # Gemini Response Cache (opt-in)
+    GEMINI_CACHE_ENABLED: bool = False
+    GEMINI_CACHE_DIR: str = ".cache/gemini"
+    GEMINI_CACHE_TTL: int = 7 * 24 * 3600  # Seconds
+    GEMINI_CACHE_MEMORY_ENTRIES: int = 2048
+    GEMINI_CACHE_MAX_DISK_ENTRIES: int = 100_000
+
+    # Gemini Video Uploads (deduplicated by content hash)
+    GEMINI_VIDEO_REGISTRY_PATH: str = ".cache/gemini/video_files.json"
+    GEMINI_FILE_TTL: int = 47 * 3600  # Uploaded files are deleted by Gemini after 48h
+    VIDEO_DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes read per chunk when streaming from R2
+    VIDEO_DOWNLOAD_MAX_MB: int = 2048  # Reject videos larger than this
+    VIDEO_DOWNLOAD_TIMEOUT: int = 300  # Seconds for a full download
+    GEMINI_VIDEO_PROCESSING_TIMEOUT: int = 600  # Seconds to wait for an upload to become ACTIVE
+
+    # Gemini Backend ("google" for the real API, "fake" for offline benchmarks)
+    GEMINI_BACKEND: str = "google"
+    FAKE_GEMINI_LATENCY_MEDIAN: float = 1.0  # Seconds
+    FAKE_GEMINI_LATENCY_SIGMA: float = 0.5  # Log-normal spread (0 = constant latency)
+    FAKE_GEMINI_ERROR_RATE: float = 0.0  # Fraction of calls that fail
+    FAKE_GEMINI_TRUNCATION_RATE: float = 0.0  # Fraction of responses cut off mid-output
+    FAKE_GEMINI_SEED: int = 0
+
+    # Gemini Cassettes (record every call of a run, or replay one offline)
+    GEMINI_CASSETTE_MODE: Optional[str] = None  # "record" or "replay"
+    GEMINI_CASSETTE_PATH: str = ".cache/gemini/cassette.jsonl.gz"
+    GEMINI_REPLAY_LATENCY: str = "original"  # "original" or "zero"
 
     # Simulation Settings
     DEFAULT_PERSONA_COUNT: int = 500
 
+    # Markdown analysis reports (simulation_params.export_markdown overrides)
+    ANALYSIS_EXPORT_ENABLED: bool = True  # Write a report per compiled test
+    ANALYSIS_EXPORT_DIR: str = "analysis_exports"
+
+    # Test Job Queue
+    JOB_WORKERS: int = 4  # Tests executed concurrently per instance
+    JOB_MAX_PER_TENANT: int = 2  # Tests executed concurrently per tenant
+    JOB_MAX_QUEUED: int = 100  # Queued tests before /test/start returns 429
+    TEST_EVENT_HISTORY: int = 20000  # Progress events kept per test for late subscribers
+    TEST_EVENT_KEEPALIVE: float = 15.0  # Seconds between SSE keepalives on idle streams
+
+    # Pipeline Graph
+    GRAPH_PARALLEL_NETWORK: bool = False  # Generate the network alongside initial reactions (prompt loses the engagement summary)
+    PIPELINE_MODE: str = "staged"  # "staged" or "per_persona" (simulation_params.pipeline_mode overrides)
+
+    # Test Deadlines (simulation_params.deadline_seconds overrides)
+    TEST_DEADLINE_SECONDS: Optional[int] = 1800  # End-to-end budget per test (None = no deadline)
+
+    # Pipeline Checkpoints (resume failed or interrupted tests)
+    CHECKPOINT_ENABLED: bool = True
+    CHECKPOINT_DB_PATH: str = ".cache/checkpoints.sqlite"
+
+    # Variant Sweeps
+    SWEEP_MAX_VARIANTS: int = 30  # Variants per /test/sweep request, not counting the base
+
+    # Monte Carlo Replicates
+    MAX_REPLICATES: int = 50  # simulation_params.replicates per test
+
     # R2 Storage Settings
     R2_ACCOUNT_ID: str
     R2_ACCESS_KEY_ID: str
@@ -0,0 +1,228 @@
+"""Durable SQLite checkpoints for pipeline runs, keyed by test ID.
+
+With checkpoints enabled the API runs the graph with the test ID as the
+LangGraph thread, so the state after every node is saved locally. A run
+that failed, was cancelled or was cut off by a restart can then resume from
+the last node that succeeded instead of paying for the whole pipeline again.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from langgraph.constants import START
+
+from app.config import settings
+from app.graph.graph import create_video_test_graph, video_test_graph
+
+
+class PipelineCheckpointer:
+    """Owns the checkpoint database and the graph compiled against it."""
+
+    def __init__(self, db_path: str, enabled: bool = True):
+        """Initialize the checkpointer.
+
+        Args:
+            db_path: SQLite database file
+            enabled: Whether runs are checkpointed at all
+        """
+        self.db_path = Path(db_path)
+        self.enabled = enabled
+        self.saver = None
+        self._conn = None
+        # Uncheckpointed until open() succeeds
+        self.graph = video_test_graph
+
+    async def open(self):
+        """Open the database and compile the checkpointed graph."""
+        if not self.enabled:
+            return
+
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError:
+            print(
+                "[Checkpointer] langgraph-checkpoint-sqlite is not installed, "
+                "pipeline runs will not be resumable"
+            )
+            return
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = await aiosqlite.connect(str(self.db_path))
+        self.saver = AsyncSqliteSaver(self._conn)
+        await self.saver.setup()
+        self.graph = create_video_test_graph(checkpointer=self.saver)
+        print(f"[Checkpointer] Saving pipeline checkpoints to {self.db_path}")
+
+    async def close(self):
+        """Close the database."""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+            self.saver = None
+            self.graph = video_test_graph
+
+    @staticmethod
+    def thread_config(test_id: str) -> dict:
+        """Get the run config for a test's checkpoint thread."""
+        return {"configurable": {"thread_id": test_id}}
+
+    async def find_resume_point(self, test_id: str) -> Optional[dict]:
+        """Find the checkpoint after the last node that succeeded.
+
+        Nodes report failure by appending to ``errors`` (and, for some, a
+        ``*_failed`` status) rather than raising, so each node's own update
+        decides whether it succeeded. The resume point is the checkpoint
+        before the first failed or unfinished node. Nodes that succeeded
+        in the same superstep (initial reactions next to a failed network)
+        are not rerun. If no checkpoint after the input was saved, the test
+        resumes from graph entry with its original input.
+
+        Args:
+            test_id: Test identifier
+
+        Returns:
+            Dict with the checkpoint ``config``, its ``state``, the
+            ``completed_nodes`` before it (``last_nodes`` being the ones that
+            produced it), the ``next_nodes`` to rerun and the
+            ``reused_tasks`` (node to task ID) of its superstep that
+            succeeded, or None if the test has no checkpoints or finished
+            without errors. Reused nodes are reported finished again by the
+            resumed run's stream
+        """
+        if self.saver is None:
+            return None
+
+        snapshots = {}
+        latest = None
+        async for snapshot in self.graph.aget_state_history(self.thread_config(test_id)):
+            snapshots[snapshot.config["configurable"]["checkpoint_id"]] = snapshot
+            latest = latest or snapshot
+
+        # Follow the latest run's parent chain; earlier resumes leave
+        # abandoned branches in the same thread
+        chain = []
+        while latest is not None:
+            chain.append(latest)
+            parent = latest.parent_config
+            latest = snapshots.get(parent["configurable"]["checkpoint_id"]) if parent else None
+        # Oldest first; the input checkpoint (step -1) has no state yet
+        chain.reverse()
+        entry = next((s for s in chain if s.metadata.get("step", -1) < 0), None)
+        chain = [s for s in chain if s.metadata.get("step", -1) >= 0]
+
+        resume_point = None
+        completed_nodes = []
+        last_nodes = []
+        for index, snapshot in enumerate(chain):
+            if not snapshot.next:
+                # Finished without errors
+                return None
+
+            following = chain[index + 1] if index + 1 < len(chain) else None
+            if following is not None and following.metadata.get("source") == "update":
+                # An earlier resume's update of this point (e.g. its deadline)
+                continue
+
+            # Each task's result is the update its node returned
+            reused_tasks = {
+                task.name: task.id
+                for task in snapshot.tasks
+                if isinstance(task.result, dict) and not self._node_failed(task.result)
+            }
+            if following is None or len(reused_tasks) < len(snapshot.tasks):
+                resume_point = {
+                    "config": snapshot.config,
+                    "state": snapshot.values,
+                    "completed_nodes": list(completed_nodes),
+                    "last_nodes": list(last_nodes),
+                    "next_nodes": [node for node in snapshot.next if node not in reused_tasks],
+                    "reused_tasks": reused_tasks,
+                }
+                break
+
+            completed_nodes.extend(snapshot.next)
+            last_nodes = list(snapshot.next)
+
+        if resume_point is None and entry is not None and not chain:
+            resume_point = await self._entry_resume_point(entry)
+
+        return resume_point
+
+    @staticmethod
+    def _node_failed(update: dict) -> bool:
+        """Whether a node's state update reports a failure."""
+        return bool(update.get("errors")) or str(update.get("status", "")).endswith("_failed")
+
+    async def _entry_resume_point(self, entry) -> Optional[dict]:
+        """Build a resume point at graph entry from a run's input checkpoint.
+
+        Args:
+            entry: State snapshot of the input checkpoint
+
+        Returns:
+            Resume point whose ``state`` is the run's input, or None if the
+            input was not saved
+        """
+        saved = await self.saver.aget_tuple(entry.config)
+        # The input is saved as the entry task's writes to each state key
+        inputs = {
+            channel: value
+            for _, channel, value in (saved.pending_writes if saved else None) or []
+            if channel in self.graph.output_channels
+        }
+        if not inputs:
+            return None
+        return {
+            "config": entry.config,
+            "state": inputs,
+            "completed_nodes": [],
+            "last_nodes": [START],
+            "next_nodes": list(entry.next),
+            "reused_tasks": {},
+        }
+
+    async def update_resume_point(self, resume_point: dict, values: dict) -> dict:
+        """Write values into a resume point's state before resuming from it.
+
+        The update is recorded as coming from the last node that ran, so the
+        same nodes are still scheduled next. At graph entry it is applied
+        to the run's input, which has not been written to the state yet.
+
+        Nodes of the superstep that succeeded get their saved writes back
+        as pending writes on the updated checkpoint. LangGraph reapplies
+        those instead of rerunning the nodes when it resumes the thread's
+        latest checkpoint, so the thread config is returned for that case.
+
+        Args:
+            resume_point: Resume point from find_resume_point()
+            values: State fields to set
+
+        Returns:
+            Config of the updated checkpoint to resume from
+        """
+        last_nodes = resume_point["last_nodes"]
+        if last_nodes == [START]:
+            values = {**resume_point["state"], **values}
+        config = await self.graph.aupdate_state(
+            resume_point["config"], values, as_node=last_nodes[-1] if last_nodes else None
+        )
+
+        reused_tasks = resume_point.get("reused_tasks")
+        if not reused_tasks:
+            return config
+
+        saved = await self.saver.aget_tuple(resume_point["config"])
+        updated = await self.graph.aget_state(config)
+        task_ids = {task.name: task.id for task in updated.tasks}
+        for node, task_id in reused_tasks.items():
+            writes = [(channel, value) for tid, channel, value in saved.pending_writes if tid == task_id]
+            await self.saver.aput_writes(config, writes, task_ids[node])
+        return self.thread_config(config["configurable"]["thread_id"])
+
+
+# Global instance
+pipeline_checkpointer = PipelineCheckpointer(
+    db_path=settings.CHECKPOINT_DB_PATH,
+    enabled=settings.CHECKPOINT_ENABLED,
+)
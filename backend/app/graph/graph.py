@@ -1,7 +1,11 @@
 """LangGraph pipeline definition connecting all nodes."""
 
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
 from langgraph.graph import StateGraph, END
 
+from app.config import settings
 from app.graph.state import VideoTestState
 from app.graph.nodes.video_analysis.node import video_analysis_node
 from app.graph.nodes.text_analysis.node import text_analysis_node
@@ -9,8 +13,64 @@ from app.graph.nodes.initial_reaction.node import initial_reaction_node
 from app.graph.nodes.network_generation.node import network_generation_node
 from app.graph.nodes.interaction.node import interaction_node
 from app.graph.nodes.second_reaction.node import second_reaction_node
+from app.graph.nodes.persona_pipeline.node import persona_pipeline_node
 from app.graph.nodes.results_compilation.node import results_compilation_node
 from app.graph.nodes.platform_prediction.node import platform_prediction_node
+from app.services.call_profiler import call_profiler, current_node, current_test_id
+from app.services.gemini_client import call_deadline
+
+# Relative time each node is budgeted; a node gets its weight's share of the
+# time left before the test's deadline, out of the nodes still to run
+NODE_TIME_WEIGHTS = {
+    "video_analysis": 2.0,
+    "text_analysis": 1.0,
+    "initial_reactions": 3.0,
+    "network_generation": 1.0,
+    "interactions": 1.0,
+    "second_reactions": 3.0,
+    "persona_pipeline": 8.0,
+    "results_compilation": 0.5,
+    "platform_prediction": 1.0,
+}
+
+# Nodes with no fallback that every later node needs: they may use all the
+# time left, and the nodes after them degrade to fallbacks if they do
+ESSENTIAL_NODES = {"video_analysis", "text_analysis"}
+
+
+def profiled(
+    name: str, execute: Callable[[VideoTestState], Awaitable[Dict[str, Any]]]
+) -> Callable[[VideoTestState], Awaitable[Dict[str, Any]]]:
+    """Wrap a node so its wall time and Gemini calls are attributed to it.
+
+    When the test has a deadline, the node's Gemini calls (and stage
+    fan-outs) are also held to the node's time budget.
+
+    Args:
+        name: Node name used in the test profile
+        execute: The node's execute coroutine function
+
+    Returns:
+        Wrapped coroutine function
+    """
+
+    async def run(state: VideoTestState) -> Dict[str, Any]:
+        token = current_node.set(name)
+        budget = node_budget(name, state)
+        deadline_token = call_deadline.set(
+            None if budget is None else time.monotonic() + budget
+        )
+        started_at = time.perf_counter()
+        try:
+            return await execute(state)
+        finally:
+            call_profiler.record_node(
+                current_test_id.get(), name, time.perf_counter() - started_at
+            )
+            call_deadline.reset(deadline_token)
+            current_node.reset(token)
+
+    return run
 
 
 def route_content_analysis(state: VideoTestState) -> str:
@@ -30,7 +90,102 @@ def route_content_analysis(state: VideoTestState) -> str:
         return "video_analysis"
 
 
-def create_video_test_graph():
+def get_pipeline_mode(simulation_params: dict) -> str:
+    """Get a test's execution mode for nodes 2-4.
+
+    Args:
+        simulation_params: Test simulation parameters
+
+    Returns:
+        "staged" (one node per stage) or "per_persona" (persona pipeline node)
+    """
+    return (simulation_params or {}).get("pipeline_mode", settings.PIPELINE_MODE)
+
+
+def pipeline_nodes(state: VideoTestState) -> List[str]:
+    """Get the nodes a test runs, in execution order.
+
+    Args:
+        state: Test state
+
+    Returns:
+        Node names
+    """
+    analysis = route_content_analysis(state)
+    if get_pipeline_mode(state.get("simulation_params")) == "per_persona":
+        return [analysis, "persona_pipeline", "results_compilation", "platform_prediction"]
+    return [
+        analysis,
+        "initial_reactions",
+        "network_generation",
+        "interactions",
+        "second_reactions",
+        "results_compilation",
+        "platform_prediction",
+    ]
+
+
+def new_test_deadline(simulation_params: dict) -> Optional[float]:
+    """Get the deadline (epoch seconds) for a test starting now.
+
+    Args:
+        simulation_params: Test simulation parameters
+
+    Returns:
+        Deadline from simulation_params.deadline_seconds or
+        settings.TEST_DEADLINE_SECONDS, or None for no deadline
+    """
+    seconds = (simulation_params or {}).get("deadline_seconds", settings.TEST_DEADLINE_SECONDS)
+    if not seconds:
+        return None
+    return time.time() + seconds
+
+
+def node_budget(name: str, state: VideoTestState) -> Optional[float]:
+    """Get the seconds a node may run for, out of the time left before the test's deadline.
+
+    The node gets its NODE_TIME_WEIGHTS share of the remaining time, against
+    itself and the nodes after it, so time a node does not use carries over
+    to the rest of the pipeline. ESSENTIAL_NODES get all of it.
+
+    Args:
+        name: Node name
+        state: Test state
+
+    Returns:
+        Seconds (0 once the deadline has passed), or None if the test has no deadline
+    """
+    deadline = state.get("deadline")
+    if deadline is None:
+        return None
+
+    remaining = max(0.0, deadline - time.time())
+    order = pipeline_nodes(state)
+    if name in ESSENTIAL_NODES or name not in order:
+        return remaining
+    weights = [NODE_TIME_WEIGHTS[node] for node in order[order.index(name):]]
+    return remaining * weights[0] / sum(weights)
+
+
+def count_pipeline_nodes(simulation_params: dict, run_count: int = 1) -> int:
+    """Count the nodes a test executes (for progress reporting).
+
+    Args:
+        simulation_params: Test simulation parameters
+        run_count: Runs (platforms, replicates) after the shared content analysis
+
+    Returns:
+        Number of nodes, counting one content analysis node
+    """
+    if get_pipeline_mode(simulation_params) == "per_persona":
+        # persona_pipeline, results_compilation, platform_prediction
+        per_run = 3
+    else:
+        per_run = 6
+    return 1 + per_run * run_count
+
+
+def create_video_test_graph(checkpointer=None, parallel_network: bool = None):
     """Create the 7-node LangGraph pipeline for video/text testing.
 
     Graph Flow:
@@ -56,6 +211,24 @@ def create_video_test_graph():
           ↓
         END
 
+    With ``parallel_network``, network generation does not wait for the
+    initial reactions: both start after content analysis and interactions
+    wait for both (the network prompt then omits the engagement summary).
+
+    Tests with ``pipeline_mode: "per_persona"`` run nodes 2-4 as the single
+    persona_pipeline node instead, where each persona moves on to its second
+    reaction without waiting for the whole population.
+
+    A state that already carries a video or text analysis skips node 1; the
+    multi-platform runner analyzes the content once and starts one run per
+    platform from there.
+
+    Args:
+        checkpointer: LangGraph checkpointer saving state after every node
+            (None = no checkpoints)
+        parallel_network: Run network generation alongside initial reactions
+            (None = settings.GRAPH_PARALLEL_NETWORK)
+
     Returns:
         Compiled LangGraph StateGraph
     """
@@ -63,39 +236,77 @@ def create_video_test_graph():
     workflow = StateGraph(VideoTestState)
 
     # Add all nodes
-    workflow.add_node("video_analysis", video_analysis_node.execute)
-    workflow.add_node("text_analysis", text_analysis_node.execute)
-    workflow.add_node("initial_reactions", initial_reaction_node.execute)
-    workflow.add_node("network_generation", network_generation_node.execute)
-    workflow.add_node("interactions", interaction_node.execute)
-    workflow.add_node("second_reactions", second_reaction_node.execute)
-    workflow.add_node("results_compilation", results_compilation_node.execute)
-    workflow.add_node("platform_prediction", platform_prediction_node.execute)
-
-    # Define edges with conditional routing for first node
-    # Start with conditional routing to either video or text analysis
+    nodes = {
+        "video_analysis": video_analysis_node.execute,
+        "text_analysis": text_analysis_node.execute,
+        "initial_reactions": initial_reaction_node.execute,
+        "network_generation": network_generation_node.execute,
+        "interactions": interaction_node.execute,
+        "second_reactions": second_reaction_node.execute,
+        "persona_pipeline": persona_pipeline_node.execute,
+        "results_compilation": results_compilation_node.execute,
+        "platform_prediction": platform_prediction_node.execute,
+    }
+    for name, execute in nodes.items():
+        workflow.add_node(name, profiled(name, execute))
+
+    if parallel_network is None:
+        parallel_network = settings.GRAPH_PARALLEL_NETWORK
+
+    # Fan out from analysis to reactions and network (fan in at interactions),
+    # or run them in sequence
+    staged_targets = (
+        ["initial_reactions", "network_generation"] if parallel_network else ["initial_reactions"]
+    )
+
+    def route_reactions(state: VideoTestState) -> list[str]:
+        """Route from content analysis to the staged nodes or the persona pipeline."""
+        if get_pipeline_mode(state.get("simulation_params")) == "per_persona":
+            return ["persona_pipeline"]
+        return staged_targets
+
+    def route_entry(state: VideoTestState) -> list[str]:
+        """Route to content analysis, or past it when the analysis is given."""
+        if state.get("video_analysis") or state.get("text_analysis"):
+            return route_reactions(state)
+        return [route_content_analysis(state)]
+
+    # Start with conditional routing to either video or text analysis;
+    # multi-platform tests analyze once and start each platform after it
     workflow.set_conditional_entry_point(
-        route_content_analysis,
-        {
-            "video_analysis": "video_analysis",
-            "text_analysis": "text_analysis",
-        }
+        route_entry,
+        [
+            "video_analysis",
+            "text_analysis",
+            "initial_reactions",
+            "network_generation",
+            "persona_pipeline",
+        ],
     )
 
-    # Both analysis nodes converge to initial_reactions
-    workflow.add_edge("video_analysis", "initial_reactions")
-    workflow.add_edge("text_analysis", "initial_reactions")
+    # Both analysis nodes converge on the reaction stages
+    for analysis in ("video_analysis", "text_analysis"):
+        workflow.add_conditional_edges(
+            analysis,
+            route_reactions,
+            ["initial_reactions", "network_generation", "persona_pipeline"],
+        )
+
+    if parallel_network:
+        workflow.add_edge(["initial_reactions", "network_generation"], "interactions")
+    else:
+        # Continue with sequential flow
+        workflow.add_edge("initial_reactions", "network_generation")
+        workflow.add_edge("network_generation", "interactions")
 
-    # Continue with sequential flow
-    workflow.add_edge("initial_reactions", "network_generation")
-    workflow.add_edge("network_generation", "interactions")
     workflow.add_edge("interactions", "second_reactions")
     workflow.add_edge("second_reactions", "results_compilation")
+    workflow.add_edge("persona_pipeline", "results_compilation")
     workflow.add_edge("results_compilation", "platform_prediction")
     workflow.add_edge("platform_prediction", END)
 
     # Compile the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 # Create global graph instance
@@ -2,13 +2,14 @@
 
 import json
 import asyncio
-import re
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from app.graph.state import VideoTestState
 from app.services.gemini_client import gemini_client
+from app.services.llm_json import parse_json, salvage_json
 from app.services.persona_loader import persona_loader
+from app.services.test_events import ReactionTally
 from app.models.persona import Persona
 from app.models.reaction import InitialReaction
 from app.config import settings
@@ -21,6 +22,10 @@ class InitialReactionNode:
         """Initialize the initial reaction node."""
         self.prompt_path = Path(__file__).parent / "prompt.xml"
         self.prompt_template = gemini_client.load_prompt_template(self.prompt_path)
+        self.batch_prompt_path = Path(__file__).parent / "batch_prompt.xml"
+        self.batch_prompt_template = gemini_client.load_prompt_template(
+            self.batch_prompt_path
+        )
 
     def _clean_json_response(self, response_text: str) -> dict:
         """Clean and parse JSON response from Gemini API.
@@ -34,12 +39,7 @@ class InitialReactionNode:
         Raises:
             ValueError: If response cannot be parsed as valid JSON dict
         """
-        # Remove markdown code blocks if present
-        cleaned = re.sub(r'^```json\s*', '', response_text.strip())
-        cleaned = re.sub(r'\s*```$', '', cleaned)
-
-        # Parse JSON
-        parsed = json.loads(cleaned)
+        parsed = parse_json(response_text)
 
         # Handle case where LLM returns a list with a single dict
         if isinstance(parsed, list):
@@ -54,13 +54,19 @@ class InitialReactionNode:
         return parsed
 
     async def generate_single_reaction(
-        self, persona: Persona, video_analysis: dict
+        self,
+        persona: Persona,
+        video_analysis: dict,
+        seed: Optional[int] = None,
+        hedge: bool = False,
     ) -> dict:
         """Generate reaction for a single persona.
 
         Args:
             persona: The persona to generate reaction for
             video_analysis: Video analysis data
+            seed: Optional seed / replicate index for response caching
+            hedge: Whether to hedge slow requests
 
         Returns:
             Reaction data as dict
@@ -69,7 +75,7 @@ class InitialReactionNode:
             # Format the prompt with persona and video data
             prompt = self.prompt_template.format(
                 persona_id=persona.persona_id,
-                persona_data=json.dumps(persona.model_dump(), indent=2),
+                persona_data=persona_loader.persona_context(persona),
                 video_analysis=json.dumps(video_analysis, indent=2),
             )
 
@@ -78,6 +84,9 @@ class InitialReactionNode:
                 prompt=prompt,
                 temperature=0.8,  # Higher temp for variety
                 model="gemini-2.0-flash-lite",
+                seed=seed,
+                cache_tag="initial_reactions",
+                hedge=hedge,
             )
 
             # Parse and validate JSON response
@@ -90,18 +99,146 @@ class InitialReactionNode:
                 f"[Node 2] Warning: Failed to generate reaction for {persona.persona_id}: {e}"
             )
             print(f"[Node 2] Error type: {type(e).__name__}")
-            return {
-                "persona_id": persona.persona_id,
-                "will_view": False,
-                "will_like": False,
-                "will_share": False,
-                "will_comment": False,
-                "engagement_probability": 0.0,
-                "reaction_time": 0.0,
-                "reasoning": "Error generating reaction",
-                "sentiment": "neutral",
-                "comment_text": None,
-            }
+            return self.create_fallback_reaction(persona.persona_id)
+
+    def create_fallback_reaction(self, persona_id: str, timed_out: bool = False) -> dict:
+        """Create the default "no engagement" reaction used on errors.
+
+        Args:
+            persona_id: The persona's ID
+            timed_out: Whether the reaction missed the stage deadline
+
+        Returns:
+            Reaction data as dict
+        """
+        fallback = {
+            "persona_id": persona_id,
+            "will_view": False,
+            "will_like": False,
+            "will_share": False,
+            "will_comment": False,
+            "engagement_probability": 0.0,
+            "reaction_time": 0.0,
+            "reasoning": "Error generating reaction",
+            "sentiment": "neutral",
+            "comment_text": None,
+        }
+        if timed_out:
+            fallback["reasoning"] = "Reaction not generated before the stage deadline"
+            fallback["timed_out"] = True
+        return fallback
+
+    def _parse_batch_response(
+        self, response_text: str, expected_ids: set[str]
+    ) -> Dict[str, dict]:
+        """Parse and validate a batched reaction response.
+
+        Items that fail validation or name an unexpected persona are dropped,
+        so callers can retry just the personas that are missing.
+
+        Args:
+            response_text: Raw response text from API
+            expected_ids: Persona IDs that were requested in the batch
+
+        Returns:
+            Dict of persona_id to validated reaction data
+        """
+        # A truncated batch still yields its complete reactions; the rest are retried
+        parsed, _ = salvage_json(response_text)
+
+        if isinstance(parsed, dict):
+            items = parsed.get("reactions", [])
+        elif isinstance(parsed, list):
+            items = parsed
+        else:
+            raise ValueError(f"Expected JSON object or list, got {type(parsed).__name__}")
+
+        reactions = {}
+        for item in items:
+            if not isinstance(item, dict) or item.get("persona_id") not in expected_ids:
+                continue
+            try:
+                reactions[item["persona_id"]] = InitialReaction(**item).model_dump()
+            except Exception:
+                continue
+
+        return reactions
+
+    async def generate_batch_reactions(
+        self,
+        personas: List[Persona],
+        video_analysis: dict,
+        seed: Optional[int] = None,
+        hedge: bool = False,
+    ) -> List[dict]:
+        """Generate reactions for several personas in a single request.
+
+        Personas missing from the response (truncated output, invalid items)
+        are re-split into smaller batches; a batch of one falls back to the
+        single-persona prompt.
+
+        Args:
+            personas: Personas to generate reactions for
+            video_analysis: Video analysis data
+            seed: Optional seed / replicate index for response caching
+            hedge: Whether to hedge slow requests
+
+        Returns:
+            Reaction data for each persona, in input order
+        """
+        if len(personas) == 1:
+            return [
+                await self.generate_single_reaction(personas[0], video_analysis, seed, hedge)
+            ]
+
+        expected_ids = {p.persona_id for p in personas}
+
+        try:
+            # Compact JSON keeps the shared context small
+            prompt = self.batch_prompt_template.format(
+                persona_ids=", ".join(p.persona_id for p in personas),
+                personas_data=json.dumps(
+                    [p.model_dump() for p in personas], separators=(",", ":")
+                ),
+                video_analysis=json.dumps(video_analysis, separators=(",", ":")),
+            )
+
+            response_text = await gemini_client.generate_async(
+                prompt=prompt,
+                temperature=0.8,
+                model="gemini-2.0-flash-lite",
+                seed=seed,
+                cache_tag="initial_reactions",
+                hedge=hedge,
+            )
+
+            reactions = self._parse_batch_response(response_text, expected_ids)
+
+        except Exception as e:
+            print(
+                f"[Node 2] Warning: Batch of {len(personas)} reactions failed ({e}), re-splitting"
+            )
+            reactions = {}
+
+        missing = [p for p in personas if p.persona_id not in reactions]
+        if missing:
+            if len(missing) < len(personas):
+                print(
+                    f"[Node 2] Warning: Batch missing {len(missing)}/{len(personas)} personas, re-splitting"
+                )
+            mid = (len(missing) + 1) // 2
+            halves = [missing[:mid], missing[mid:]] if len(missing) > 1 else [missing]
+            retried = await asyncio.gather(
+                *[
+                    self.generate_batch_reactions(half, video_analysis, seed, hedge)
+                    for half in halves
+                ]
+            )
+            for half, half_reactions in zip(halves, retried):
+                for persona, reaction in zip(half, half_reactions):
+                    reactions[persona.persona_id] = reaction
+
+        return [reactions[p.persona_id] for p in personas]
 
     async def execute(self, state: VideoTestState) -> Dict[str, Any]:
         """Execute initial reaction generation for all personas.
@@ -150,12 +287,50 @@ class InitialReactionNode:
                 f"[Node 2] Generating {len(personas)} reactions in parallel (max {gemini_client.max_concurrent} concurrent)..."
             )
 
-            tasks = [
-                self.generate_single_reaction(persona, content_analysis)
-                for persona in personas
-            ]
-
-            reactions_data = await asyncio.gather(*tasks)
+            simulation_params = state.get("simulation_params", {})
+            seed = simulation_params.get("seed")
+            batch_size = max(1, int(simulation_params.get("reaction_batch_size", 1)))
+            hedge = simulation_params.get("hedge_requests", settings.GEMINI_HEDGE_REQUESTS)
+            deadline = simulation_params.get("stage_deadline_seconds")
+
+            # Publish each reaction as it lands
+            tally = ReactionTally("initial_reactions", len(personas))
+
+            if batch_size > 1:
+                # Pack several personas into each request
+                batches = [
+                    personas[i:i + batch_size] for i in range(0, len(personas), batch_size)
+                ]
+                print(f"[Node 2] Batching {batch_size} personas per request ({len(batches)} requests)")
+                batch_results = await gemini_client.fan_out(
+                    batches,
+                    lambda batch: self.generate_batch_reactions(
+                        batch, content_analysis, seed, hedge
+                    ),
+                    lambda batch: [
+                        self.create_fallback_reaction(p.persona_id, timed_out=True)
+                        for p in batch
+                    ],
+                    deadline=deadline,
+                    on_result=lambda batch, reactions: tally.add_all(reactions),
+                )
+                reactions_data = [r for batch in batch_results for r in batch]
+            else:
+                reactions_data = await gemini_client.fan_out(
+                    personas,
+                    lambda persona: self.generate_single_reaction(
+                        persona, content_analysis, seed, hedge
+                    ),
+                    lambda persona: self.create_fallback_reaction(
+                        persona.persona_id, timed_out=True
+                    ),
+                    deadline=deadline,
+                    on_result=lambda persona, reaction: tally.add(reaction),
+                )
+
+            timed_out_count = sum(1 for r in reactions_data if r.get("timed_out"))
+            if timed_out_count:
+                print(f"[Node 2] ⚠ {timed_out_count} reactions missed the stage deadline")
 
             # Count engagement
             engaged_count = sum(
@@ -167,7 +342,6 @@ class InitialReactionNode:
             )
 
             return {
-                **state,
                 "personas": personas_data,
                 "initial_reactions": reactions_data,
                 "status": "initial_reactions_complete",
@@ -178,8 +352,7 @@ class InitialReactionNode:
             print(f"[Node 2] ✗ {error_msg}")
 
             return {
-                **state,
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "initial_reactions_failed",
             }
 
@@ -1,7 +1,6 @@
 """Interaction Node - Simulates persona-to-persona interactions using Gemini."""
 
 import json
-import re
 from pathlib import Path
 from typing import Dict, Any
 
@@ -18,44 +17,19 @@ class InteractionNode:
         self.prompt_path = Path(__file__).parent / "prompt.xml"
         self.prompt_template = gemini_client.load_prompt_template(self.prompt_path)
 
-    def _clean_json_response(self, response_text: str) -> dict:
-        """Clean and parse JSON response from Gemini API.
+    def _fill_summary_fields(self, interaction_results: dict):
+        """Rebuild summary fields lost to truncation from the recovered events.
 
         Args:
-            response_text: Raw response text from API
-
-        Returns:
-            Parsed JSON as dict
-
-        Raises:
-            ValueError: If response cannot be parsed as valid JSON dict
+            interaction_results: Partial interaction results (updated in place)
         """
-        # Log response length for debugging
-        print(f"[Node 3] Response length: {len(response_text)} characters")
-
-        # Remove markdown code blocks if present
-        cleaned = re.sub(r'^```json\s*', '', response_text.strip())
-        cleaned = re.sub(r'\s*```$', '', cleaned)
-
-        # Check if response looks truncated (doesn't end with } or ])
-        if cleaned and cleaned[-1] not in ['}', ']']:
-            print(f"[Node 3] Warning: Response appears truncated (ends with '{cleaned[-50:]}')")
-            raise ValueError("Response appears to be truncated")
-
-        # Try to parse JSON
-        try:
-            parsed = json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            # Log the error details
-            print(f"[Node 3] JSON parsing error at position {e.pos}: {e.msg}")
-            print(f"[Node 3] Context around error: ...{cleaned[max(0, e.pos-100):e.pos+100]}...")
-            raise
-
-        # Ensure it's a dict
-        if not isinstance(parsed, dict):
-            raise ValueError(f"Expected JSON object, got {type(parsed).__name__}: {str(parsed)[:100]}")
-
-        return parsed
+        events = interaction_results.get("events", [])
+        print(f"[Node 3] Warning: Response still truncated, keeping {len(events)} complete events")
+        interaction_results.setdefault("total_interactions", len(events))
+        interaction_results.setdefault(
+            "unique_sharers", len({e.get("source_persona_id") for e in events})
+        )
+        interaction_results.setdefault("max_chain_length", 1 if events else 0)
 
     def create_fallback_interactions(self) -> dict:
         """Create minimal fallback interaction results.
@@ -93,7 +67,6 @@ class InteractionNode:
                 print(f"[Node 3] Warning: Persona network not found, using fallback (no interactions)")
                 interaction_results = self.create_fallback_interactions()
                 return {
-                    **state,
                     "interaction_results": interaction_results,
                     "interaction_events": [],
                     "status": "interactions_complete",
@@ -129,17 +102,20 @@ class InteractionNode:
             print(f"[Node 3] Prompt size: {len(prompt)} characters")
             print(f"[Node 3] Network edges: {len(simplified_network.get('edges', []))}, Engaged personas: {sum(1 for r in simplified_reactions if r['will_share'])}")
 
-            # Generate interactions using Gemini 2.0 Flash (not flash-lite, for better reliability)
-            response_text = await gemini_client.generate_async(
-                prompt=prompt,
-                temperature=0.7,  # Moderate temp for realistic variety
-                model="gemini-2.0-flash-exp",
-                max_output_tokens=16384,  # Increased token limit for complex interactions
-            )
-
-            # Parse JSON response with cleaning
+            # Generate interactions using Gemini 2.0 Flash (not flash-lite, for better reliability),
+            # continuing the event list if the output hits the token limit
             try:
-                interaction_results = self._clean_json_response(response_text)
+                interaction_results, truncated = await gemini_client.generate_json_with_continuation(
+                    prompt=prompt,
+                    list_keys=["events", "influence_chains", "propagation_stages"],
+                    temperature=0.7,  # Moderate temp for realistic variety
+                    model="gemini-2.0-flash-exp",
+                    max_output_tokens=16384,  # Increased token limit for complex interactions
+                    seed=state.get("simulation_params", {}).get("seed"),
+                    cache_tag="interactions",
+                )
+                if truncated:
+                    self._fill_summary_fields(interaction_results)
             except Exception as parse_error:
                 print(f"[Node 3] Warning: JSON parsing failed ({parse_error}), using fallback")
                 interaction_results = self.create_fallback_interactions()
@@ -160,7 +136,6 @@ class InteractionNode:
             )
 
             return {
-                **state,
                 "interaction_results": interaction_results,
                 "interaction_events": interaction_events,
                 "status": "interactions_complete",
@@ -174,10 +149,9 @@ class InteractionNode:
             fallback_results = self.create_fallback_interactions()
 
             return {
-                **state,
                 "interaction_results": fallback_results,
                 "interaction_events": [],
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "interactions_complete",  # Mark as complete even with fallback
             }
 
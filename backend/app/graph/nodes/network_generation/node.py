@@ -1,12 +1,11 @@
 """Network Generation Node - Creates dynamic social network using Gemini."""
 
-import json
-import re
 from pathlib import Path
 from typing import Dict, Any
 
 from app.graph.state import VideoTestState
 from app.services.gemini_client import gemini_client
+from app.services.persona_loader import persona_loader
 from app.config import settings
 
 
@@ -18,45 +17,6 @@ class NetworkGenerationNode:
         self.prompt_path = Path(__file__).parent / "prompt.xml"
         self.prompt_template = gemini_client.load_prompt_template(self.prompt_path)
 
-    def _clean_json_response(self, response_text: str) -> dict:
-        """Clean and parse JSON response from Gemini API.
-
-        Args:
-            response_text: Raw response text from API
-
-        Returns:
-            Parsed JSON as dict
-
-        Raises:
-            ValueError: If response cannot be parsed as valid JSON dict
-        """
-        # Log response length for debugging
-        print(f"[Node 2.5] Response length: {len(response_text)} characters")
-
-        # Remove markdown code blocks if present
-        cleaned = re.sub(r'^```json\s*', '', response_text.strip())
-        cleaned = re.sub(r'\s*```$', '', cleaned)
-
-        # Check if response looks truncated (doesn't end with } or ])
-        if cleaned and cleaned[-1] not in ['}', ']']:
-            print(f"[Node 2.5] Warning: Response appears truncated (ends with '{cleaned[-50:]}')")
-            raise ValueError("Response appears to be truncated")
-
-        # Try to parse JSON
-        try:
-            parsed = json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            # Log the error details
-            print(f"[Node 2.5] JSON parsing error at position {e.pos}: {e.msg}")
-            print(f"[Node 2.5] Context around error: ...{cleaned[max(0, e.pos-100):e.pos+100]}...")
-            raise
-
-        # Ensure it's a dict
-        if not isinstance(parsed, dict):
-            raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
-
-        return parsed
-
     def validate_and_fix_edges(self, edges: list[dict], valid_persona_ids: set[str]) -> list[dict]:
         """Validate and fix edge persona IDs.
 
@@ -109,6 +69,30 @@ class NetworkGenerationNode:
 
         return validated_edges
 
+    def validate_network(self, persona_network: dict, personas: list[dict]) -> dict:
+        """Fix the network's edges against the personas being simulated.
+
+        Args:
+            persona_network: Generated (or shared) network
+            personas: Personas of the test's platform
+
+        Returns:
+            The network with invalid edges fixed or removed
+        """
+        valid_persona_ids = set(p["persona_id"] for p in personas)
+        original_edge_count = len(persona_network.get("edges", []))
+
+        validated_edges = self.validate_and_fix_edges(
+            persona_network.get("edges", []),
+            valid_persona_ids
+        )
+
+        fixed_count = original_edge_count - len(validated_edges)
+        if fixed_count > 0:
+            print(f"[Node 2.5] ⚠ Fixed/removed {fixed_count} edges with invalid persona IDs")
+
+        return {**persona_network, "edges": validated_edges}
+
     def create_fallback_network(self, personas: list[dict]) -> dict:
         """Create a simple fallback network when AI generation fails.
 
@@ -186,6 +170,13 @@ class NetworkGenerationNode:
         Returns:
             Formatted summary string
         """
+        if not reactions:
+            # Generated concurrently with the initial reactions
+            return (
+                "Not available yet (reactions are generated alongside the network). "
+                "Base connections on the persona profiles."
+            )
+
         engaged = [r for r in reactions if r.get("engagement_probability", 0) > 0.5]
         summary = f"Total personas: {len(reactions)}\n"
         summary += f"Engaged: {len(engaged)}\n"
@@ -196,19 +187,38 @@ class NetworkGenerationNode:
     async def execute(self, state: VideoTestState) -> Dict[str, Any]:
         """Execute network generation.
 
+        When run alongside the initial reactions node, personas are loaded
+        directly (the loader caches them) and the prompt omits the engagement
+        summary.
+
+        A network already in the state (generated once for a whole variant
+        sweep) is reused, with its edges checked against this test's personas.
+
         Args:
             state: Current pipeline state
 
         Returns:
             Updated state with persona_network populated
         """
+        if state.get("persona_network"):
+            print("[Node 2.5] ✓ Using the shared network")
+            personas = state.get("personas") or [
+                p.model_dump() for p in persona_loader.load_personas(state["platform"])
+            ]
+            return {
+                "persona_network": self.validate_network(state["persona_network"], personas),
+                "status": "network_generation_complete",
+            }
+
         try:
-            print(f"[Node 2.5] Generating dynamic social network...")
+            print("[Node 2.5] Generating dynamic social network...")
 
             # Get personas and reactions from state
-            personas = state.get("personas", [])
-            initial_reactions = state.get("initial_reactions", [])
             platform = state["platform"]
+            personas = state.get("personas") or [
+                p.model_dump() for p in persona_loader.load_personas(platform)
+            ]
+            initial_reactions = state.get("initial_reactions") or []
 
             if not personas:
                 raise ValueError("Personas not found in state")
@@ -228,34 +238,27 @@ class NetworkGenerationNode:
                 f"[Node 2.5] Requesting network for {len(personas)} personas on {platform}..."
             )
 
-            # Generate network using Gemini 2.0 Flash-Lite
-            response_text = await gemini_client.generate_async(
-                prompt=prompt,
-                temperature=0.7,  # Moderate creativity for realistic variance
-                model="gemini-2.0-flash-lite",
-            )
-
-            # Parse JSON response with cleaning
+            # Generate network using Gemini 2.0 Flash-Lite, continuing truncated edge lists
             try:
-                persona_network = self._clean_json_response(response_text)
+                persona_network, truncated = await gemini_client.generate_json_with_continuation(
+                    prompt=prompt,
+                    list_keys=["edges", "clusters", "influence_hubs"],
+                    temperature=0.7,  # Moderate creativity for realistic variance
+                    model="gemini-2.0-flash-lite",
+                    seed=state.get("simulation_params", {}).get("seed"),
+                    cache_tag="network_generation",
+                )
+                if truncated:
+                    print(
+                        "[Node 2.5] Warning: Network still truncated after continuations, keeping "
+                        f"{len(persona_network.get('edges', []))} complete edges"
+                    )
             except Exception as parse_error:
                 print(f"[Node 2.5] Warning: JSON parsing failed ({parse_error}), using fallback network")
                 persona_network = self.create_fallback_network(personas)
 
             # Validate and fix edges with correct persona IDs
-            valid_persona_ids = set(p["persona_id"] for p in personas)
-            original_edge_count = len(persona_network.get("edges", []))
-
-            validated_edges = self.validate_and_fix_edges(
-                persona_network.get("edges", []),
-                valid_persona_ids
-            )
-
-            persona_network["edges"] = validated_edges
-
-            fixed_count = original_edge_count - len(validated_edges)
-            if fixed_count > 0:
-                print(f"[Node 2.5] ⚠ Fixed/removed {fixed_count} edges with invalid persona IDs")
+            persona_network = self.validate_network(persona_network, personas)
 
             # Validate network structure
             edge_count = len(persona_network.get("edges", []))
@@ -271,7 +274,6 @@ class NetworkGenerationNode:
             )
 
             return {
-                **state,
                 "persona_network": persona_network,
                 "status": "network_generation_complete",
             }
@@ -281,7 +283,7 @@ class NetworkGenerationNode:
             error_msg = f"Network generation failed: {str(e)}"
             print(f"[Node 2.5] ⚠ {error_msg}, using fallback network")
 
-            personas = state.get("personas", [])
+            personas = state.get("personas") or []
             fallback_network = self.create_fallback_network(personas) if personas else {
                 "edges": [],
                 "clusters": [],
@@ -290,9 +292,8 @@ class NetworkGenerationNode:
             }
 
             return {
-                **state,
                 "persona_network": fallback_network,
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "network_generation_complete",  # Mark as complete even with fallback
             }
 
@@ -0,0 +1,224 @@
+"""Persona Pipeline Node - Runs each persona through reactions without stage barriers."""
+
+import asyncio
+from typing import Dict, Any
+
+from app.graph.state import VideoTestState
+from app.graph.nodes.initial_reaction.node import initial_reaction_node
+from app.graph.nodes.network_generation.node import network_generation_node
+from app.graph.nodes.interaction.node import interaction_node
+from app.graph.nodes.second_reaction.node import second_reaction_node
+from app.services.persona_loader import persona_loader
+from app.services.test_events import ReactionTally
+from app.config import settings
+
+
+class PersonaPipelineNode:
+    """Nodes 2-4 as one step: each persona flows from its initial reaction to its
+    second reaction as soon as its own inputs are ready.
+
+    The interaction simulation is a single call over every initial reaction,
+    so it remains a barrier, but only for personas it can affect. A persona
+    waits for the network and its neighbors' initial reactions; if no
+    neighbor engaged, nobody can pass the content on to it and its second
+    reaction starts right away, overlapping the interaction call. Personas
+    that the simulated events do target anyway are regenerated with those
+    events once they land.
+    """
+
+    @staticmethod
+    def is_engaged(reaction: dict) -> bool:
+        """Whether a reaction could lead the persona to pass the content on."""
+        return bool(
+            reaction.get("will_share")
+            or reaction.get("will_comment")
+            or reaction.get("will_like")
+            or reaction.get("engagement_probability", 0) > 0.5
+        )
+
+    @staticmethod
+    def build_neighbors(persona_network: dict) -> Dict[str, set]:
+        """Map each persona to the personas it shares an edge with (either direction)."""
+        neighbors: Dict[str, set] = {}
+        for edge in persona_network.get("edges", []):
+            source, target = edge.get("source"), edge.get("target")
+            if source and target:
+                neighbors.setdefault(source, set()).add(target)
+                neighbors.setdefault(target, set()).add(source)
+        return neighbors
+
+    async def execute(self, state: VideoTestState) -> Dict[str, Any]:
+        """Execute initial reactions, network, interactions and second reactions.
+
+        Args:
+            state: Current pipeline state
+
+        Returns:
+            Updated state with personas, initial_reactions, persona_network,
+            interaction results and second_reactions populated
+        """
+        # Every task started here; those still running when the node returns
+        # (e.g. after one persona failed) are cancelled so they stop spending quota
+        tasks: list[asyncio.Task] = []
+
+        def start(coro) -> asyncio.Task:
+            task = asyncio.create_task(coro)
+            tasks.append(task)
+            return task
+
+        try:
+            print("[Pipeline] Running per-persona pipeline...")
+
+            platform = state["platform"]
+            personas = persona_loader.load_personas(platform)
+            personas_data = [p.model_dump() for p in personas]
+
+            content_analysis = state.get("video_analysis") or state.get("text_analysis")
+            if not content_analysis:
+                raise ValueError("Neither video_analysis nor text_analysis found in state")
+
+            simulation_params = state.get("simulation_params", {})
+            seed = simulation_params.get("seed")
+            hedge = simulation_params.get("hedge_requests", settings.GEMINI_HEDGE_REQUESTS)
+            if int(simulation_params.get("reaction_batch_size", 1)) > 1:
+                print("[Pipeline] reaction_batch_size is ignored in per-persona mode")
+
+            initial_tally = ReactionTally("initial_reactions", len(personas))
+            second_tally = ReactionTally("second_reactions", len(personas))
+
+            # Network generation starts immediately; it only needs the roster
+            network_task = start(
+                network_generation_node.execute({**state, "personas": personas_data})
+            )
+
+            initial_reactions: Dict[str, dict] = {}
+            reaction_ready = {p.persona_id: asyncio.Event() for p in personas}
+            interactions_done = asyncio.Event()
+            interaction_update: Dict[str, Any] = {}
+            speculative: set = set()
+
+            async def load_network():
+                """Wait for the network and index each persona's neighbors once."""
+                network_update = await network_task
+                return network_update, self.build_neighbors(network_update["persona_network"])
+
+            network_info = start(load_network())
+
+            async def run_interactions():
+                """Simulate interactions once every initial reaction and the network are in."""
+                try:
+                    await asyncio.gather(*(event.wait() for event in reaction_ready.values()))
+                    network_update, _ = await network_info
+                    update = await interaction_node.execute(
+                        {
+                            **state,
+                            "personas": personas_data,
+                            "initial_reactions": [initial_reactions[p.persona_id] for p in personas],
+                            "persona_network": network_update["persona_network"],
+                        }
+                    )
+                    interaction_update.update(update)
+                finally:
+                    # Never leave waiting personas hanging
+                    interactions_done.set()
+
+            async def run_persona(persona) -> dict:
+                """Take one persona from its initial reaction to its second reaction."""
+                persona_id = persona.persona_id
+                reaction = await initial_reaction_node.generate_single_reaction(
+                    persona, content_analysis, seed, hedge
+                )
+                initial_reactions[persona_id] = reaction
+                reaction_ready[persona_id].set()
+                initial_tally.add(reaction)
+
+                # Wait for the persona's neighbors, not the whole population
+                network_update, neighbor_map = await network_info
+                network = network_update["persona_network"]
+                neighbors = [n for n in neighbor_map.get(persona_id, ()) if n in reaction_ready]
+                await asyncio.gather(*(reaction_ready[n].wait() for n in neighbors))
+
+                if any(self.is_engaged(initial_reactions[n]) for n in neighbors):
+                    await interactions_done.wait()
+                    events = interaction_update.get("interaction_events") or []
+                else:
+                    speculative.add(persona_id)
+                    events = []
+
+                second = await second_reaction_node.generate_second_reaction(
+                    persona.model_dump(), reaction, events, network, seed, hedge
+                )
+                second_tally.add(second)
+                return second
+
+            interaction_task = start(run_interactions())
+            second_reactions = await asyncio.gather(*(start(run_persona(p)) for p in personas))
+            await interaction_task
+            network_update = await network_task
+
+            # Redo speculative second reactions that the simulation targeted after all
+            interaction_events = interaction_update.get("interaction_events") or []
+            targeted = {
+                event.get("target_persona_id")
+                for event in interaction_events
+                if isinstance(event, dict)
+            }
+            redo = [
+                i for i, p in enumerate(personas)
+                if p.persona_id in speculative and p.persona_id in targeted
+            ]
+            if redo:
+                print(f"[Pipeline] Regenerating {len(redo)} second reactions targeted by interactions")
+                redone = await asyncio.gather(
+                    *(
+                        start(
+                            second_reaction_node.generate_second_reaction(
+                                personas_data[i],
+                                initial_reactions[personas[i].persona_id],
+                                interaction_events,
+                                network_update["persona_network"],
+                                seed,
+                                hedge,
+                            )
+                        )
+                        for i in redo
+                    )
+                )
+                for i, second in zip(redo, redone):
+                    second_tally.revise(second_reactions[i], second)
+                    second_reactions[i] = second
+
+            print(
+                f"[Pipeline] ✓ {len(personas)} personas complete, "
+                f"{len(speculative)} second reactions overlapped the interaction simulation, "
+                f"{len(redo)} regenerated"
+            )
+
+            return {
+                "personas": personas_data,
+                "initial_reactions": [initial_reactions[p.persona_id] for p in personas],
+                "persona_network": network_update["persona_network"],
+                "interaction_results": interaction_update.get("interaction_results"),
+                "interaction_events": interaction_events,
+                "second_reactions": [r for r in second_reactions if isinstance(r, dict)],
+                "errors": network_update.get("errors", []) + interaction_update.get("errors", []),
+                "status": "second_reactions_complete",
+            }
+
+        except Exception as e:
+            error_msg = f"Per-persona pipeline failed: {str(e)}"
+            print(f"[Pipeline] ✗ {error_msg}")
+
+            return {
+                "errors": [error_msg],
+                "status": "persona_pipeline_failed",
+            }
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Node instance
+persona_pipeline_node = PersonaPipelineNode()
@@ -1,12 +1,13 @@
 """Platform Prediction Node - Predicts real-world platform performance."""
 
 import json
-import re
+import random
 from pathlib import Path
 from typing import Dict, Any
 
 from app.graph.state import VideoTestState
 from app.services.gemini_client import gemini_client
+from app.services.llm_json import parse_json_object
 
 
 class PlatformPredictionNode:
@@ -77,9 +78,10 @@ class PlatformPredictionNode:
         else:
             total_views = boosted_reach
 
-        # Add some randomness/variance (±20%)
-        import random
-        variance = random.uniform(0.8, 1.2)
+        # Add some randomness/variance (±20%), reproducible per seed so
+        # replicates differ only where the simulation does
+        seed = (state.get("simulation_params") or {}).get("seed")
+        variance = random.Random(seed).uniform(0.8, 1.2)
         total_views = int(total_views * variance)
 
         # Calculate engagement numbers (not linear to view count!)
@@ -162,18 +164,7 @@ class PlatformPredictionNode:
         Returns:
             Parsed JSON as dict
         """
-        # Remove markdown code blocks if present
-        cleaned = re.sub(r'^```json\s*', '', response_text.strip())
-        cleaned = re.sub(r'\s*```$', '', cleaned)
-
-        # Parse JSON
-        parsed = json.loads(cleaned)
-
-        # Ensure it's a dict
-        if not isinstance(parsed, dict):
-            raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
-
-        return parsed
+        return parse_json_object(response_text)
 
     async def execute(self, state: VideoTestState) -> Dict[str, Any]:
         """Execute platform prediction.
@@ -213,11 +204,24 @@ class PlatformPredictionNode:
 
             # Generate predictions using Gemini
             print("[Node 6] Analyzing simulation data and user metrics...")
-            response_text = await gemini_client.generate_async(
-                prompt=prompt,
-                temperature=0.4,  # Lower temp for more consistent predictions
-                model="gemini-2.0-flash-lite",
-            )
+            try:
+                response_text = await gemini_client.generate_async(
+                    prompt=prompt,
+                    temperature=0.4,  # Lower temp for more consistent predictions
+                    model="gemini-2.0-flash-lite",
+                    seed=state.get("simulation_params", {}).get("seed"),
+                    cache_tag="platform_prediction",
+                )
+            except TimeoutError as e:
+                # Out of time: the baseline scaling is still a usable prediction
+                error_msg = f"Platform prediction timed out, using baseline only: {e}"
+                print(f"[Node 6] ⚠ {error_msg}")
+                self._print_predictions(baseline, platform)
+                return {
+                    "platform_predictions": {**baseline, "prediction_method": "baseline_scaling"},
+                    "errors": [error_msg],
+                    "status": "completed",
+                }
 
             # Parse response
             try:
@@ -237,7 +241,6 @@ class PlatformPredictionNode:
             self._print_predictions(platform_predictions, platform)
 
             return {
-                **state,
                 "platform_predictions": platform_predictions,
                 "status": "completed",
             }
@@ -249,8 +252,7 @@ class PlatformPredictionNode:
             traceback.print_exc()
 
             return {
-                **state,
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "platform_prediction_failed",
             }
 
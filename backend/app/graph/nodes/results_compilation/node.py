@@ -5,6 +5,7 @@ from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 
+from app.config import settings
 from app.graph.state import VideoTestState
 
 
@@ -512,9 +513,7 @@ class ResultsCompilationNode:
                 f"{final_metrics['engagement_rate']*100:.1f}% engagement rate"
             )
 
-            # Export results to markdown
-            updated_state = {
-                **state,
+            update = {
                 "final_metrics": final_metrics,
                 "node_graph_data": node_graph_data,
                 "engagement_timeline": engagement_timeline,
@@ -522,21 +521,25 @@ class ResultsCompilationNode:
                 "status": "complete",
             }
 
-            try:
-                markdown_path = self.export_to_markdown(updated_state)
-                print(f"[Node 5] ✓ Analysis exported to markdown: {markdown_path}")
-            except Exception as e:
-                print(f"[Node 5] Warning: Failed to export markdown: {e}")
-
-            return updated_state
+            # Export results to markdown
+            simulation_params = state.get("simulation_params") or {}
+            if simulation_params.get("export_markdown", settings.ANALYSIS_EXPORT_ENABLED):
+                try:
+                    markdown_path = self.export_to_markdown(
+                        {**state, **update}, settings.ANALYSIS_EXPORT_DIR
+                    )
+                    print(f"[Node 5] ✓ Analysis exported to markdown: {markdown_path}")
+                except Exception as e:
+                    print(f"[Node 5] Warning: Failed to export markdown: {e}")
+
+            return update
 
         except Exception as e:
             error_msg = f"Results compilation failed: {str(e)}"
             print(f"[Node 5] ✗ {error_msg}")
 
             return {
-                **state,
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "compilation_failed",
             }
 
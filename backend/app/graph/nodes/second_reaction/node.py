@@ -1,12 +1,14 @@
 """Second Reaction Node - Generates updated reactions after social influence."""
 
 import json
-import asyncio
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from app.graph.state import VideoTestState
 from app.services.gemini_client import gemini_client
+from app.services.llm_json import parse_json
+from app.services.persona_loader import persona_loader
+from app.services.test_events import ReactionTally
 from app.config import settings
 
 
@@ -62,6 +64,8 @@ class SecondReactionNode:
         initial_reaction: dict,
         interaction_events: List[dict],
         persona_network: dict,
+        seed: Optional[int] = None,
+        hedge: bool = False,
     ) -> dict:
         """Generate updated reaction for a single persona.
 
@@ -70,6 +74,8 @@ class SecondReactionNode:
             initial_reaction: Their initial reaction
             interaction_events: All interaction events
             persona_network: The network graph
+            seed: Optional seed / replicate index for response caching
+            hedge: Whether to hedge slow requests
 
         Returns:
             Updated reaction data
@@ -85,7 +91,7 @@ class SecondReactionNode:
             # Format prompt
             prompt = self.prompt_template.format(
                 persona_id=persona_id,
-                persona_data=json.dumps(persona_data, indent=2),
+                persona_data=persona_loader.persona_context(persona_data),
                 initial_reaction=json.dumps(initial_reaction, indent=2),
                 network_interactions_for_persona=network_interactions,
             )
@@ -95,10 +101,13 @@ class SecondReactionNode:
                 prompt=prompt,
                 temperature=0.8,
                 model="gemini-2.0-flash-lite",
+                seed=seed,
+                cache_tag="second_reactions",
+                hedge=hedge,
             )
 
             # Parse and return
-            parsed = json.loads(response_text)
+            parsed = parse_json(response_text)
 
             # Handle if Gemini returns a list instead of dict
             if isinstance(parsed, list) and len(parsed) > 0:
@@ -113,20 +122,36 @@ class SecondReactionNode:
             print(
                 f"[Node 4] Warning: Failed to generate second reaction for {persona_id}: {e}"
             )
-            return {
-                **initial_reaction,
-                "influence_level": 0.0,
-                "changed_from_initial": False,
-                "social_proof_factors": [],
-                "reasoning": "Error generating updated reaction",
-                "updated_sentiment": initial_reaction.get("sentiment", "neutral"),
-                "initial_engagement_probability": initial_reaction.get(
-                    "engagement_probability", 0.0
-                ),
-                "final_engagement_probability": initial_reaction.get(
-                    "engagement_probability", 0.0
-                ),
-            }
+            return self.create_fallback_reaction(initial_reaction)
+
+    def create_fallback_reaction(self, initial_reaction: dict, timed_out: bool = False) -> dict:
+        """Create a second reaction that keeps the initial reaction unchanged.
+
+        Args:
+            initial_reaction: The persona's initial reaction
+            timed_out: Whether the reaction missed the stage deadline
+
+        Returns:
+            Second reaction data as dict
+        """
+        fallback = {
+            **initial_reaction,
+            "influence_level": 0.0,
+            "changed_from_initial": False,
+            "social_proof_factors": [],
+            "reasoning": "Error generating updated reaction",
+            "updated_sentiment": initial_reaction.get("sentiment", "neutral"),
+            "initial_engagement_probability": initial_reaction.get(
+                "engagement_probability", 0.0
+            ),
+            "final_engagement_probability": initial_reaction.get(
+                "engagement_probability", 0.0
+            ),
+        }
+        if timed_out:
+            fallback["reasoning"] = "Updated reaction not generated before the stage deadline"
+            fallback["timed_out"] = True
+        return fallback
 
     async def execute(self, state: VideoTestState) -> Dict[str, Any]:
         """Execute second-round reaction generation for all personas.
@@ -182,26 +207,37 @@ class SecondReactionNode:
             # Filter out any invalid personas
             valid_personas = [p for p in personas if isinstance(p, dict) and "persona_id" in p]
 
-            # Create tasks with better error handling
-            tasks = []
-            for persona in valid_personas:
-                try:
-                    persona_id = persona.get("persona_id") if isinstance(persona, dict) else None
-                    if not persona_id:
-                        print(f"[Node 4] Warning: Invalid persona (no persona_id): {type(persona)}")
-                        continue
-
-                    initial_reaction = reaction_lookup.get(persona_id, {})
-                    task = self.generate_second_reaction(
-                        persona, initial_reaction, interaction_events, persona_network
-                    )
-                    tasks.append(task)
-                except Exception as e:
-                    print(f"[Node 4] Warning: Failed to create task for persona: {e}")
-                    print(f"[Node 4] Persona type: {type(persona)}, Persona data: {str(persona)[:100]}")
-                    continue
+            simulation_params = state.get("simulation_params", {})
+            seed = simulation_params.get("seed")
+            hedge = simulation_params.get("hedge_requests", settings.GEMINI_HEDGE_REQUESTS)
+            deadline = simulation_params.get("stage_deadline_seconds")
+
+            # Publish each reaction as it lands
+            tally = ReactionTally("second_reactions", len(valid_personas))
+
+            second_reactions_raw = await gemini_client.fan_out(
+                valid_personas,
+                lambda persona: self.generate_second_reaction(
+                    persona,
+                    reaction_lookup.get(persona["persona_id"], {}),
+                    interaction_events,
+                    persona_network,
+                    seed,
+                    hedge,
+                ),
+                lambda persona: self.create_fallback_reaction(
+                    reaction_lookup.get(persona["persona_id"], {"persona_id": persona["persona_id"]}),
+                    timed_out=True,
+                ),
+                deadline=deadline,
+                on_result=lambda persona, reaction: tally.add(reaction),
+            )
 
-            second_reactions_raw = await asyncio.gather(*tasks)
+            timed_out_count = sum(
+                1 for r in second_reactions_raw if isinstance(r, dict) and r.get("timed_out")
+            )
+            if timed_out_count:
+                print(f"[Node 4] ⚠ {timed_out_count} second reactions missed the stage deadline")
 
             # Filter out any invalid reactions (lists, None, etc.) and flatten if needed
             second_reactions = []
@@ -229,7 +265,6 @@ class SecondReactionNode:
             )
 
             return {
-                **state,
                 "second_reactions": second_reactions,
                 "status": "second_reactions_complete",
             }
@@ -242,8 +277,7 @@ class SecondReactionNode:
             traceback.print_exc()
 
             return {
-                **state,
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "second_reactions_failed",
             }
 
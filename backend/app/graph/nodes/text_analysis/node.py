@@ -6,6 +6,7 @@ from typing import Dict, Any
 
 from app.graph.state import VideoTestState
 from app.services.gemini_client import gemini_client
+from app.services.llm_json import parse_json_object
 
 
 class TextAnalysisNode:
@@ -56,17 +57,18 @@ class TextAnalysisNode:
                 prompt=full_prompt,
                 temperature=0.3,  # Lower temperature for more consistent analysis
                 json_mode=True,
+                seed=state.get("simulation_params", {}).get("seed"),
+                cache_tag="text_analysis",
             )
 
             # Parse JSON response
-            text_analysis = json.loads(response_text)
+            text_analysis = parse_json_object(response_text)
 
             print(
                 f"[Node 1 - Text] ✓ Text analysis complete. Category: {text_analysis.get('content_category', 'unknown')}"
             )
 
             return {
-                **state,
                 "text_analysis": text_analysis,
                 "status": "text_analysis_complete",
             }
@@ -76,8 +78,7 @@ class TextAnalysisNode:
             print(f"[Node 1 - Text] ✗ {error_msg}")
 
             return {
-                **state,
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "text_analysis_failed",
             }
 
@@ -6,6 +6,7 @@ from typing import Dict, Any
 
 from app.graph.state import VideoTestState
 from app.services.gemini_client import gemini_client
+from app.services.llm_json import parse_json_object
 
 
 class VideoAnalysisNode:
@@ -48,17 +49,18 @@ class VideoAnalysisNode:
                 video_url=state["video_url"],
                 prompt=self.prompt_template,
                 temperature=0.3,  # Lower temperature for more consistent analysis
+                seed=state.get("simulation_params", {}).get("seed"),
+                cache_tag="video_analysis",
             )
 
             # Parse JSON response
-            video_analysis = json.loads(response_text)
+            video_analysis = parse_json_object(response_text)
 
             print(
                 f"[Node 1] ✓ Video analysis complete. Category: {video_analysis.get('content_category', 'unknown')}"
             )
 
             return {
-                **state,
                 "video_analysis": video_analysis,
                 "status": "video_analysis_complete",
             }
@@ -68,8 +70,7 @@ class VideoAnalysisNode:
             print(f"[Node 1] ✗ {error_msg}")
 
             return {
-                **state,
-                "errors": state.get("errors", []) + [error_msg],
+                "errors": [error_msg],
                 "status": "video_analysis_failed",
             }
 
@@ -0,0 +1,511 @@
+"""Orchestration of tests made of several graph runs.
+
+Multi-platform tests: content analysis does not depend on the platform, so
+a multi-platform test runs it once and then starts the graph for every
+platform from the analyzed state (the graph skips node 1 when the analysis
+is already present).
+
+Variant sweeps: every variant of a post gets its own content analysis, but
+the persona network depends only on the platform's personas, so a sweep
+generates it once and every variant run reuses it.
+
+Monte Carlo replicates: a test can request N replicates of its simulation
+with per-replicate seeds. Content analysis runs once, and so can the network,
+and the replicates' final metrics are summarized with mean, stdev and
+percentile bands.
+
+The runs of a test execute concurrently within the one job, sharing the
+Gemini text pool's slots fairly so no run starves the others.
+"""
+
+import asyncio
+import statistics
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.graph.graph import profiled, route_content_analysis
+from app.graph.nodes.network_generation.node import network_generation_node
+from app.graph.nodes.text_analysis.node import text_analysis_node
+from app.graph.nodes.video_analysis.node import video_analysis_node
+from app.graph.state import VideoTestState
+from app.services.gemini_client import SharedCallSlots, call_share, gemini_client
+from app.services.persona_loader import persona_loader
+from app.services.test_events import current_event_tags
+
+ANALYSIS_NODES = {
+    "video_analysis": video_analysis_node.execute,
+    "text_analysis": text_analysis_node.execute,
+}
+
+# Metrics a sweep can rank variants by (final_metrics, then platform_predictions);
+# all of them appear in the comparison table
+SWEEP_RANK_METRICS = (
+    "engagement_rate",
+    "view_rate",
+    "viral_coefficient",
+    "social_influence_percentage",
+    "total_views",
+    "total_likes",
+    "total_shares",
+    "total_comments",
+    "predicted_views",
+    "virality_score",
+)
+
+
+async def analyze_content(state: VideoTestState) -> Dict[str, Any]:
+    """Run the content analysis node a test needs, once.
+
+    Args:
+        state: Multi-platform or replicate test state
+
+    Returns:
+        The analysis node's state update
+    """
+    name = route_content_analysis(state)
+    return await profiled(name, ANALYSIS_NODES[name])(state)
+
+
+def platform_state(
+    state: VideoTestState, analysis_update: Dict[str, Any], platform: str
+) -> VideoTestState:
+    """Build the input state for one platform's run.
+
+    ``platform_metrics`` may be keyed by platform, in which case each run
+    gets its own platform's metrics.
+
+    Args:
+        state: Multi-platform test state
+        analysis_update: State update from the shared content analysis
+        platform: Platform to simulate
+
+    Returns:
+        Initial state for the platform's graph run
+    """
+    platform_metrics = state.get("platform_metrics")
+    if isinstance(platform_metrics, dict) and set(platform_metrics) & set(state["platforms"]):
+        platform_metrics = platform_metrics.get(platform)
+
+    return {
+        **state,
+        **analysis_update,
+        "platform": platform,
+        "platform_metrics": platform_metrics,
+        "platforms": None,
+        "platform_results": None,
+        "errors": [],
+    }
+
+
+async def run_concurrently(
+    tags: Dict[str, dict], run_one: Callable[[str], Awaitable[VideoTestState]]
+) -> Dict[str, Any]:
+    """Run several graph runs at once, sharing the Gemini text pool fairly.
+
+    Each run gets a share of one set of call slots (see
+    ``gemini_client.call_share``), so a freed slot goes to the run with the
+    fewest calls in flight and slots left by a finished run go to the rest.
+    Each run also tags the events it emits. A run that raises does not stop
+    the others.
+
+    Args:
+        tags: Run key (platform, variant ID) to the tags its events carry
+        run_one: Coroutine function running the graph for one key
+
+    Returns:
+        Dict of run key to its final state, or the exception its run raised
+    """
+    slots = SharedCallSlots(gemini_client.text_workers)
+
+    async def run(key: str) -> VideoTestState:
+        # gather() runs each coroutine in its own task, so these stay local
+        call_share.set(slots.share())
+        current_event_tags.set(tags[key])
+        return await run_one(key)
+
+    results = await asyncio.gather(*(run(key) for key in tags), return_exceptions=True)
+    return dict(zip(tags, results))
+
+
+def combine_platform_results(
+    state: VideoTestState,
+    analysis_update: Dict[str, Any],
+    results: Dict[str, Any],
+    run_ids: Dict[str, str],
+) -> VideoTestState:
+    """Combine the platform runs into the multi-platform test's final state.
+
+    Args:
+        state: Multi-platform test state
+        analysis_update: State update from the shared content analysis
+        results: Platform to final state or exception, from run_concurrently()
+        run_ids: Platform to the test ID its run is stored under
+
+    Returns:
+        State with the shared analysis, ``platform_results`` holding each
+        platform's final_metrics and platform_predictions, and the
+        platform-prefixed errors
+    """
+    platform_results = {}
+    errors = list(analysis_update.get("errors", []))
+
+    for platform, result in results.items():
+        if isinstance(result, BaseException):
+            result = {
+                "status": "failed",
+                "errors": [f"Platform run failed: {result}"],
+            }
+
+        platform_errors = result.get("errors") or []
+        platform_results[platform] = {
+            "test_id": run_ids[platform],
+            "status": result.get("status"),
+            "final_metrics": result.get("final_metrics"),
+            "platform_predictions": result.get("platform_predictions"),
+            "errors": platform_errors,
+        }
+        errors.extend(f"[{platform}] {error}" for error in platform_errors)
+
+    return {
+        **state,
+        **analysis_update,
+        "platform_results": platform_results,
+        "errors": errors,
+        "status": overall_status(platform_results, "platforms"),
+    }
+
+
+def overall_status(run_results: Dict[str, dict], runs: str) -> str:
+    """Status of a test made of several runs.
+
+    Args:
+        run_results: Run key to a dict with the run's status
+        runs: What the runs are, for the failure statuses ("platforms")
+
+    Returns:
+        "completed", "{runs}_partially_failed" or "{runs}_failed"
+    """
+    completed = sum(1 for r in run_results.values() if r["status"] == "completed")
+    if completed == len(run_results):
+        return "completed"
+    if completed:
+        return f"{runs}_partially_failed"
+    return f"{runs}_failed"
+
+
+async def generate_shared_network(state: VideoTestState) -> Dict[str, Any]:
+    """Generate the persona network once for every run of a sweep or replicate set.
+
+    Args:
+        state: Sweep or replicate test state
+
+    Returns:
+        The network generation node's state update
+    """
+    personas = persona_loader.load_personas(state["platform"])
+    return await profiled("network_generation", network_generation_node.execute)(
+        {**state, "personas": [p.model_dump() for p in personas]}
+    )
+
+
+def variant_state(
+    state: VideoTestState, variant: dict, network_update: Dict[str, Any]
+) -> VideoTestState:
+    """Build the input state for one variant's run.
+
+    Args:
+        state: Sweep state
+        variant: Variant with the content fields it overrides
+        network_update: State update from the shared network generation
+
+    Returns:
+        Initial state for the variant's graph run, carrying the shared network
+    """
+    return {
+        **state,
+        "video_id": variant.get("video_id") or state["video_id"],
+        "video_url": variant.get("video_url") or state.get("video_url"),
+        "text_content": variant.get("text_content") or state.get("text_content"),
+        "persona_network": network_update["persona_network"],
+        "variants": None,
+        "variant_rank_by": None,
+        "variant_results": None,
+        "variant_ranking": None,
+        "errors": [],
+    }
+
+
+def rank_variants(
+    state: VideoTestState,
+    network_update: Dict[str, Any],
+    results: Dict[str, Any],
+    run_ids: Dict[str, str],
+) -> VideoTestState:
+    """Combine the variant runs into the sweep's final state and rank them.
+
+    Variants are ranked by ``variant_rank_by``, best first; variants
+    without that metric (failed runs) rank last. Each row also reports the
+    lift of the ranking metric over the base content, when the base was
+    run.
+
+    Args:
+        state: Sweep state
+        network_update: State update from the shared network generation
+        results: Variant ID to final state or exception, from run_concurrently()
+        run_ids: Variant ID to the test ID its run is stored under
+
+    Returns:
+        State with the shared network, ``variant_results`` per variant,
+        the ``variant_ranking`` comparison table and the variant-prefixed
+        errors
+    """
+    rank_by = state["variant_rank_by"]
+    labels = {v["variant_id"]: v.get("label") for v in state["variants"]}
+    variant_results = {}
+    rows = []
+    errors = list(network_update.get("errors", []))
+
+    for variant_id, result in results.items():
+        if isinstance(result, BaseException):
+            result = {
+                "status": "failed",
+                "errors": [f"Variant run failed: {result}"],
+            }
+
+        final_metrics = result.get("final_metrics") or {}
+        predictions = result.get("platform_predictions") or {}
+        variant_errors = result.get("errors") or []
+        variant_results[variant_id] = {
+            "test_id": run_ids[variant_id],
+            "label": labels.get(variant_id),
+            "status": result.get("status"),
+            "final_metrics": result.get("final_metrics"),
+            "platform_predictions": result.get("platform_predictions"),
+            "errors": variant_errors,
+        }
+        errors.extend(f"[{variant_id}] {error}" for error in variant_errors)
+
+        row = {
+            "variant_id": variant_id,
+            "label": labels.get(variant_id),
+            "test_id": run_ids[variant_id],
+            "status": result.get("status"),
+        }
+        for metric in SWEEP_RANK_METRICS:
+            row[metric] = final_metrics.get(metric, predictions.get(metric))
+        rows.append(row)
+
+    def sort_key(row: dict):
+        value = row[rank_by]
+        if not isinstance(value, (int, float)):
+            return (1, 0.0)
+        return (0, -value)
+
+    rows.sort(key=sort_key)
+    base_value = next((r[rank_by] for r in rows if r["variant_id"] == "base"), None)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+        value = row[rank_by]
+        row["lift_vs_base"] = (
+            round(value / base_value - 1, 3)
+            if isinstance(value, (int, float)) and isinstance(base_value, (int, float)) and base_value
+            else None
+        )
+
+    return {
+        **state,
+        **network_update,
+        "variant_results": variant_results,
+        "variant_ranking": rows,
+        "errors": errors,
+        "status": overall_status(variant_results, "variants"),
+    }
+
+
+# Percentile bands reported for every replicated metric
+REPLICATE_PERCENTILES = (5, 25, 50, 75, 95)
+
+# platform_predictions fields summarized alongside the final metrics
+REPLICATE_PREDICTION_METRICS = ("predicted_views", "virality_score")
+
+
+def replicate_seeds(simulation_params: dict) -> List[int]:
+    """Get the seed of each replicate a test requests.
+
+    Replicate ``i`` uses ``seed + i`` (``seed`` defaults to 0), so reruns of
+    the same replicate set hit the response cache and differ from other
+    sets only where their seeds do.
+
+    Args:
+        simulation_params: Test simulation parameters
+
+    Returns:
+        One seed per replicate; empty unless more than one replicate is requested
+    """
+    replicates = int(simulation_params.get("replicates") or 1)
+    if replicates <= 1:
+        return []
+    base_seed = int(simulation_params.get("seed") or 0)
+    return [base_seed + i for i in range(replicates)]
+
+
+def child_run_keys(state: VideoTestState) -> List[str]:
+    """Get the keys of a test's runs (its tests are ``{test_id}_{key}``).
+
+    Args:
+        state: Test state
+
+    Returns:
+        Platforms, variant IDs or replicate keys; empty for a single-run test
+    """
+    if state.get("platforms"):
+        return list(state["platforms"])
+    if state.get("variants"):
+        return [variant["variant_id"] for variant in state["variants"]]
+    return [f"r{i}" for i in range(len(replicate_seeds(state.get("simulation_params") or {})))]
+
+
+def replicate_state(
+    state: VideoTestState,
+    analysis_update: Dict[str, Any],
+    network_update: Optional[Dict[str, Any]],
+    seed: int,
+) -> VideoTestState:
+    """Build the input state for one replicate's run.
+
+    Args:
+        state: Replicate test state
+        analysis_update: State update from the shared content analysis
+        network_update: State update from the shared network generation,
+            or None for each replicate to generate its own network
+        seed: The replicate's seed
+
+    Returns:
+        Initial state for the replicate's graph run
+    """
+    return {
+        **state,
+        **analysis_update,
+        "persona_network": network_update["persona_network"] if network_update else None,
+        "simulation_params": {**state["simulation_params"], "seed": seed, "replicates": 1},
+        "replicate_results": None,
+        "replicate_stats": None,
+        "errors": [],
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile of a sorted list.
+
+    Args:
+        values: Sorted values (at least one)
+        q: Percentile, 0-100
+
+    Returns:
+        The percentile value
+    """
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize_metric(values: List[float]) -> Dict[str, Any]:
+    """Summarize one metric across replicates.
+
+    Args:
+        values: The metric's value in each replicate that produced it
+
+    Returns:
+        Dict with n, mean, stdev, min, max and the p5-p95 bands
+    """
+    values = sorted(values)
+    summary = {
+        "n": len(values),
+        "mean": round(statistics.fmean(values), 4),
+        "stdev": round(statistics.stdev(values), 4) if len(values) > 1 else 0.0,
+        "min": values[0],
+        "max": values[-1],
+    }
+    for q in REPLICATE_PERCENTILES:
+        summary[f"p{q}"] = round(percentile(values, q), 4)
+    return summary
+
+
+def summarize_replicates(
+    state: VideoTestState,
+    analysis_update: Dict[str, Any],
+    network_update: Optional[Dict[str, Any]],
+    results: Dict[str, Any],
+    run_ids: Dict[str, str],
+    seeds: Dict[str, int],
+) -> VideoTestState:
+    """Combine the replicate runs into the test's final state.
+
+    Every numeric metric in the replicates' ``final_metrics`` (and the
+    predicted views and virality score) is summarized in
+    ``replicate_stats``; ``final_metrics`` holds the means, so clients
+    reading a single result still get the central estimate.
+
+    Args:
+        state: Replicate test state
+        analysis_update: State update from the shared content analysis
+        network_update: State update from the shared network generation, or None
+        results: Replicate key to final state or exception, from run_concurrently()
+        run_ids: Replicate key to the test ID its run is stored under
+        seeds: Replicate key to its seed
+
+    Returns:
+        State with per-replicate results, ``replicate_stats`` and mean
+        ``final_metrics``
+    """
+    replicate_results = {}
+    values: Dict[str, List[float]] = {}
+    errors = list(analysis_update.get("errors", []))
+    if network_update:
+        errors.extend(network_update.get("errors", []))
+
+    for key, result in results.items():
+        if isinstance(result, BaseException):
+            result = {
+                "status": "failed",
+                "errors": [f"Replicate run failed: {result}"],
+            }
+
+        replicate_errors = result.get("errors") or []
+        replicate_results[key] = {
+            "test_id": run_ids[key],
+            "seed": seeds[key],
+            "status": result.get("status"),
+            "final_metrics": result.get("final_metrics"),
+            "platform_predictions": result.get("platform_predictions"),
+            "errors": replicate_errors,
+        }
+        errors.extend(f"[replicate {key}] {error}" for error in replicate_errors)
+
+        predictions = result.get("platform_predictions") or {}
+        metrics = {
+            **(result.get("final_metrics") or {}),
+            **{metric: predictions.get(metric) for metric in REPLICATE_PREDICTION_METRICS},
+        }
+        for metric, value in metrics.items():
+            # bool is an int; flags are not metrics
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.setdefault(metric, []).append(value)
+
+    replicate_stats = {metric: summarize_metric(v) for metric, v in values.items()}
+
+    return {
+        **state,
+        **analysis_update,
+        **(network_update or {}),
+        "final_metrics": {
+            metric: stats["mean"]
+            for metric, stats in replicate_stats.items()
+            if metric not in REPLICATE_PREDICTION_METRICS
+        }
+        or None,
+        "replicate_results": replicate_results,
+        "replicate_stats": replicate_stats,
+        "errors": errors,
+        "status": overall_status(replicate_results, "replicates"),
+    }
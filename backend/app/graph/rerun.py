@@ -0,0 +1,191 @@
+"""Incremental reruns: reuse a previous test's node outputs whose inputs did not change.
+
+Each node's fingerprint hashes the request inputs it reads together with the
+fingerprints of the nodes it depends on, so a change invalidates the node
+that reads it and everything downstream. A rerun keeps the longest unchanged
+prefix of the pipeline from the previous test and executes only the rest;
+editing ``platform_metrics`` reruns just platform prediction.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from app.graph.graph import get_pipeline_mode, route_content_analysis
+from app.graph.state import VideoTestState
+
+# Request inputs each node reads (every node also reads simulation_params)
+NODE_INPUTS = {
+    "video_analysis": ("content_type", "video_url"),
+    "text_analysis": ("content_type", "text_content"),
+    "initial_reactions": ("platform",),
+    "network_generation": ("platform",),
+    "interactions": ("platform",),
+    "second_reactions": (),
+    "persona_pipeline": ("platform",),
+    "results_compilation": (),
+    "platform_prediction": ("platform", "platform_metrics", "user_context"),
+}
+
+# State fields each node produces
+NODE_OUTPUTS = {
+    "video_analysis": ("video_analysis",),
+    "text_analysis": ("text_analysis",),
+    "initial_reactions": ("personas", "initial_reactions"),
+    "network_generation": ("persona_network",),
+    "interactions": ("interaction_results", "interaction_events"),
+    "second_reactions": ("second_reactions",),
+    "persona_pipeline": (
+        "personas",
+        "initial_reactions",
+        "persona_network",
+        "interaction_results",
+        "interaction_events",
+        "second_reactions",
+    ),
+    "results_compilation": (
+        "final_metrics",
+        "node_graph_data",
+        "engagement_timeline",
+        "reaction_insights",
+    ),
+    "platform_prediction": ("platform_predictions",),
+}
+
+# Prefixes of the errors each node records when it fails; a failed node
+# still writes fallback outputs, which must not be reused
+NODE_ERRORS = {
+    "video_analysis": ("Video analysis failed",),
+    "text_analysis": ("Text analysis failed",),
+    "initial_reactions": ("Initial reaction generation failed",),
+    "network_generation": ("Network generation failed",),
+    "interactions": ("Interaction simulation failed",),
+    "second_reactions": ("Second reaction generation failed",),
+    "persona_pipeline": (
+        "Per-persona pipeline failed",
+        "Network generation failed",
+        "Interaction simulation failed",
+    ),
+    "results_compilation": ("Results compilation failed",),
+    "platform_prediction": ("Platform prediction failed", "Platform prediction timed out"),
+}
+
+# simulation_params that bound how long a test may take rather than what it
+# computes; changing them alone does not invalidate any node
+RUNTIME_PARAMS = ("deadline_seconds",)
+
+# Nodes a rerun can continue after: each has a single path onward, so
+# recording it as the last node run schedules exactly the rest of the graph
+RERUN_POINTS = {
+    "video_analysis",
+    "text_analysis",
+    "interactions",
+    "second_reactions",
+    "persona_pipeline",
+    "results_compilation",
+}
+
+
+def pipeline_dependencies(state: VideoTestState) -> Dict[str, List[str]]:
+    """Get the nodes a test runs, in execution order, with the nodes each depends on.
+
+    Args:
+        state: Test state
+
+    Returns:
+        Ordered dict of node name to the names of its upstream nodes
+    """
+    analysis = route_content_analysis(state)
+    if get_pipeline_mode(state.get("simulation_params")) == "per_persona":
+        return {
+            analysis: [],
+            "persona_pipeline": [analysis],
+            "results_compilation": ["persona_pipeline"],
+            "platform_prediction": [analysis, "results_compilation"],
+        }
+    return {
+        analysis: [],
+        "initial_reactions": [analysis],
+        # Only when run after the reactions, but always is the safe side
+        "network_generation": ["initial_reactions"],
+        "interactions": ["initial_reactions", "network_generation"],
+        "second_reactions": ["interactions"],
+        "results_compilation": ["second_reactions"],
+        "platform_prediction": [analysis, "results_compilation"],
+    }
+
+
+def node_fingerprints(state: VideoTestState) -> Dict[str, str]:
+    """Fingerprint every node's inputs, including its upstream nodes' fingerprints.
+
+    Args:
+        state: Test state (only the request inputs are read)
+
+    Returns:
+        Dict of node name to fingerprint
+    """
+    simulation_params = {
+        key: value
+        for key, value in (state.get("simulation_params") or {}).items()
+        if key not in RUNTIME_PARAMS
+    }
+    fingerprints = {}
+    for node, upstream in pipeline_dependencies(state).items():
+        inputs = {
+            "simulation_params": simulation_params,
+            **{field: state.get(field) for field in NODE_INPUTS[node]},
+            "upstream": [fingerprints[u] for u in upstream],
+        }
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        fingerprints[node] = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    return fingerprints
+
+
+def plan_rerun(previous: VideoTestState, inputs: VideoTestState) -> Optional[dict]:
+    """Plan a rerun of a previous test with new inputs.
+
+    A node's output is reused when its fingerprint is unchanged and the
+    previous test produced it without recording an error. The rerun
+    continues after the last reusable node that is a rerun point.
+
+    Args:
+        previous: The previous test's final state
+        inputs: Initial state with the rerun's inputs
+
+    Returns:
+        Dict with ``state`` (the inputs plus the reused outputs),
+        ``as_node`` (the node to continue after, or None for a full run),
+        ``reused_nodes`` and ``rerun_nodes``; None if no node's inputs
+        changed
+    """
+    old = node_fingerprints(previous)
+    new = node_fingerprints(inputs)
+    order = list(new)
+
+    errors = [str(error) for error in previous.get("errors") or []]
+    reusable = []
+    for node in order:
+        produced = all(previous.get(field) is not None for field in NODE_OUTPUTS[node])
+        failed = any(error.startswith(NODE_ERRORS[node]) for error in errors)
+        if old.get(node) != new[node] or not produced or failed:
+            break
+        reusable.append(node)
+
+    if len(reusable) == len(order):
+        return None
+
+    points = [node for node in reusable if node in RERUN_POINTS]
+    as_node = points[-1] if points else None
+    reused_nodes = order[: order.index(as_node) + 1] if as_node else []
+
+    state = dict(inputs)
+    for node in reused_nodes:
+        for field in NODE_OUTPUTS[node]:
+            state[field] = previous[field]
+
+    return {
+        "state": state,
+        "as_node": as_node,
+        "reused_nodes": reused_nodes,
+        "rerun_nodes": order[len(reused_nodes):],
+    }
@@ -1,10 +1,20 @@
 """State schema for the LangGraph video testing pipeline."""
 
-from typing import TypedDict, Optional, List
+import operator
+from typing import Annotated, TypedDict, Optional, List
+
+
+def keep_latest(current: str, update: str) -> str:
+    """Keep the most recent write (concurrent branches may both set it)."""
+    return update
 
 
 class VideoTestState(TypedDict):
-    """State that flows through the 6-node LangGraph pipeline."""
+    """State that flows through the 6-node LangGraph pipeline.
+
+    Nodes return only the keys they produce. ``errors`` accumulates: a node
+    returns just its new errors and they are appended.
+    """
 
     # Input
     video_id: str
@@ -13,6 +23,7 @@ class VideoTestState(TypedDict):
     simulation_params: dict
     user_context: Optional[dict]  # User information and context
     platform_metrics: Optional[dict]  # Platform-specific metrics for the user
+    deadline: Optional[float]  # Epoch seconds the test must finish by (None = no deadline)
 
     # Content Type (for routing)
     content_type: Optional[str]  # "video" or "text"
@@ -47,6 +58,26 @@ class VideoTestState(TypedDict):
     # Node 6: Platform Predictions
     platform_predictions: Optional[dict]
 
+    # Multi-platform tests: the platforms simulated and each one's results
+    platforms: Optional[List[str]]
+    platform_results: Optional[dict]
+
+    # Variant sweeps: the variants (the base content first), the metric they
+    # are ranked by, each one's results and the ranked comparison table
+    variants: Optional[List[dict]]
+    variant_rank_by: Optional[str]
+    variant_results: Optional[dict]
+    variant_ranking: Optional[List[dict]]
+
+    # Monte Carlo replicates: each replicate's results and the per-metric
+    # mean, stdev and percentile bands across them
+    replicate_results: Optional[dict]
+    replicate_stats: Optional[dict]
+
+    # Incremental reruns: the test whose outputs were reused, and which nodes
+    rerun_of: Optional[str]
+    reused_nodes: Optional[List[str]]
+
     # Metadata
-    errors: List[str]
-    status: str
+    errors: Annotated[List[str], operator.add]
+    status: Annotated[str, keep_latest]
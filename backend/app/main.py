@@ -7,8 +7,11 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 
-from app.api.routes import router, test_results_store
+from app.api.routes import router, test_results_store, run_test_job
 from app.config import settings
+from app.graph.checkpointing import pipeline_checkpointer
+from app.services.gemini_client import gemini_client
+from app.services.job_queue import job_queue
 
 
 # Create FastAPI app
@@ -130,8 +133,13 @@ async def startup_event():
     print(f"API Port: {settings.API_PORT}")
     print(f"Gemini Model: {settings.GEMINI_MODEL}")
     print(f"Max Concurrent API Calls: {settings.GEMINI_MAX_CONCURRENT}")
+    print(f"Gemini Worker Threads: {gemini_client.text_workers} text, {gemini_client.upload_workers} upload")
+    print(f"Test Job Workers: {settings.JOB_WORKERS} ({settings.JOB_MAX_PER_TENANT} per tenant)")
     print("="*60 + "\n")
 
+    await pipeline_checkpointer.open()
+    await job_queue.start(run_test_job)
+
     # Load demo test data if it exists
     # load_demo_test_data()  # Commented out - using real test data only
 
@@ -139,6 +147,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown."""
+    await job_queue.stop()
+    await pipeline_checkpointer.close()
+    await gemini_client.aclose()
+
     print("\n" + "="*60)
     print("UGC Video Testing Platform - Backend Shutting Down")
     print("="*60 + "\n")
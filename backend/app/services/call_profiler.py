@@ -0,0 +1,245 @@
+"""Per-test, per-node accounting of Gemini calls, latency, tokens and cost."""
+
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from app.config import settings
+
+
+# Test and node the current task is working for. Set by the API route and the
+# graph node wrapper; child tasks created by fan-outs inherit both.
+current_test_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_test_id", default=None
+)
+current_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_node", default=None
+)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Get a percentile of a list of samples (nearest-rank).
+
+    Args:
+        samples: Sample values
+        pct: Percentile in 0-100
+
+    Returns:
+        Percentile value, or 0.0 for no samples
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index]
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, response_tokens: int) -> float:
+    """Estimate the USD cost of a call from settings.GEMINI_PRICING.
+
+    Args:
+        model_name: Model the call was made against
+        prompt_tokens: Input tokens
+        response_tokens: Output tokens
+
+    Returns:
+        Estimated cost in USD (0 for models without pricing)
+    """
+    pricing = settings.GEMINI_PRICING.get(model_name)
+    if not pricing:
+        return 0.0
+    return (
+        prompt_tokens * pricing["input"] + response_tokens * pricing["output"]
+    ) / 1_000_000
+
+
+class _NodeProfile:
+    """Counters for one node of one test."""
+
+    def __init__(self):
+        self.runs = 0
+        self.wall_time = 0.0
+        self.calls = 0
+        self.failed_calls = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.latencies: list[float] = []
+        self.queue_waits: list[float] = []
+        self.rate_limit_waits: list[float] = []
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.cost = 0.0
+        self.models: dict[str, int] = defaultdict(int)
+
+    def summary(self) -> dict:
+        return {
+            "runs": self.runs,
+            "wall_time": round(self.wall_time, 3),
+            "calls": self.calls,
+            "failed_calls": self.failed_calls,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "latency": {
+                "p50": round(percentile(self.latencies, 50), 3),
+                "p95": round(percentile(self.latencies, 95), 3),
+                "p99": round(percentile(self.latencies, 99), 3),
+                "max": round(max(self.latencies, default=0.0), 3),
+                "total": round(sum(self.latencies), 3),
+            },
+            "queue_wait": {
+                "total": round(sum(self.queue_waits), 3),
+                "p95": round(percentile(self.queue_waits, 95), 3),
+            },
+            "rate_limit_wait": {
+                "total": round(sum(self.rate_limit_waits), 3),
+                "p95": round(percentile(self.rate_limit_waits, 95), 3),
+            },
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "estimated_cost_usd": round(self.cost, 6),
+            "models": dict(self.models),
+        }
+
+
+class CallProfiler:
+    """Collects per-node call metrics for running tests.
+
+    Calls made outside a test (e.g. chat) are not recorded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tests: dict[str, dict[str, _NodeProfile]] = {}
+        self._started_at: dict[str, float] = {}
+
+    def _node(self, test_id: str, node: Optional[str]) -> _NodeProfile:
+        nodes = self._tests.get(test_id)
+        if nodes is None:
+            nodes = self._tests[test_id] = {}
+            self._started_at[test_id] = time.time()
+        profile = nodes.get(node or "other")
+        if profile is None:
+            profile = nodes[node or "other"] = _NodeProfile()
+        return profile
+
+    def record_call(
+        self,
+        model_name: str,
+        latency: float,
+        queue_wait: float,
+        rate_limit_wait: float,
+        prompt_tokens: Optional[int],
+        response_tokens: Optional[int],
+        failed: bool = False,
+        retry: bool = False,
+    ):
+        """Record one upstream call attempt for the current test and node.
+
+        Args:
+            model_name: Model the call was made against
+            latency: Seconds the backend call took
+            queue_wait: Seconds spent waiting for a worker thread
+            rate_limit_wait: Seconds spent waiting for RPM/TPM budget
+            prompt_tokens: Input tokens reported (None if unknown)
+            response_tokens: Output tokens reported (None if unknown)
+            failed: Whether the attempt raised
+            retry: Whether the attempt was a retry of a failed one
+        """
+        test_id = current_test_id.get()
+        if test_id is None:
+            return
+
+        with self._lock:
+            profile = self._node(test_id, current_node.get())
+            profile.calls += 1
+            profile.failed_calls += int(failed)
+            profile.retries += int(retry)
+            profile.latencies.append(latency)
+            profile.queue_waits.append(queue_wait)
+            profile.rate_limit_waits.append(rate_limit_wait)
+            profile.prompt_tokens += prompt_tokens or 0
+            profile.response_tokens += response_tokens or 0
+            profile.cost += estimate_cost(model_name, prompt_tokens or 0, response_tokens or 0)
+            profile.models[model_name] += 1
+
+    def record_cache_hit(self):
+        """Record a call served from the response cache."""
+        test_id = current_test_id.get()
+        if test_id is None:
+            return
+        with self._lock:
+            self._node(test_id, current_node.get()).cache_hits += 1
+
+    def record_node(self, test_id: Optional[str], node: str, wall_time: float):
+        """Record one execution of a graph node.
+
+        Args:
+            test_id: Test the node ran for (None skips recording)
+            node: Node name
+            wall_time: Seconds the node took
+        """
+        if test_id is None:
+            return
+        with self._lock:
+            profile = self._node(test_id, node)
+            profile.runs += 1
+            profile.wall_time += wall_time
+
+    def get_profile(self, test_id: str) -> Optional[dict]:
+        """Summarize a test's metrics per node and in total.
+
+        Args:
+            test_id: Test identifier
+
+        Returns:
+            Profile dict, or None if nothing was recorded for the test
+        """
+        with self._lock:
+            nodes = self._tests.get(test_id)
+            if nodes is None:
+                return None
+
+            totals = _NodeProfile()
+            for profile in nodes.values():
+                totals.calls += profile.calls
+                totals.failed_calls += profile.failed_calls
+                totals.retries += profile.retries
+                totals.cache_hits += profile.cache_hits
+                totals.latencies.extend(profile.latencies)
+                totals.queue_waits.extend(profile.queue_waits)
+                totals.rate_limit_waits.extend(profile.rate_limit_waits)
+                totals.prompt_tokens += profile.prompt_tokens
+                totals.response_tokens += profile.response_tokens
+                totals.cost += profile.cost
+                for model, count in profile.models.items():
+                    totals.models[model] += count
+            totals.runs = sum(p.runs for p in nodes.values())
+            totals.wall_time = sum(p.wall_time for p in nodes.values())
+
+            return {
+                "test_id": test_id,
+                "started_at": self._started_at[test_id],
+                "nodes": {name: profile.summary() for name, profile in nodes.items()},
+                "totals": totals.summary(),
+            }
+
+    def pop_profile(self, test_id: str) -> Optional[dict]:
+        """Summarize a test's metrics and stop tracking it.
+
+        Args:
+            test_id: Test identifier
+
+        Returns:
+            Profile dict, or None if nothing was recorded for the test
+        """
+        profile = self.get_profile(test_id)
+        with self._lock:
+            self._tests.pop(test_id, None)
+            self._started_at.pop(test_id, None)
+        return profile
+
+
+# Global instance
+call_profiler = CallProfiler()
@@ -265,7 +265,11 @@ You are now chatting with someone who wants to understand your perspective on th
 
         # Generate response (non-JSON mode for natural conversation)
         response = await self.gemini.generate_async(
-            prompt=prompt, temperature=0.8, json_mode=False
+            prompt=prompt,
+            temperature=0.8,
+            json_mode=False,
+            cache_tag="chat",
+            use_cache=False,  # Conversations should not replay canned answers
         )
 
         return response.strip()
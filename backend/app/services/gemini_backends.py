@@ -0,0 +1,617 @@
+"""Transport backends used by GeminiClient.
+
+The client handles caching, rate limiting, retries and hedging; a backend
+only performs the blocking calls. ``GoogleGenAIBackend`` talks to the real
+API, ``FakeGeminiBackend`` answers offline with schema-valid JSON so the
+pipeline can be benchmarked without network access.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Optional
+
+import google.generativeai as genai
+from google.generativeai.types import GenerationConfig
+
+from app.config import settings
+
+
+class BackendResponse:
+    """Normalized result of a generate call."""
+
+    def __init__(
+        self,
+        text: str,
+        finish_reason: Optional[str] = "STOP",
+        prompt_tokens: Optional[int] = None,
+        response_tokens: Optional[int] = None,
+    ):
+        """Initialize the response.
+
+        Args:
+            text: Generated text
+            finish_reason: Why generation stopped (e.g. "STOP", "MAX_TOKENS"),
+                None if unknown
+            prompt_tokens: Input tokens reported by the backend, if known
+            response_tokens: Output tokens reported by the backend, if known
+        """
+        self.text = text
+        self.finish_reason = finish_reason
+        self.prompt_tokens = prompt_tokens
+        self.response_tokens = response_tokens
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        """Total tokens, or None if the backend did not report usage."""
+        if self.prompt_tokens is None and self.response_tokens is None:
+            return None
+        return (self.prompt_tokens or 0) + (self.response_tokens or 0)
+
+
+def output_timeout(timeout: float, max_output_tokens: Optional[int]) -> float:
+    """Stretch a call timeout so the call has time to generate its whole output.
+
+    Args:
+        timeout: Timeout for an ordinary call, in seconds
+        max_output_tokens: Output cap of the call, if any
+
+    Returns:
+        The timeout, raised to how long max_output_tokens take at
+        GEMINI_MIN_OUTPUT_RATE tokens per second
+    """
+    if not max_output_tokens:
+        return timeout
+    return max(timeout, max_output_tokens / settings.GEMINI_MIN_OUTPUT_RATE)
+
+
+class GeminiBackend:
+    """Interface for the blocking calls GeminiClient runs on its thread pools."""
+
+    name = "base"
+
+    # Whether calls need the real video bytes (False skips download and hashing)
+    uses_media = True
+
+    def generate(self, model_name: str, contents: Any, config_params: dict) -> BackendResponse:
+        """Generate content.
+
+        Args:
+            model_name: Model to use
+            contents: Prompt string, or a list of [file handle, prompt]
+            config_params: GenerationConfig parameters
+
+        Returns:
+            BackendResponse with the generated text
+        """
+        raise NotImplementedError
+
+    def upload_file(self, file_path: str) -> Any:
+        """Upload a media file and return its handle."""
+        raise NotImplementedError
+
+    def get_file(self, file_name: str) -> Any:
+        """Fetch the current handle (and processing state) of an uploaded file."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+
+class GoogleGenAIBackend(GeminiBackend):
+    """Backend calling the Gemini API through google-generativeai."""
+
+    name = "google"
+
+    def __init__(
+        self, api_key: str, preload_models: list[str], request_timeout: Optional[float] = None
+    ):
+        """Configure the SDK and pre-build model handles.
+
+        Args:
+            api_key: Gemini API key
+            preload_models: Models to create handles for at startup
+            request_timeout: HTTP timeout per request in seconds, so a hung
+                request frees its worker thread (None = SDK default); requests
+                allowing long outputs get longer (see output_timeout)
+        """
+        genai.configure(api_key=api_key)
+        self._request_timeout = request_timeout
+
+        # Pre-built model handles and generation configs reused on every call
+        self._models: dict[str, genai.GenerativeModel] = {}
+        self._generation_configs: dict[tuple, GenerationConfig] = {}
+        for model_name in preload_models:
+            self.get_model(model_name)
+
+    def get_model(self, model_name: str) -> genai.GenerativeModel:
+        """Get the shared model handle for a model name, creating it once.
+
+        Args:
+            model_name: Model to use
+
+        Returns:
+            Cached GenerativeModel instance
+        """
+        model = self._models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            self._models[model_name] = model
+        return model
+
+    def get_generation_config(self, **params) -> GenerationConfig:
+        """Get a shared GenerationConfig for a set of parameters, creating it once.
+
+        Args:
+            **params: GenerationConfig keyword arguments
+
+        Returns:
+            Cached GenerationConfig instance
+        """
+        key = tuple(sorted(params.items()))
+        config = self._generation_configs.get(key)
+        if config is None:
+            config = GenerationConfig(**params)
+            self._generation_configs[key] = config
+        return config
+
+    def generate(self, model_name: str, contents: Any, config_params: dict) -> BackendResponse:
+        request_options = None
+        if self._request_timeout:
+            request_options = {
+                "timeout": output_timeout(
+                    self._request_timeout, config_params.get("max_output_tokens")
+                )
+            }
+        response = self.get_model(model_name).generate_content(
+            contents,
+            generation_config=self.get_generation_config(**config_params),
+            request_options=request_options,
+        )
+
+        finish_reason = "STOP"
+        candidates = getattr(response, "candidates", None)
+        if candidates:
+            reason = getattr(candidates[0], "finish_reason", None)
+            finish_reason = getattr(reason, "name", str(reason)) if reason is not None else "STOP"
+
+        usage = getattr(response, "usage_metadata", None)
+        return BackendResponse(
+            text=response.text,
+            finish_reason=finish_reason,
+            prompt_tokens=getattr(usage, "prompt_token_count", None) if usage else None,
+            response_tokens=getattr(usage, "candidates_token_count", None) if usage else None,
+        )
+
+    def upload_file(self, file_path: str) -> Any:
+        return genai.upload_file(file_path)
+
+    def get_file(self, file_name: str) -> Any:
+        return genai.get_file(file_name)
+
+
+class _FakeFileState:
+    """Processing state of a fake uploaded file."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _FakeFile:
+    """Handle of a fake uploaded file."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = _FakeFileState("ACTIVE")
+        self.expiration_time = None
+
+
+class FakeGeminiBackend(GeminiBackend):
+    """Offline stand-in that returns schema-valid JSON for every pipeline prompt.
+
+    Responses are derived deterministically from a hash of the prompt and the
+    configured seed. Latency follows a log-normal distribution, and a
+    configurable fraction of calls fail or come back truncated, so retry,
+    hedging and fallback paths are exercised like they are in production.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_median: float,
+        latency_sigma: float,
+        error_rate: float,
+        truncation_rate: float,
+        seed: int,
+    ):
+        """Initialize the fake backend.
+
+        Args:
+            latency_median: Median call latency in seconds
+            latency_sigma: Log-normal shape parameter (0 = constant latency)
+            error_rate: Fraction of calls that raise an error
+            truncation_rate: Fraction of calls whose output is cut off
+            seed: Seed for responses, latencies and failures
+        """
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.truncation_rate = truncation_rate
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._file_count = 0
+
+    def _draw(self) -> tuple[float, float, float]:
+        """Draw latency, error and truncation samples from the shared RNG."""
+        with self._rng_lock:
+            latency = self.latency_median * self._rng.lognormvariate(0, self.latency_sigma)
+            return latency, self._rng.random(), self._rng.random()
+
+    def generate(self, model_name: str, contents: Any, config_params: dict) -> BackendResponse:
+        latency, error_draw, truncation_draw = self._draw()
+        time.sleep(latency)
+
+        if error_draw < self.error_rate:
+            raise Exception("503 Service Unavailable (fake backend)")
+
+        is_video = isinstance(contents, list)
+        prompt = contents[-1] if is_video else contents
+        rng = random.Random(
+            f"{self.seed}:{model_name}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}"
+        )
+
+        if config_params.get("response_mime_type") != "application/json":
+            text = rng.choice(
+                [
+                    "Honestly, it caught my eye because it felt genuine.",
+                    "I scrolled past at first, but a friend's share made me look again.",
+                    "It just wasn't really my thing, to be honest.",
+                ]
+            )
+        else:
+            text = json.dumps(self._respond(prompt, is_video, rng))
+
+        finish_reason = "STOP"
+        if truncation_draw < self.truncation_rate and len(text) > 20:
+            text = text[: rng.randint(len(text) // 2, len(text) - 2)]
+            finish_reason = "MAX_TOKENS"
+
+        return BackendResponse(
+            text=text,
+            finish_reason=finish_reason,
+            prompt_tokens=len(prompt) // 4,
+            response_tokens=len(text) // 4,
+        )
+
+    def upload_file(self, file_path: str) -> Any:
+        with self._rng_lock:
+            self._file_count += 1
+            return _FakeFile(f"files/fake-{self._file_count}")
+
+    def get_file(self, file_name: str) -> Any:
+        return _FakeFile(file_name)
+
+    # ------------------------------------------------------------------
+    # Response builders, one per node prompt
+    # ------------------------------------------------------------------
+
+    def _respond(self, prompt: str, is_video: bool, rng: random.Random) -> Any:
+        """Pick the response builder matching the node that issued the prompt."""
+        if is_video:
+            return self._video_analysis(rng)
+        if "<text_content>" in prompt:
+            return self._text_analysis(rng)
+        if "<simulation_results>" in prompt:
+            return self._platform_prediction(rng)
+        if "<network_interactions>" in prompt:
+            return self._second_reaction(prompt, rng)
+        if "<network>" in prompt and "<initial_reactions>" in prompt:
+            return self._interactions(prompt, rng)
+        if "persona IDs:" in prompt:
+            ids = re.search(r"persona IDs: (.*)", prompt).group(1).strip().split(", ")
+            return {"reactions": [self._initial_reaction(pid, 0.5, rng) for pid in ids]}
+        if "<personas>" in prompt:
+            return self._network(prompt, rng)
+        if "<persona>" in prompt:
+            persona_id = re.search(r'"persona_id": "([^"]+)"', prompt).group(1)
+            likelihood = re.search(r'"engagement_likelihood": ([\d.]+)', prompt)
+            return self._initial_reaction(
+                persona_id, float(likelihood.group(1)) if likelihood else 0.5, rng
+            )
+        return {"result": "ok"}
+
+    @staticmethod
+    def _section(prompt: str, tag: str) -> str:
+        """Get the text between <tag> and </tag>."""
+        start = prompt.index(f"<{tag}>") + len(tag) + 2
+        return prompt[start:prompt.index(f"</{tag}>", start)].strip()
+
+    def _initial_reaction(self, persona_id: str, likelihood: float, rng: random.Random) -> dict:
+        probability = round(min(1.0, max(0.0, rng.gauss(likelihood * 0.6, 0.2))), 2)
+        will_like = probability > 0.5
+        will_comment = probability > 0.7 and rng.random() < 0.5
+        return {
+            "persona_id": persona_id,
+            "will_view": probability > 0.1,
+            "will_like": will_like,
+            "will_share": probability > 0.75,
+            "will_comment": will_comment,
+            "engagement_probability": probability,
+            "reaction_time": round(rng.uniform(1, 120), 1),
+            "reasoning": "I reacted based on how well this matches my interests.",
+            "sentiment": "positive" if will_like else rng.choice(["neutral", "negative"]),
+            "comment_text": "Love this!" if will_comment else None,
+        }
+
+    def _second_reaction(self, prompt: str, rng: random.Random) -> dict:
+        persona_id = re.search(r'"persona_id": "([^"]+)"', prompt).group(1)
+        try:
+            initial = json.loads(self._section(prompt, "initial_reaction"))
+        except Exception:
+            initial = {}
+
+        initial_probability = float(initial.get("engagement_probability", 0.3))
+        influenced = "Received" in self._section(prompt, "network_interactions")
+        influence = round(rng.uniform(0.2, 0.8), 2) if influenced else round(rng.uniform(0, 0.2), 2)
+        final_probability = round(min(1.0, initial_probability + influence * 0.3), 2)
+
+        return {
+            "persona_id": persona_id,
+            "will_view": True,
+            "will_like": final_probability > 0.5,
+            "will_share": final_probability > 0.75,
+            "will_comment": bool(initial.get("will_comment", False)),
+            "influence_level": influence,
+            "changed_from_initial": (final_probability > 0.5) != (initial_probability > 0.5),
+            "social_proof_factors": ["friends engaged"] if influenced else [],
+            "reasoning": "Seeing my network engage nudged my opinion.",
+            "updated_sentiment": "positive" if final_probability > 0.5 else "neutral",
+            "comment_text": initial.get("comment_text"),
+            "initial_engagement_probability": initial_probability,
+            "final_engagement_probability": final_probability,
+        }
+
+    def _network(self, prompt: str, rng: random.Random) -> dict:
+        ids = re.findall(r"^- ([^:\s]+):", self._section(prompt, "personas"), re.MULTILINE)
+        if len(ids) < 2:
+            return {"edges": [], "clusters": [], "influence_hubs": []}
+
+        edge_count = min(250, max(len(ids), len(ids) * 2))
+        edges = []
+        for _ in range(edge_count):
+            source, target = rng.sample(ids, 2)
+            edges.append(
+                {
+                    "source": source,
+                    "target": target,
+                    "strength": round(rng.uniform(0.2, 1.0), 2),
+                    "connection_type": rng.choice(
+                        ["close_friend", "acquaintance", "follower", "colleague"]
+                    ),
+                }
+            )
+
+        cluster_count = min(5, len(ids))
+        clusters = [
+            {"cluster_id": f"cluster_{i + 1}", "members": ids[i::cluster_count]}
+            for i in range(cluster_count)
+        ]
+        hubs = [
+            {
+                "persona_id": pid,
+                "influence_score": round(rng.uniform(0.6, 0.95), 2),
+                "reach": rng.randint(5, 30),
+            }
+            for pid in rng.sample(ids, min(4, len(ids)))
+        ]
+
+        return {"edges": edges, "clusters": clusters, "influence_hubs": hubs}
+
+    def _interactions(self, prompt: str, rng: random.Random) -> dict:
+        try:
+            network = json.loads(self._section(prompt, "network"))
+            reactions = json.loads(self._section(prompt, "initial_reactions"))
+        except Exception:
+            network, reactions = {"edges": []}, []
+
+        sharers = {r["persona_id"] for r in reactions if r.get("will_share")}
+        candidate_edges = [e for e in network.get("edges", []) if e.get("source") in sharers]
+        sampled = rng.sample(candidate_edges, min(25, len(candidate_edges)))
+
+        events = []
+        sharing_map: dict[str, list[str]] = {}
+        for i, edge in enumerate(sampled):
+            events.append(
+                {
+                    "event_id": f"evt_{i + 1:03d}",
+                    "timestamp": round(rng.uniform(0, 600), 1),
+                    "source_persona_id": edge["source"],
+                    "target_persona_id": edge["target"],
+                    "interaction_type": rng.choice(["share", "discuss", "comment", "influence"]),
+                    "content": "You have to see this",
+                    "influence_strength": round(rng.uniform(0.2, 0.9), 2),
+                    "target_response": "Took a look",
+                }
+            )
+            sharing_map.setdefault(edge["source"], []).append(edge["target"])
+
+        return {
+            "events": events,
+            "influence_chains": [],
+            "sharing_map": sharing_map,
+            "propagation_stages": [],
+            "total_interactions": len(events),
+            "unique_sharers": len(sharing_map),
+            "avg_influence_per_interaction": round(
+                sum(e["influence_strength"] for e in events) / len(events), 2
+            )
+            if events
+            else 0.0,
+            "max_chain_length": 1 if events else 0,
+        }
+
+    def _platform_prediction(self, rng: random.Random) -> dict:
+        views = rng.randint(5_000, 500_000)
+        return {
+            "predicted_views": views,
+            "predicted_views_range": f"{int(views * 0.8):,} - {int(views * 1.2):,}",
+            "predicted_likes": int(views * 0.06),
+            "predicted_comments": int(views * 0.005),
+            "predicted_shares": int(views * 0.003),
+            "predicted_saves": int(views * 0.02),
+            "predicted_engagement_rate": round(rng.uniform(0.02, 0.1), 3),
+            "virality_score": rng.randint(1, 10),
+            "reach_estimate": f"{views // 1000}K",
+            "performance_tier": rng.choice(["Above Average", "Average", "Below Average"]),
+            "content_strengths": ["Clear hook"],
+            "content_weaknesses": ["Pacing"],
+            "recommendations": ["Post in the evening"],
+            "audience_breakdown": {
+                "primary_age_group": "18-24",
+                "primary_interests": ["lifestyle"],
+                "engagement_hotspots": "Opening seconds",
+            },
+            "comparison_to_user_average": "In line with your typical performance",
+            "best_time_to_post": "Weekdays, 7-8 PM",
+            "confidence_level": "Medium",
+            "key_insight": "Offline benchmark prediction.",
+        }
+
+    def _video_analysis(self, rng: random.Random) -> dict:
+        return {
+            "topics_and_themes": ["lifestyle", "daily routine"],
+            "visual_style_and_quality": {
+                "style": "handheld vertical video",
+                "quality": rng.choice(["medium", "high"]),
+                "colors": ["warm"],
+                "production_notes": "Natural lighting",
+            },
+            "audio_description": {
+                "speech_present": True,
+                "speech_description": "Casual narration",
+                "music_present": True,
+                "music_description": "Upbeat background track",
+                "overall_audio_quality": "medium",
+            },
+            "transcript": "Here's how I start my day.",
+            "mood_and_tone": {
+                "mood": "energetic",
+                "emotional_tone": "upbeat",
+                "vibe": "friendly",
+            },
+            "content_category": "lifestyle",
+            "hook_effectiveness": {
+                "first_3_seconds": "Creator speaks directly to camera",
+                "hook_strength": rng.randint(40, 90),
+                "attention_grabbing": "somewhat",
+                "hook_type": "statement",
+            },
+            "ctas_present": {"has_cta": False, "cta_type": "none", "cta_description": None},
+            "key_objects_and_activities": {
+                "objects": ["coffee cup"],
+                "activities": ["talking"],
+                "people": ["one creator"],
+                "setting": "kitchen",
+            },
+        }
+
+    def _text_analysis(self, rng: random.Random) -> dict:
+        return {
+            "topics_and_themes": ["career", "product launch"],
+            "writing_style_and_quality": {
+                "style": "professional",
+                "quality": "high",
+                "tone": "inspirational",
+                "readability": "easy",
+            },
+            "sentiment_analysis": {
+                "overall_sentiment": "positive",
+                "emotional_tone": "excited",
+                "mood": "enthusiastic",
+            },
+            "content_category": "business",
+            "engagement_potential": {
+                "hook_strength": rng.randint(40, 90),
+                "opening_line": "Excited to share some news.",
+                "attention_grabbing": "somewhat",
+                "shareability": rng.randint(20, 80),
+                "comment_likelihood": rng.randint(10, 60),
+            },
+            "ctas_present": {"has_cta": False, "cta_type": "none", "cta_description": None},
+            "key_points_and_takeaways": {
+                "main_message": "A team milestone",
+                "key_points": ["launch", "teamwork"],
+                "value_proposition": "Inspiration",
+            },
+            "target_audience": {
+                "primary_audience": "professionals",
+                "professional_level": "all",
+                "industry_relevance": ["tech"],
+            },
+            "content_structure": {
+                "has_hashtags": False,
+                "hashtags": None,
+                "has_mentions": False,
+                "has_links": False,
+                "length_category": "short",
+                "formatting": "paragraphs",
+            },
+        }
+
+
+def create_backend(name: str) -> GeminiBackend:
+    """Create the backend selected by settings.GEMINI_BACKEND.
+
+    When settings.GEMINI_CASSETTE_MODE is "record" the backend is wrapped to
+    record every call; when it is "replay" calls are served from the cassette
+    and the named backend is not used.
+
+    Args:
+        name: Backend name ("google" or "fake")
+
+    Returns:
+        Configured backend instance
+
+    Raises:
+        ValueError: If the backend name or cassette mode is unknown
+    """
+    from app.services.gemini_cassette import RecordingBackend, ReplayBackend
+
+    mode = settings.GEMINI_CASSETTE_MODE
+    if mode == "replay":
+        return ReplayBackend(settings.GEMINI_CASSETTE_PATH, settings.GEMINI_REPLAY_LATENCY)
+
+    backend = _create_base_backend(name)
+    if mode == "record":
+        return RecordingBackend(backend, settings.GEMINI_CASSETTE_PATH)
+    if mode:
+        raise ValueError(f"Unknown cassette mode: {mode}")
+    return backend
+
+
+def _create_base_backend(name: str) -> GeminiBackend:
+    """Create the transport backend for a backend name."""
+    if name == "google":
+        return GoogleGenAIBackend(
+            api_key=settings.GEMINI_API_KEY,
+            preload_models=[
+                settings.GEMINI_MODEL,
+                settings.GEMINI_FAST_MODEL,
+                *settings.GEMINI_RATE_LIMITS,
+            ],
+            request_timeout=settings.GEMINI_TIMEOUT,
+        )
+    if name == "fake":
+        return FakeGeminiBackend(
+            latency_median=settings.FAKE_GEMINI_LATENCY_MEDIAN,
+            latency_sigma=settings.FAKE_GEMINI_LATENCY_SIGMA,
+            error_rate=settings.FAKE_GEMINI_ERROR_RATE,
+            truncation_rate=settings.FAKE_GEMINI_TRUNCATION_RATE,
+            seed=settings.FAKE_GEMINI_SEED,
+        )
+    raise ValueError(f"Unknown Gemini backend: {name}")
@@ -0,0 +1,219 @@
+"""Record/replay cassettes of Gemini calls for full pipeline runs."""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any
+
+from app.services.gemini_backends import BackendResponse, GeminiBackend, _FakeFile
+
+
+def cassette_key(model_name: str, contents: Any, config_params: dict) -> str:
+    """Build the key a call is matched on when replaying.
+
+    Video inputs are matched by prompt only: uploaded file names differ
+    between runs, but the prompt and config identify the call.
+
+    Args:
+        model_name: Model the call was made against
+        contents: Prompt string, or a list of [file handle, prompt]
+        config_params: GenerationConfig parameters
+
+    Returns:
+        Hex SHA-256 key
+    """
+    is_video = isinstance(contents, list)
+    prompt = contents[-1] if is_video else contents
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "prompt": prompt,
+            "config": config_params,
+            "video": is_video,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecordingBackend(GeminiBackend):
+    """Wraps a backend and appends every generate call to a gzip JSONL cassette.
+
+    Each entry holds the call key, prompt hash, model, config, latency and
+    either the response payload or the error message, so replays reproduce
+    retries as well as successes.
+    """
+
+    name = "record"
+
+    def __init__(self, inner: GeminiBackend, cassette_path: str):
+        """Initialize the recorder and open the cassette for writing.
+
+        Args:
+            inner: Backend that performs the real calls
+            cassette_path: Output .jsonl.gz file (overwritten)
+        """
+        self.inner = inner
+        self.cassette_path = Path(cassette_path)
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.cassette_path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.recorded = 0
+        print(f"[GeminiCassette] Recording Gemini calls to {self.cassette_path}")
+
+    def _write(self, entry: dict):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps(entry) + "\n")
+            self.recorded += 1
+
+    def generate(self, model_name: str, contents: Any, config_params: dict) -> BackendResponse:
+        is_video = isinstance(contents, list)
+        prompt = contents[-1] if is_video else contents
+        entry = {
+            "key": cassette_key(model_name, contents, config_params),
+            "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "model": model_name,
+            "config": config_params,
+            "video": is_video,
+            "recorded_at": time.time(),
+        }
+
+        started_at = time.perf_counter()
+        try:
+            response = self.inner.generate(model_name, contents, config_params)
+        except Exception as e:
+            entry["latency"] = time.perf_counter() - started_at
+            entry["error"] = str(e)
+            self._write(entry)
+            raise
+
+        entry["latency"] = time.perf_counter() - started_at
+        entry["response"] = {
+            "text": response.text,
+            "finish_reason": response.finish_reason,
+            "prompt_tokens": response.prompt_tokens,
+            "response_tokens": response.response_tokens,
+        }
+        self._write(entry)
+        return response
+
+    def upload_file(self, file_path: str) -> Any:
+        return self.inner.upload_file(file_path)
+
+    def get_file(self, file_name: str) -> Any:
+        return self.inner.get_file(file_name)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                print(
+                    f"[GeminiCassette] Saved {self.recorded} calls to {self.cassette_path}"
+                )
+        self.inner.close()
+
+
+class ReplayBackend(GeminiBackend):
+    """Serves generate calls from a recorded cassette without network access.
+
+    Entries are replayed per key in recording order; once a key's entries are
+    used up its last successful response is repeated. Uploads return local
+    stand-in handles.
+    """
+
+    name = "replay"
+    uses_media = False
+
+    def __init__(self, cassette_path: str, latency: str = "original"):
+        """Load a cassette.
+
+        Args:
+            cassette_path: Cassette written by RecordingBackend
+            latency: "original" to sleep for the recorded latency, "zero" to answer immediately
+
+        Raises:
+            FileNotFoundError: If the cassette does not exist
+            ValueError: If the latency mode is unknown
+        """
+        if latency not in ("original", "zero"):
+            raise ValueError(f"Unknown replay latency mode: {latency}")
+
+        self.cassette_path = Path(cassette_path)
+        self.latency = latency
+        self._queues: dict[str, deque] = defaultdict(deque)
+        self._last: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        count = 0
+        with gzip.open(self.cassette_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._queues[entry["key"]].append(entry)
+                    count += 1
+
+        print(
+            f"[GeminiCassette] Replaying {count} calls from {self.cassette_path} "
+            f"(latency: {latency})"
+        )
+
+    def _next_entry(self, key: str) -> dict:
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                entry = queue.popleft()
+                if "response" in entry:
+                    self._last[key] = entry
+                self.hits += 1
+                return entry
+            if key in self._last:
+                self.hits += 1
+                return self._last[key]
+            self.misses += 1
+            return None
+
+    def generate(self, model_name: str, contents: Any, config_params: dict) -> BackendResponse:
+        entry = self._next_entry(cassette_key(model_name, contents, config_params))
+        if entry is None:
+            raise Exception("No recorded response for this request in the cassette")
+
+        if self.latency == "original":
+            time.sleep(entry.get("latency", 0))
+
+        if "error" in entry:
+            raise Exception(entry["error"])
+
+        response = entry["response"]
+        return BackendResponse(
+            text=response["text"],
+            finish_reason=response.get("finish_reason", "STOP"),
+            prompt_tokens=response.get("prompt_tokens"),
+            response_tokens=response.get("response_tokens"),
+        )
+
+    def upload_file(self, file_path: str) -> Any:
+        return _FakeFile(f"files/replay-{Path(file_path).name}")
+
+    def get_file(self, file_name: str) -> Any:
+        return _FakeFile(file_name)
+
+    def get_stats(self) -> dict:
+        """Get replay hit/miss counters.
+
+        Returns:
+            Dict with hits, misses and unused recorded entries
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "unused": sum(len(q) for q in self._queues.values()),
+            }
@@ -1,14 +1,161 @@
 """Gemini API client wrapper with async support and rate limiting."""
 
 import asyncio
+import contextlib
+import contextvars
+import hashlib
 import json
-from typing import Optional, Any
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Awaitable, Callable
 from pathlib import Path
 
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
+import aiohttp
 
 from app.config import settings
+from app.services.gemini_backends import (
+    BackendResponse,
+    GeminiBackend,
+    create_backend,
+    output_timeout,
+)
+from app.services.call_profiler import call_profiler
+from app.services.llm_json import salvage_json
+from app.services.response_cache import ResponseCache
+from app.services.video_file_registry import VideoFileRegistry
+from app.services.rate_limiter import (
+    ModelRateLimiter,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
+
+
+# Output tokens reserved per call when no max_output_tokens is given
+DEFAULT_OUTPUT_TOKEN_ESTIMATE = 1024
+
+# Rough token cost of a short video input (~258 tokens per second of video)
+VIDEO_TOKEN_ESTIMATE = 20_000
+
+
+class CallShare:
+    """One run's share of a SharedCallSlots; held around each backend attempt."""
+
+    def __init__(self, slots: "SharedCallSlots"):
+        self.slots = slots
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+
+    async def __aenter__(self):
+        await self.slots.acquire(self)
+
+    async def __aexit__(self, *exc_info):
+        self.slots.release(self)
+
+
+class SharedCallSlots:
+    """Call slots shared fairly by several runs of one job.
+
+    A freed slot goes to the waiting run with the fewest calls in flight,
+    so busy runs progress at the same pace, and slots an idle or finished
+    run is not using go to the others instead of sitting unused.
+    """
+
+    def __init__(self, slots: int):
+        """Initialize the slots.
+
+        Args:
+            slots: Calls that may be in flight at once across all runs
+        """
+        self.free = slots
+        self.shares: list[CallShare] = []
+
+    def share(self) -> CallShare:
+        """Create a share for one run."""
+        share = CallShare(self)
+        self.shares.append(share)
+        return share
+
+    async def acquire(self, share: CallShare):
+        """Wait for a slot for one of the share's calls."""
+        if self.free > 0 and not any(other.waiters for other in self.shares):
+            self.free -= 1
+            share.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        share.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the caller was cancelled; pass the slot on
+                self.release(share)
+            elif waiter in share.waiters:
+                share.waiters.remove(waiter)
+            raise
+
+    def release(self, share: CallShare):
+        """Return a slot and hand it to the run that is furthest behind."""
+        share.in_flight -= 1
+        self.free += 1
+        while self.free > 0:
+            waiting = [other for other in self.shares if other.waiters]
+            if not waiting:
+                return
+            taker = min(waiting, key=lambda other: other.in_flight)
+            waiter = taker.waiters.popleft()
+            if waiter.done():
+                # Its caller was cancelled
+                continue
+            self.free -= 1
+            taker.in_flight += 1
+            waiter.set_result(None)
+
+
+# Optional share of call slots the current task (and the tasks it starts)
+# draws on. Runs sharing the client with other runs in the same job each get
+# a share of one SharedCallSlots so none can crowd the others out of the pools.
+call_share: contextvars.ContextVar[Optional[CallShare]] = contextvars.ContextVar(
+    "call_share", default=None
+)
+
+# Optional time.monotonic() by which the current task's calls must finish.
+# Nodes set it from the test's deadline; each attempt times out at whichever
+# comes first of it and GEMINI_TIMEOUT (longer for calls allowing long
+# outputs), and no retry starts once it passes.
+call_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "call_deadline", default=None
+)
+
+
+class BudgetExhausted(TimeoutError):
+    """Raised when the current task's time budget runs out."""
+
+
+def remaining_budget() -> Optional[float]:
+    """Get the seconds left before the current call deadline (None = no deadline)."""
+    deadline = call_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class _AttemptTracker:
+    """Tracks when a call's backend attempts are executing, for hedge timing."""
+
+    def __init__(self):
+        self.running = asyncio.Event()
+        self.attempts = 0
+
+    def started(self):
+        """Mark an attempt as picked up by a pool worker."""
+        self.attempts += 1
+        self.running.set()
+
+    def finished(self):
+        """Mark the current attempt as done (or abandoned)."""
+        self.running.clear()
 
 
 class GeminiClient:
@@ -19,6 +166,10 @@ class GeminiClient:
         api_key: Optional[str] = None,
         model_name: Optional[str] = None,
         max_concurrent: Optional[int] = None,
+        text_workers: Optional[int] = None,
+        upload_workers: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+        backend: Optional[GeminiBackend] = None,
     ):
         """Initialize the Gemini client.
 
@@ -26,19 +177,239 @@ class GeminiClient:
             api_key: Gemini API key (defaults to settings.GEMINI_API_KEY)
             model_name: Model to use (defaults to settings.GEMINI_MODEL)
             max_concurrent: Max concurrent API calls (defaults to settings.GEMINI_MAX_CONCURRENT)
+            text_workers: Threads for text generation calls (defaults to max_concurrent)
+            upload_workers: Threads for video upload/processing calls
+                (defaults to settings.GEMINI_UPLOAD_WORKERS)
+            response_cache: Response cache to use (defaults to an on-disk cache
+                when settings.GEMINI_CACHE_ENABLED is set, otherwise no caching;
+                never used while recording a cassette)
+            backend: Transport for the blocking calls (defaults to the backend
+                named by settings.GEMINI_BACKEND)
         """
         self.api_key = api_key or settings.GEMINI_API_KEY
         self.model_name = model_name or settings.GEMINI_MODEL
         self.max_concurrent = max_concurrent or settings.GEMINI_MAX_CONCURRENT
+        self.text_workers = text_workers or settings.GEMINI_TEXT_WORKERS or self.max_concurrent
+        self.upload_workers = upload_workers or settings.GEMINI_UPLOAD_WORKERS
+
+        # Blocking transport: the real API, or the offline fake for benchmarks
+        self.backend = backend or create_backend(settings.GEMINI_BACKEND)
+
+        # Per-model RPM/TPM budgets (concurrency is bounded by the thread pools)
+        self.rate_limiter = ModelRateLimiter(
+            limits=settings.GEMINI_RATE_LIMITS,
+            default_rpm=settings.GEMINI_DEFAULT_RPM,
+            default_tpm=settings.GEMINI_DEFAULT_TPM,
+        )
+
+        # Dedicated thread pools for the blocking SDK calls. The default loop
+        # executor is capped at min(32, cpu+4) threads, which silently limits
+        # concurrency well below max_concurrent. Uploads get their own pool so
+        # long video transfers never starve the persona fan-out.
+        self.executors = {
+            "text": ThreadPoolExecutor(
+                max_workers=self.text_workers, thread_name_prefix="gemini-text"
+            ),
+            "upload": ThreadPoolExecutor(
+                max_workers=self.upload_workers, thread_name_prefix="gemini-upload"
+            ),
+        }
+        self.executor_stats = {
+            name: {"calls": 0, "total_wait": 0.0, "max_wait": 0.0, "in_flight": 0}
+            for name in self.executors
+        }
+
+        # Optional response cache for reruns of identical prompts
+        if response_cache is None and settings.GEMINI_CACHE_ENABLED:
+            response_cache = ResponseCache(
+                cache_dir=settings.GEMINI_CACHE_DIR,
+                ttl_seconds=settings.GEMINI_CACHE_TTL,
+                max_memory_entries=settings.GEMINI_CACHE_MEMORY_ENTRIES,
+                max_disk_entries=settings.GEMINI_CACHE_MAX_DISK_ENTRIES,
+            )
+        # A cassette must hold every call; cache hits would never reach the
+        # recording backend and the replay would miss them
+        if response_cache is not None and settings.GEMINI_CASSETTE_MODE == "record":
+            print("[GeminiClient] Recording a cassette, response cache disabled")
+            response_cache.close()
+            response_cache = None
+        self.response_cache = response_cache
+
+        # Processed video uploads keyed by content hash / R2 ETag
+        self.video_registry = VideoFileRegistry(
+            registry_path=settings.GEMINI_VIDEO_REGISTRY_PATH,
+            default_ttl_seconds=settings.GEMINI_FILE_TTL,
+        )
+
+        # Identical requests currently in flight, keyed like the response cache
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._in_flight_waiters: dict[str, int] = defaultdict(int)
+        self.single_flight_stats = {"leaders": 0, "coalesced": 0}
+
+        # Recent call latencies per model, used to decide when to hedge
+        self._latencies: dict[str, deque] = defaultdict(lambda: deque(maxlen=500))
+        self.hedge_stats = {"hedged": 0, "hedge_won": 0}
+
+        # Shared HTTP session for video downloads (created inside the event loop)
+        self._http_session: Optional[aiohttp.ClientSession] = None
+
+    async def _run_blocking(
+        self,
+        pool: str,
+        func: Callable[[], Any],
+        timing: Optional[dict] = None,
+        tracker: Optional[_AttemptTracker] = None,
+    ) -> Any:
+        """Run a blocking SDK call on one of the client-owned thread pools.
+
+        Records how long the call waited in the pool queue before a worker
+        picked it up.
+
+        Args:
+            pool: Executor name ("text" or "upload")
+            func: Zero-argument callable to run
+            timing: Optional dict that receives "queue_wait" and "latency" (seconds)
+            tracker: Optional tracker told when a worker starts and the call ends
+
+        Returns:
+            The callable's return value
+        """
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+
+        def timed_call():
+            started_at = time.perf_counter()
+            if tracker is not None:
+                loop.call_soon_threadsafe(tracker.started)
+            try:
+                return started_at - submitted_at, func()
+            finally:
+                if timing is not None:
+                    timing["queue_wait"] = started_at - submitted_at
+                    timing["latency"] = time.perf_counter() - started_at
+
+        stats = self.executor_stats[pool]
+        stats["in_flight"] += 1
+        try:
+            queue_wait, result = await loop.run_in_executor(self.executors[pool], timed_call)
+        finally:
+            stats["in_flight"] -= 1
+            if tracker is not None:
+                tracker.finished()
+
+        stats["calls"] += 1
+        stats["total_wait"] += queue_wait
+        stats["max_wait"] = max(stats["max_wait"], queue_wait)
+
+        return result
+
+    def get_executor_stats(self) -> dict:
+        """Get queue wait metrics for the client thread pools.
+
+        Returns:
+            Dict of pool name to size, call count and queue wait times (seconds)
+        """
+        return {
+            name: {
+                "workers": self.executors[name]._max_workers,
+                "calls": stats["calls"],
+                "avg_queue_wait": round(stats["total_wait"] / stats["calls"], 4)
+                if stats["calls"]
+                else 0.0,
+                "max_queue_wait": round(stats["max_wait"], 4),
+            }
+            for name, stats in self.executor_stats.items()
+        }
+
+    def get_cache_stats(self) -> dict:
+        """Get response cache hit/miss counters per node.
+
+        Returns:
+            Dict with "enabled" flag and per-tag counters
+        """
+        if self.response_cache is None:
+            return {"enabled": False, "tags": {}}
+        return {"enabled": True, "tags": self.response_cache.get_stats()}
+
+    @staticmethod
+    def estimate_tokens(prompt: str, max_output_tokens: Optional[int] = None) -> int:
+        """Estimate prompt + output tokens for rate limiting.
+
+        Uses the ~4 characters per token rule of thumb; the estimate is
+        corrected with real usage once the response arrives.
+
+        Args:
+            prompt: Prompt text
+            max_output_tokens: Output cap for the request, if any
+
+        Returns:
+            Estimated total tokens
+        """
+        return len(prompt) // 4 + (max_output_tokens or DEFAULT_OUTPUT_TOKEN_ESTIMATE)
+
+    @staticmethod
+    def attempt_timeout(max_output_tokens: Optional[int] = None) -> float:
+        """Get the timeout for the next call attempt.
+
+        Args:
+            max_output_tokens: Output cap of the call, if any; calls allowing
+                long outputs get longer than GEMINI_TIMEOUT (see output_timeout)
+
+        Returns:
+            GEMINI_TIMEOUT sized to the output cap, capped by the remaining budget
+
+        Raises:
+            BudgetExhausted: If the budget has already run out
+        """
+        timeout = output_timeout(settings.GEMINI_TIMEOUT, max_output_tokens)
+        budget = remaining_budget()
+        if budget is None:
+            return timeout
+        if budget <= 0:
+            raise BudgetExhausted("Time budget exhausted")
+        return min(timeout, budget)
+
+    async def _backoff(self, model_name: str, attempt: int, error: Exception):
+        """Wait before retrying a failed call.
 
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        Quota errors pause the model's rate-limit queue for the server's
+        suggested delay so all callers back off together; other errors use
+        exponential backoff, unless the time budget would run out first.
 
-        # Create model instance
-        self.model = genai.GenerativeModel(self.model_name)
+        Args:
+            model_name: Model the call was made against
+            attempt: Zero-based attempt number that just failed
+            error: The exception raised by the call
+
+        Raises:
+            BudgetExhausted: If the budget runs out before the next attempt
+        """
+        if is_rate_limit_error(error):
+            delay = retry_after_seconds(error) or 2**attempt
+            print(f"[GeminiClient] Rate limited on {model_name}, pausing {delay:.1f}s")
+            self.rate_limiter.pause(model_name, delay)
+            return
+
+        budget = remaining_budget()
+        if budget is not None and budget <= 2**attempt:
+            raise BudgetExhausted(
+                f"Time budget exhausted before retrying: {str(error) or type(error).__name__}"
+            )
+        await asyncio.sleep(2**attempt)
 
-        # Semaphore for rate limiting
-        self.semaphore = asyncio.Semaphore(self.max_concurrent)
+    async def aclose(self):
+        """Close the shared HTTP session and shut down the client."""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self.shutdown()
+
+    def shutdown(self):
+        """Shut down the client thread pools, close the backend and the cache."""
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.backend.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
 
     async def generate_async(
         self,
@@ -48,6 +419,10 @@ class GeminiClient:
         json_mode: bool = True,
         model: Optional[str] = None,
         max_output_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        cache_tag: Optional[str] = None,
+        use_cache: bool = True,
+        hedge: bool = False,
     ) -> str:
         """Generate content asynchronously with retry logic.
 
@@ -58,6 +433,12 @@ class GeminiClient:
             json_mode: Whether to request JSON output
             model: Model to use (defaults to self.model_name)
             max_output_tokens: Maximum tokens in response (None = model default)
+            seed: Seed / replicate index; part of the cache key so replicates
+                of the same prompt are cached separately
+            cache_tag: Caller name for cache hit/miss accounting (e.g. node name)
+            use_cache: Whether this call may be served from the response cache
+            hedge: Issue a duplicate request if this one outlives the observed
+                p95 latency for the model
 
         Returns:
             Generated text response
@@ -65,47 +446,526 @@ class GeminiClient:
         Raises:
             Exception: If all retries fail
         """
+        response = await self._generate(
+            prompt, temperature, max_retries, json_mode, model,
+            max_output_tokens, seed, cache_tag, use_cache, hedge,
+        )
+        return response.text
+
+    async def _generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_retries: int = None,
+        json_mode: bool = True,
+        model: Optional[str] = None,
+        max_output_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        cache_tag: Optional[str] = None,
+        use_cache: bool = True,
+        hedge: bool = False,
+    ) -> BackendResponse:
+        """Generate content like generate_async, keeping the backend response.
+
+        Takes the same arguments as generate_async. Responses served from
+        the cache only keep their text, so their finish_reason is None.
+
+        Returns:
+            Backend response
+        """
         if max_retries is None:
             max_retries = settings.GEMINI_MAX_RETRIES
 
+        config_params = {
+            "temperature": temperature,
+            "response_mime_type": "application/json" if json_mode else "text/plain",
+        }
+
+        if max_output_tokens is not None:
+            config_params["max_output_tokens"] = max_output_tokens
+
         # Use specified model or default
-        model_to_use = genai.GenerativeModel(model) if model else self.model
+        model_name = model or self.model_name
+        request_key = ResponseCache.make_key(model_name, prompt, config_params, seed)
 
-        async with self.semaphore:
-            for attempt in range(max_retries):
-                try:
-                    # Run the synchronous generate_content in a thread pool
-                    loop = asyncio.get_event_loop()
+        # Serve identical requests from the cache when enabled
+        cache_key = None
+        if self.response_cache is not None and use_cache:
+            cache_key = request_key
+            cached = self.response_cache.get(cache_key, cache_tag or "default")
+            if cached is not None:
+                call_profiler.record_cache_hit()
+                return BackendResponse(cached, finish_reason=None)
+
+        async def call(tracker: Optional[_AttemptTracker] = None) -> BackendResponse:
+            return await self._generate_with_retries(
+                prompt, model_name, config_params, max_retries, tracker
+            )
+
+        async def call_and_cache() -> BackendResponse:
+            if hedge:
+                response = await self._hedged(model_name, call)
+            else:
+                response = await call()
+
+            if cache_key is not None:
+                self.response_cache.set(cache_key, response.text)
 
-                    config_params = {
-                        "temperature": temperature,
-                        "response_mime_type": "application/json" if json_mode else "text/plain",
-                    }
+            return response
+
+        return await self._single_flight(request_key, call_and_cache)
+
+    async def _single_flight(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Collapse concurrent identical requests onto one upstream call.
+
+        The first caller for a key starts the call; callers arriving while it
+        is in flight await the same result (or error). The call runs in its
+        own task, so a cancelled caller does not cancel it for the others; it
+        is cancelled only once every caller has gone.
+
+        Args:
+            key: Request key (model, prompt, config and seed)
+            call: Zero-argument coroutine function performing the request
+
+        Returns:
+            Result of the call
+        """
+        if not settings.GEMINI_SINGLE_FLIGHT:
+            return await call()
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(call())
+            self._in_flight[key] = task
+            self.single_flight_stats["leaders"] += 1
+
+            def release(done: asyncio.Task):
+                if self._in_flight.get(key) is done:
+                    del self._in_flight[key]
+                # Mark the error as retrieved in case every caller was cancelled
+                if not done.cancelled():
+                    done.exception()
+
+            task.add_done_callback(release)
+        else:
+            self.single_flight_stats["coalesced"] += 1
+
+        self._in_flight_waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._in_flight_waiters[key] -= 1
+            if self._in_flight_waiters[key] == 0:
+                del self._in_flight_waiters[key]
+                if not task.done():
+                    task.cancel()
+
+    async def generate_json_with_continuation(
+        self,
+        prompt: str,
+        list_keys: list[str],
+        max_continuations: Optional[int] = None,
+        cache_tag: Optional[str] = None,
+        **kwargs,
+    ) -> tuple[dict, bool]:
+        """Generate a large JSON object, continuing when the output is truncated.
+
+        A response is truncated when the backend stopped at the token limit
+        (finish_reason MAX_TOKENS); for cached responses, whose finish reason
+        is unknown, when the JSON is cut off. Every complete element is kept.
+        A continuation request then asks for the elements after the last one
+        received, and the new elements are merged in. This repeats until the
+        object is complete or max_continuations is reached.
+
+        Args:
+            prompt: The prompt to send to Gemini
+            list_keys: Top-level array fields that may need continuing, in the
+                order the prompt's output format lists them
+            max_continuations: Max follow-up requests (defaults to
+                settings.GEMINI_MAX_CONTINUATIONS)
+            cache_tag: Caller name for cache hit/miss accounting
+            **kwargs: Further generate_async arguments (model, temperature, ...)
+
+        Returns:
+            Tuple of (merged JSON object, whether it is still truncated)
+
+        Raises:
+            ValueError: If the first response contains no usable JSON object
+        """
+        if max_continuations is None:
+            max_continuations = settings.GEMINI_MAX_CONTINUATIONS
+
+        response = await self._generate(prompt, cache_tag=cache_tag, **kwargs)
+        result, truncated = self._parse_truncated(response)
+        if not isinstance(result, dict):
+            raise ValueError(f"Expected JSON object, got {type(result).__name__}")
+
+        continuations = 0
+        while truncated and continuations < max_continuations:
+            continuations += 1
+
+            # Fields arrive in order, so the last one present is where the output stopped
+            last_field = next(reversed(result), None)
+            if last_field in list_keys:
+                items = result[last_field]
+                extend_keys = list_keys[list_keys.index(last_field):]
+                print(
+                    f"[GeminiClient] Output truncated after {len(items)} '{last_field}' items, "
+                    f"requesting continuation {continuations}/{max_continuations}"
+                )
+                instructions = (
+                    f"Your previous response was cut off after {len(items)} items of "
+                    f'"{last_field}". The last complete item was:\n'
+                    f"{json.dumps(items[-1]) if items else 'none'}\n"
+                    f"Continue from there: return ONLY a JSON object with the same structure, "
+                    f'where "{last_field}" holds only the items that come after that one, '
+                    f"followed by all remaining fields. Do not repeat items already returned."
+                )
+            else:
+                extend_keys = []
+                print(
+                    f"[GeminiClient] Output truncated after '{last_field}', "
+                    f"requesting continuation {continuations}/{max_continuations}"
+                )
+                instructions = (
+                    f'Your previous response was cut off after the "{last_field}" field. '
+                    f"Return ONLY a JSON object with the fields that come after it."
+                )
+
+            try:
+                continuation_response = await self._generate(
+                    f"{prompt}\n\n<continuation>\n{instructions}\n</continuation>",
+                    cache_tag=f"{cache_tag or 'default'}_continuation",
+                    **kwargs,
+                )
+                continuation, truncated = self._parse_truncated(continuation_response)
+            except Exception as e:
+                print(f"[GeminiClient] Continuation failed ({e}), keeping partial output")
+                break
+
+            if not isinstance(continuation, dict):
+                break
+
+            if self._merge_continuation(result, continuation, extend_keys) == 0 and truncated:
+                # No progress; stop rather than loop on the same cut
+                break
+
+        return result, truncated
+
+    @staticmethod
+    def _parse_truncated(response: BackendResponse) -> tuple[Any, bool]:
+        """Parse a JSON response and tell whether it was cut off.
+
+        Args:
+            response: Backend response
+
+        Returns:
+            Tuple of (parsed JSON, whether the output hit the token limit)
+        """
+        result, cut_off = salvage_json(response.text)
+        if response.finish_reason is None:
+            return result, cut_off
+        return result, response.finish_reason == "MAX_TOKENS"
+
+    @staticmethod
+    def _merge_continuation(result: dict, continuation: dict, extend_keys: list[str]) -> int:
+        """Merge a continuation response into the partial result in place.
+
+        Arrays in extend_keys are extended with items not already present;
+        other fields are only filled in if missing (dicts key by key).
+
+        Args:
+            result: Partial result to extend
+            continuation: Parsed continuation response
+            extend_keys: Array fields the continuation resumes
+
+        Returns:
+            Number of array items and fields added
+        """
+        added = 0
+        for key, value in continuation.items():
+            if key in extend_keys and isinstance(value, list):
+                existing = result.setdefault(key, [])
+                seen = {json.dumps(item, sort_keys=True) for item in existing}
+                for item in value:
+                    fingerprint = json.dumps(item, sort_keys=True)
+                    if fingerprint not in seen:
+                        seen.add(fingerprint)
+                        existing.append(item)
+                        added += 1
+            elif isinstance(value, dict) and isinstance(result.get(key), dict):
+                for sub_key, sub_value in value.items():
+                    if sub_key not in result[key]:
+                        result[key][sub_key] = sub_value
+                        added += 1
+            elif key not in result:
+                result[key] = value
+                added += 1
+        return added
+
+    async def _generate_with_retries(
+        self,
+        prompt: str,
+        model_name: str,
+        config_params: dict,
+        max_retries: int,
+        tracker: Optional[_AttemptTracker] = None,
+    ) -> BackendResponse:
+        """Call the backend with rate limiting and retries.
+
+        Args:
+            prompt: The prompt to send to Gemini
+            model_name: Model to use
+            config_params: GenerationConfig parameters
+            max_retries: Max retry attempts
+            tracker: Optional tracker of when each attempt is executing
 
-                    if max_output_tokens is not None:
-                        config_params["max_output_tokens"] = max_output_tokens
+        Returns:
+            Backend response
 
-                    generation_config = GenerationConfig(**config_params)
+        Raises:
+            BudgetExhausted: If the time budget runs out first
+            TimeoutError: If every attempt timed out
+            Exception: If all retries fail
+        """
+        estimated_tokens = self.estimate_tokens(
+            prompt, config_params.get("max_output_tokens")
+        )
+        share = call_share.get()
 
-                    response = await loop.run_in_executor(
-                        None,
-                        lambda: model_to_use.generate_content(
-                            prompt, generation_config=generation_config
+        for attempt in range(max_retries):
+            timing = {}
+            rate_limit_wait = 0.0
+            try:
+                # Wait for RPM/TPM budget, then run the backend call in the text pool
+                self.attempt_timeout()  # Fails fast once the budget is gone
+                rate_limit_wait = await asyncio.wait_for(
+                    self.rate_limiter.acquire(model_name, estimated_tokens),
+                    remaining_budget(),
+                )
+                # Hold the run's share of call slots only while the attempt runs
+                async with share or contextlib.nullcontext():
+                    response: BackendResponse = await asyncio.wait_for(
+                        self._run_blocking(
+                            "text",
+                            lambda: self.backend.generate(model_name, prompt, config_params),
+                            timing,
+                            tracker,
                         ),
+                        self.attempt_timeout(config_params.get("max_output_tokens")),
+                    )
+                # Backend time only; pool queueing is not what hedging can beat
+                self._latencies[model_name].append(timing["latency"])
+                self.rate_limiter.record_usage(
+                    model_name, estimated_tokens, response.total_tokens
+                )
+                self._record_call(model_name, attempt, timing, rate_limit_wait, response)
+
+                return response
+
+            except Exception as e:
+                self._record_call(model_name, attempt, timing, rate_limit_wait, None)
+                if isinstance(e, BudgetExhausted):
+                    raise
+                if attempt == max_retries - 1:
+                    # Last attempt failed; keep timeouts distinguishable for fallbacks
+                    error_type = TimeoutError if isinstance(e, TimeoutError) else Exception
+                    raise error_type(
+                        f"Gemini API call failed after {max_retries} attempts: "
+                        f"{str(e) or type(e).__name__}"
                     )
 
-                    return response.text
+                await self._backoff(model_name, attempt, e)
+
+    def _record_call(
+        self,
+        model_name: str,
+        attempt: int,
+        timing: dict,
+        rate_limit_wait: float,
+        response: Optional[BackendResponse],
+    ):
+        """Report one call attempt to the per-test profiler.
+
+        Args:
+            model_name: Model the call was made against
+            attempt: Zero-based attempt number
+            timing: Queue wait / latency filled in by _run_blocking
+            rate_limit_wait: Seconds spent waiting for RPM/TPM budget
+            response: Backend response, or None if the attempt failed
+        """
+        call_profiler.record_call(
+            model_name=model_name,
+            latency=timing.get("latency", 0.0),
+            queue_wait=timing.get("queue_wait", 0.0),
+            rate_limit_wait=rate_limit_wait,
+            prompt_tokens=response.prompt_tokens if response else None,
+            response_tokens=response.response_tokens if response else None,
+            failed=response is None,
+            retry=attempt > 0,
+        )
+
+    def latency_percentile(self, model_name: str, percentile: float) -> Optional[float]:
+        """Get an observed call latency percentile for a model.
+
+        Args:
+            model_name: Model name
+            percentile: Percentile in 0-100
+
+        Returns:
+            Latency in seconds, or None until enough calls have been observed
+        """
+        samples = self._latencies[model_name]
+        if len(samples) < settings.GEMINI_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+    async def _hedged(
+        self,
+        model_name: str,
+        call: Callable[[Optional[_AttemptTracker]], Awaitable[BackendResponse]],
+    ) -> BackendResponse:
+        """Run a call, issuing one duplicate if an attempt outlives the observed p95.
+
+        The hedge timer runs only while a backend attempt is executing, not
+        while the call waits for its share, the rate limiter, a pool worker
+        or a retry backoff. No duplicate is issued while the text pool has a
+        backlog or the model is throttled, since it would only queue behind
+        the primary and spend quota. Whichever attempt succeeds first wins
+        and the other is cancelled.
+
+        Args:
+            model_name: Model the call is made against (for latency stats)
+            call: Coroutine function performing the request, given an
+                optional tracker of its attempts
+
+        Returns:
+            Backend response from the first successful attempt
+        """
+        hedge_after = self.latency_percentile(model_name, settings.GEMINI_HEDGE_PERCENTILE)
+        if hedge_after is None or not self._can_hedge(model_name):
+            return await call(None)
 
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        # Last attempt failed
-                        raise Exception(
-                            f"Gemini API call failed after {max_retries} attempts: {e}"
-                        )
+        tracker = _AttemptTracker()
+        primary = asyncio.create_task(call(tracker))
+        pending = {primary}
+        error = None
+
+        # Cancelled callers (e.g. cut off at a stage deadline) cancel their attempts too
+        try:
+            while True:
+                running = asyncio.create_task(tracker.running.wait())
+                try:
+                    await asyncio.wait({primary, running}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    running.cancel()
+                if primary.done():
+                    return primary.result()
 
-                    # Wait before retrying (exponential backoff)
-                    wait_time = 2**attempt
-                    await asyncio.sleep(wait_time)
+                attempt = tracker.attempts
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if done:
+                    return primary.result()
+                # Hedge only if the same attempt is still executing
+                if tracker.running.is_set() and tracker.attempts == attempt:
+                    break
+
+            if not self._can_hedge(model_name):
+                return await primary
+
+            self.hedge_stats["hedged"] += 1
+            pending.add(asyncio.create_task(call(None)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_stats["hedge_won"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _can_hedge(self, model_name: str) -> bool:
+        """Whether a duplicate request could start right away.
+
+        Args:
+            model_name: Model the duplicate would be made against
+
+        Returns:
+            False while every text worker is busy or the model's rate-limit
+            queue is waiting for budget
+        """
+        if self.executor_stats["text"]["in_flight"] >= self.text_workers:
+            return False
+        return not self.rate_limiter.is_throttled(model_name)
+
+    async def fan_out(
+        self,
+        items: list,
+        worker: Callable[[Any], Awaitable[Any]],
+        fallback: Callable[[Any], Any],
+        deadline: Optional[float] = None,
+        on_result: Optional[Callable[[Any, Any], None]] = None,
+    ) -> list:
+        """Run one coroutine per item concurrently with an optional stage deadline.
+
+        Items still running when the deadline passes are cancelled and get
+        ``fallback(item)`` instead, so one straggler cannot stretch the stage.
+        The deadline is capped by the remaining call budget, if any.
+
+        Args:
+            items: Inputs to process
+            worker: Coroutine function called with each item
+            fallback: Function producing the result for an item that missed the deadline
+            deadline: Seconds to wait for the whole fan-out (None = no limit)
+            on_result: Called with (item, result) as each item completes,
+                including items that fell back at the deadline
+
+        Returns:
+            Results in the same order as items
+        """
+        tasks = {asyncio.create_task(worker(item)): i for i, item in enumerate(items)}
+        if not tasks:
+            return []
+
+        if on_result is not None:
+            def report(task: asyncio.Task):
+                if not task.cancelled() and task.exception() is None:
+                    on_result(items[tasks[task]], task.result())
+
+            for task in tasks:
+                task.add_done_callback(report)
+
+        budget = remaining_budget()
+        if budget is not None:
+            deadline = max(0.0, budget if deadline is None else min(deadline, budget))
+
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(
+                f"[GeminiClient] Stage deadline of {deadline:g}s reached, "
+                f"{len(pending)}/{len(items)} calls cut off"
+            )
+
+        results = [None] * len(items)
+        for task, i in tasks.items():
+            if task in done:
+                results[i] = task.result()
+            else:
+                results[i] = fallback(items[i])
+                if on_result is not None:
+                    on_result(items[i], results[i])
+
+        return results
 
     async def generate_with_video(
         self,
@@ -114,6 +974,9 @@ class GeminiClient:
         temperature: float = 0.7,
         max_retries: int = None,
         model: Optional[str] = None,
+        seed: Optional[int] = None,
+        cache_tag: Optional[str] = None,
+        use_cache: bool = True,
     ) -> str:
         """Generate content with video input.
 
@@ -123,6 +986,9 @@ class GeminiClient:
             temperature: Generation temperature
             max_retries: Max retry attempts
             model: Model to use (defaults to self.model_name)
+            seed: Seed / replicate index (part of the cache key)
+            cache_tag: Caller name for cache hit/miss accounting
+            use_cache: Whether this call may be served from the response cache
 
         Returns:
             Generated text response
@@ -131,97 +997,357 @@ class GeminiClient:
             max_retries = settings.GEMINI_MAX_RETRIES
 
         # Use specified model or default
-        model_to_use = genai.GenerativeModel(model) if model else self.model
+        model_name = model or self.model_name
+        config_params = {"temperature": temperature, "response_mime_type": "application/json"}
 
-        async with self.semaphore:
-            for attempt in range(max_retries):
-                try:
-                    loop = asyncio.get_event_loop()
-
-                    # Check if video_url is a remote URL (http/https) or local file path
-                    if video_url.startswith('http://') or video_url.startswith('https://'):
-                        # For remote URLs (like Cloudflare R2), download the file first
-                        import tempfile
-                        import aiohttp
-                        import mimetypes
-                        import os
-
-                        print(f"[GeminiClient] Downloading video from R2: {video_url}")
-
-                        # Download video to temporary file
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(video_url, timeout=aiohttp.ClientTimeout(total=60)) as response:
-                                response.raise_for_status()
-
-                                # Create temporary file with appropriate extension
-                                content_type = response.headers.get('content-type', 'video/mp4')
-                                extension = mimetypes.guess_extension(content_type) or '.mp4'
-
-                                with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp_file:
-                                    content = await response.read()
-                                    tmp_file.write(content)
-                                    file_path = tmp_file.name
-
-                        print(f"[GeminiClient] Video downloaded to temporary file: {file_path}")
-
-                        # Upload to Gemini
-                        video_file = await loop.run_in_executor(
-                            None, lambda: genai.upload_file(file_path)
-                        )
-
-                        # Clean up temporary file after upload
-                        try:
-                            os.unlink(file_path)
-                        except:
-                            pass
-                    else:
-                        # Handle local file paths
-                        file_path = video_url
-                        if video_url.startswith('/videos/'):
-                            # Convert /videos/filename.ext to videos/filename.ext
-                            file_path = video_url[1:]  # Remove leading slash
-                        elif video_url.startswith('/api/v1/videos/'):
-                            # Convert /api/v1/videos/filename.ext to videos/filename.ext
-                            file_path = video_url.replace('/api/v1/videos/', 'videos/')
-
-                        # Upload video file
-                        video_file = await loop.run_in_executor(
-                            None, lambda: genai.upload_file(file_path)
-                        )
-
-                    # Wait for video processing
-                    while video_file.state.name == "PROCESSING":
-                        await asyncio.sleep(2)
-                        video_file = await loop.run_in_executor(
-                            None, lambda: genai.get_file(video_file.name)
-                        )
-
-                    if video_file.state.name == "FAILED":
-                        raise Exception("Video processing failed")
-
-                    generation_config = GenerationConfig(
-                        temperature=temperature,
-                        response_mime_type="application/json",
-                    )
+        # Uploaded videos get unique URLs, so the URL stands in for the content
+        request_key = ResponseCache.make_key(
+            model_name, f"{video_url}\n{prompt}", config_params, seed
+        )
+        cache_key = None
+        if self.response_cache is not None and use_cache:
+            cache_key = request_key
+            cached = self.response_cache.get(cache_key, cache_tag or "default")
+            if cached is not None:
+                call_profiler.record_cache_hit()
+                return cached
 
-                    # Generate content with video
-                    response = await loop.run_in_executor(
-                        None,
-                        lambda: model_to_use.generate_content(
-                            [video_file, prompt], generation_config=generation_config
-                        ),
+        return await self._single_flight(
+            request_key,
+            lambda: self._generate_video_with_retries(
+                video_url, prompt, model_name, config_params, max_retries, cache_key
+            ),
+        )
+
+    async def _generate_video_with_retries(
+        self,
+        video_url: str,
+        prompt: str,
+        model_name: str,
+        config_params: dict,
+        max_retries: int,
+        cache_key: Optional[str],
+    ) -> str:
+        """Upload (or reuse) a video and generate content with retries.
+
+        Args:
+            video_url: URL or path to video file
+            prompt: The prompt to send with the video
+            model_name: Model to use
+            config_params: GenerationConfig parameters
+            max_retries: Max retry attempts
+            cache_key: Response cache key to store the result under, if any
+
+        Returns:
+            Generated text response
+
+        Raises:
+            BudgetExhausted: If the time budget runs out first
+            TimeoutError: If every attempt timed out
+            Exception: If all retries fail
+        """
+        estimated_tokens = self.estimate_tokens(prompt) + VIDEO_TOKEN_ESTIMATE
+
+        # The processed file survives generation errors, so retries reuse it
+        video_file = None
+
+        for attempt in range(max_retries):
+            timing = {}
+            rate_limit_wait = 0.0
+            try:
+                if video_file is None:
+                    video_file = await self.get_video_file(video_url)
+
+                # Generate content with video
+                self.attempt_timeout()  # Fails fast once the budget is gone
+                rate_limit_wait = await asyncio.wait_for(
+                    self.rate_limiter.acquire(model_name, estimated_tokens),
+                    remaining_budget(),
+                )
+                response: BackendResponse = await asyncio.wait_for(
+                    self._run_blocking(
+                        "text",
+                        lambda: self.backend.generate(model_name, [video_file, prompt], config_params),
+                        timing,
+                    ),
+                    self.attempt_timeout(config_params.get("max_output_tokens")),
+                )
+                self.rate_limiter.record_usage(
+                    model_name, estimated_tokens, response.total_tokens
+                )
+                self._record_call(model_name, attempt, timing, rate_limit_wait, response)
+
+                if cache_key is not None:
+                    self.response_cache.set(cache_key, response.text)
+
+                return response.text
+
+            except Exception as e:
+                if "latency" in timing:
+                    self._record_call(model_name, attempt, timing, rate_limit_wait, None)
+                if isinstance(e, BudgetExhausted):
+                    raise
+                if attempt == max_retries - 1:
+                    error_type = TimeoutError if isinstance(e, TimeoutError) else Exception
+                    raise error_type(
+                        f"Gemini video API call failed after {max_retries} attempts: "
+                        f"{str(e) or type(e).__name__}"
                     )
 
-                    return response.text
+                await self._backoff(model_name, attempt, e)
+
+    async def get_video_file(self, video_url: str) -> Any:
+        """Get a processed Gemini file for a video, uploading only if needed.
+
+        Remote objects are first matched by ETag; otherwise the video bytes
+        are hashed and matched by SHA-256 before falling back to an upload.
+
+        Args:
+            video_url: URL or path to video file
+
+        Returns:
+            Gemini file handle in ACTIVE state
+        """
+        if not self.backend.uses_media:
+            # Replayed runs match calls by prompt, so the video itself is never needed
+            return await self._run_blocking("upload", lambda: self.backend.upload_file(video_url))
+
+        # Check if video_url is a remote URL (http/https) or local file path
+        if video_url.startswith('http://') or video_url.startswith('https://'):
+            # For remote URLs (like Cloudflare R2), download the file first
+            import os
+
+            session = await self._get_http_session()
+
+            # Match on the object's ETag before paying for a download
+            etag_key = None
+            try:
+                async with session.head(video_url, timeout=aiohttp.ClientTimeout(total=15)) as head:
+                    etag = head.headers.get('etag')
+                    if etag:
+                        etag_key = "etag:" + etag.strip('"')
+            except Exception as e:
+                print(f"[GeminiClient] Warning: HEAD request failed ({e}), skipping ETag lookup")
+
+            video_file = await self._lookup_video_file(etag_key)
+            if video_file is not None:
+                return video_file
+
+            file_path, digest = await self._download_video(session, video_url)
+
+            try:
+                sha_key = f"sha256:{digest}"
+                video_file = await self._lookup_video_file(sha_key)
+                if video_file is None:
+                    video_file = await self._upload_video_file(file_path, [sha_key, etag_key])
+                else:
+                    # Remember the ETag so the next run skips the download
+                    self.video_registry.register(video_file.name, [etag_key])
+            finally:
+                # Clean up temporary file after upload
+                try:
+                    os.unlink(file_path)
+                except:
+                    pass
+
+            return video_file
+
+        # Handle local file paths
+        file_path = video_url
+        if video_url.startswith('/videos/'):
+            # Convert /videos/filename.ext to videos/filename.ext
+            file_path = video_url[1:]  # Remove leading slash
+        elif video_url.startswith('/api/v1/videos/'):
+            # Convert /api/v1/videos/filename.ext to videos/filename.ext
+            file_path = video_url.replace('/api/v1/videos/', 'videos/')
+
+        digest = await self._run_blocking("upload", lambda: self._sha256_file(file_path))
+        sha_key = f"sha256:{digest}"
+        video_file = await self._lookup_video_file(sha_key)
+        if video_file is None:
+            video_file = await self._upload_video_file(file_path, [sha_key])
+
+        return video_file
+
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use.
+
+        Reusing one session keeps keep-alive connections to the storage
+        endpoint open across downloads.
+
+        Returns:
+            Shared aiohttp ClientSession
+        """
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.upload_workers * 2, keepalive_timeout=60)
+            )
+        return self._http_session
+
+    async def _download_video(
+        self, session: aiohttp.ClientSession, video_url: str
+    ) -> tuple[str, str]:
+        """Stream a remote video to a temporary file in fixed-size chunks.
+
+        Memory use is bounded by the chunk size; the SHA-256 of the content
+        is computed while streaming.
+
+        Args:
+            session: HTTP session to download with
+            video_url: Remote video URL
+
+        Returns:
+            Tuple of (temporary file path, hex SHA-256 digest)
+
+        Raises:
+            ValueError: If the video exceeds settings.VIDEO_DOWNLOAD_MAX_MB
+        """
+        import tempfile
+        import mimetypes
+        import os
+
+        max_bytes = settings.VIDEO_DOWNLOAD_MAX_MB * 1024 * 1024
+        chunk_size = settings.VIDEO_DOWNLOAD_CHUNK_SIZE
+
+        print(f"[GeminiClient] Downloading video from R2: {video_url}")
+
+        timeout = aiohttp.ClientTimeout(total=settings.VIDEO_DOWNLOAD_TIMEOUT)
+        async with session.get(video_url, timeout=timeout) as response:
+            response.raise_for_status()
+
+            total_bytes = response.content_length
+            if total_bytes is not None and total_bytes > max_bytes:
+                raise ValueError(
+                    f"Video is {total_bytes / 1e6:.0f} MB, over the {settings.VIDEO_DOWNLOAD_MAX_MB} MB limit"
+                )
+
+            # Create temporary file with appropriate extension
+            content_type = response.headers.get('content-type', 'video/mp4')
+            extension = mimetypes.guess_extension(content_type) or '.mp4'
+
+            digest = hashlib.sha256()
+            received = 0
+            next_report = 0.1
+
+            with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp_file:
+                file_path = tmp_file.name
+                try:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        received += len(chunk)
+                        if received > max_bytes:
+                            raise ValueError(
+                                f"Video exceeds the {settings.VIDEO_DOWNLOAD_MAX_MB} MB limit"
+                            )
+                        digest.update(chunk)
+                        tmp_file.write(chunk)
+
+                        if total_bytes and received / total_bytes >= next_report:
+                            print(
+                                f"[GeminiClient] Downloaded {received / 1e6:.1f}/{total_bytes / 1e6:.1f} MB "
+                                f"({received / total_bytes:.0%})"
+                            )
+                            next_report = (int(received * 10 / total_bytes) + 1) / 10
+                except Exception:
+                    tmp_file.close()
+                    os.unlink(file_path)
+                    raise
+
+        print(f"[GeminiClient] Video downloaded to temporary file: {file_path} ({received / 1e6:.1f} MB)")
+
+        return file_path, digest.hexdigest()
+
+    async def _lookup_video_file(self, key: Optional[str]) -> Any:
+        """Fetch a registered Gemini file for a content key, if still usable.
+
+        Args:
+            key: Content key (None skips the lookup)
+
+        Returns:
+            ACTIVE Gemini file handle, or None
+        """
+        if not key:
+            return None
+
+        file_name = self.video_registry.lookup(key)
+        if file_name is None:
+            return None
+
+        try:
+            video_file = await self._run_blocking("upload", lambda: self.backend.get_file(file_name))
+            video_file = await self._wait_for_processing(video_file)
+            print(f"[GeminiClient] Reusing uploaded video {file_name} ({key[:20]}...)")
+            return video_file
+        except Exception as e:
+            print(f"[GeminiClient] Registered video {file_name} unusable ({e}), re-uploading")
+            self.video_registry.forget(file_name)
+            return None
+
+    async def _upload_video_file(self, file_path: str, keys: list[Optional[str]]) -> Any:
+        """Upload a video, wait for processing and register it.
+
+        Args:
+            file_path: Local path of the video
+            keys: Content keys to register the processed file under
+
+        Returns:
+            ACTIVE Gemini file handle
+        """
+        # Uploads of large videos can outlast GEMINI_TIMEOUT; only the budget bounds them
+        video_file = await asyncio.wait_for(
+            self._run_blocking("upload", lambda: self.backend.upload_file(file_path)),
+            remaining_budget(),
+        )
+        video_file = await self._wait_for_processing(video_file)
+
+        expiration = getattr(video_file, "expiration_time", None)
+        expires_at = expiration.timestamp() if hasattr(expiration, "timestamp") else None
+        self.video_registry.register(video_file.name, keys, expires_at)
+
+        return video_file
+
+    async def _wait_for_processing(self, video_file: Any) -> Any:
+        """Poll a Gemini file until it leaves the PROCESSING state.
+
+        Gives up after GEMINI_VIDEO_PROCESSING_TIMEOUT, or sooner if the
+        time budget runs out.
+
+        Args:
+            video_file: Gemini file handle
+
+        Returns:
+            The file handle once ACTIVE
+
+        Raises:
+            TimeoutError: If the file is still processing when time runs out
+            Exception: If processing failed
+        """
+        give_up_at = time.monotonic() + settings.GEMINI_VIDEO_PROCESSING_TIMEOUT
+        budget = remaining_budget()
+        if budget is not None:
+            give_up_at = min(give_up_at, time.monotonic() + budget)
+
+        while video_file.state.name == "PROCESSING":
+            if time.monotonic() + 2 > give_up_at:
+                raise TimeoutError(f"Video {video_file.name} still processing, giving up")
+            await asyncio.sleep(2)
+            video_file = await asyncio.wait_for(
+                self._run_blocking("upload", lambda: self.backend.get_file(video_file.name)),
+                self.attempt_timeout(),
+            )
+
+        if video_file.state.name == "FAILED":
+            raise Exception("Video processing failed")
 
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise Exception(
-                            f"Gemini video API call failed after {max_retries} attempts: {e}"
-                        )
+        return video_file
 
-                    wait_time = 2**attempt
-                    await asyncio.sleep(wait_time)
+    @staticmethod
+    def _sha256_file(file_path: str) -> str:
+        """Hash a file in chunks without loading it into memory."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def load_prompt_template(self, template_path: Path) -> str:
         """Load an XML prompt template from file.
@@ -252,6 +1378,7 @@ class GeminiClient:
         prompts: list[str],
         temperature: float = 0.7,
         max_retries: int = None,
+        cache_tag: Optional[str] = None,
     ) -> list[str]:
         """Generate content for multiple prompts in parallel.
 
@@ -259,12 +1386,16 @@ class GeminiClient:
             prompts: List of prompts to process
             temperature: Generation temperature
             max_retries: Max retry attempts per prompt
+            cache_tag: Caller name for cache hit/miss accounting
 
         Returns:
             List of generated responses (same order as prompts)
         """
         tasks = [
-            self.generate_async(prompt, temperature, max_retries) for prompt in prompts
+            self.generate_async(
+                prompt, temperature, max_retries, cache_tag=cache_tag
+            )
+            for prompt in prompts
         ]
 
         return await asyncio.gather(*tasks)
@@ -0,0 +1,259 @@
+"""Background job queue running pipeline tests on a bounded worker pool."""
+
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import settings
+
+# Finished jobs kept for status requests (their results live in the results store)
+MAX_FINISHED_JOBS = 200
+
+
+class Job:
+    """A queued or running pipeline test."""
+
+    def __init__(
+        self,
+        test_id: str,
+        tenant_id: str,
+        initial_state: dict,
+        expected_nodes: int,
+        resume_config: Optional[dict] = None,
+        completed_nodes: Optional[list[str]] = None,
+    ):
+        """Initialize the job.
+
+        Args:
+            test_id: Test identifier
+            tenant_id: Tenant the test belongs to (for per-tenant limits)
+            initial_state: Initial pipeline state (the checkpointed state when
+                resuming); dropped once the job finishes
+            expected_nodes: Number of nodes a full run executes (for progress)
+            resume_config: Checkpoint config to resume the graph from (None = fresh run)
+            completed_nodes: Nodes already run before the resume checkpoint
+        """
+        self.test_id = test_id
+        self.tenant_id = tenant_id
+        self.initial_state = initial_state
+        self.expected_nodes = expected_nodes
+        self.resume_config = resume_config
+        self.status = "queued"
+        self.enqueued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.current_node: Optional[str] = None
+        self.completed_nodes: list[str] = list(completed_nodes or [])
+        self.running_nodes: list[str] = []
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the pipeline's nodes that have finished."""
+        if self.status == "completed":
+            return 1.0
+        return min(1.0, len(self.completed_nodes) / self.expected_nodes)
+
+    def node_started(self, node: str):
+        """Record that a node started executing."""
+        self.running_nodes.append(node)
+        self.current_node = node
+
+    def node_finished(self, node: str):
+        """Record that a node finished executing."""
+        self.completed_nodes.append(node)
+        if node in self.running_nodes:
+            self.running_nodes.remove(node)
+        # Nodes in parallel branches can still be running
+        self.current_node = self.running_nodes[-1] if self.running_nodes else None
+
+
+class JobQueue:
+    """FIFO queue of pipeline jobs executed by a fixed pool of workers.
+
+    A tenant never has more than ``max_per_tenant`` jobs running at once;
+    its further jobs wait while other tenants' jobs behind them proceed.
+    """
+
+    def __init__(self, max_workers: int, max_per_tenant: int, max_queued: int):
+        """Initialize the queue.
+
+        Args:
+            max_workers: Jobs executed concurrently
+            max_per_tenant: Jobs executed concurrently per tenant
+            max_queued: Jobs that may wait in the queue before submit() rejects
+        """
+        self.max_workers = max_workers
+        self.max_per_tenant = max_per_tenant
+        self.max_queued = max_queued
+        self.jobs: dict[str, Job] = {}
+        self._finished: OrderedDict[str, None] = OrderedDict()
+        self._pending: list[Job] = []
+        self._running_per_tenant: dict[str, int] = defaultdict(int)
+        self._runner: Optional[Callable[[Job], Awaitable[Any]]] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._workers: list[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self, runner: Callable[[Job], Awaitable[Any]]):
+        """Start the worker pool.
+
+        Args:
+            runner: Coroutine function executing one job
+        """
+        self._runner = runner
+        self._stopping = False
+        self._condition = asyncio.Condition()
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+        print(
+            f"[JobQueue] Started {self.max_workers} workers "
+            f"(max {self.max_per_tenant} running jobs per tenant)"
+        )
+
+    async def stop(self):
+        """Cancel the workers and any running jobs."""
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, job: Job) -> int:
+        """Add a job to the queue.
+
+        Args:
+            job: Job to run
+
+        Returns:
+            1-based queue position of the job
+
+        Raises:
+            RuntimeError: If the queue is not started
+            OverflowError: If the queue is full
+        """
+        if self._condition is None:
+            raise RuntimeError("Job queue is not running")
+        if len(self._pending) >= self.max_queued:
+            raise OverflowError(f"Job queue is full ({self.max_queued} queued jobs)")
+
+        async with self._condition:
+            self.jobs[job.test_id] = job
+            # A resumed test is live again
+            self._finished.pop(job.test_id, None)
+            self._pending.append(job)
+            self._condition.notify_all()
+        return len(self._pending)
+
+    def get(self, test_id: str) -> Optional[Job]:
+        """Get a job by test ID."""
+        return self.jobs.get(test_id)
+
+    def queue_position(self, test_id: str) -> Optional[int]:
+        """Get a queued job's 1-based position, or None if it is not waiting."""
+        for position, job in enumerate(self._pending, start=1):
+            if job.test_id == test_id:
+                return position
+        return None
+
+    async def cancel(self, test_id: str) -> bool:
+        """Cancel a queued or running job.
+
+        A queued job is removed from the queue; a running job's task is
+        cancelled and the worker records the cancellation.
+
+        Args:
+            test_id: Test identifier
+
+        Returns:
+            True if the job was queued or running
+        """
+        job = self.jobs.get(test_id)
+        if job is None or job.status not in ("queued", "running"):
+            return False
+
+        if job.status == "queued":
+            async with self._condition:
+                self._pending.remove(job)
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self._retire(job)
+        elif job.task is not None:
+            job.task.cancel()
+        return True
+
+    def _retire(self, job: Job):
+        """Release a finished job's state and evict the oldest finished jobs."""
+        job.initial_state = None
+        self._finished[job.test_id] = None
+        while len(self._finished) > MAX_FINISHED_JOBS:
+            old_id, _ = self._finished.popitem(last=False)
+            self.jobs.pop(old_id, None)
+
+    def _next_runnable(self) -> Optional[Job]:
+        """Pop the oldest pending job whose tenant is under its limit."""
+        for i, job in enumerate(self._pending):
+            if self._running_per_tenant[job.tenant_id] < self.max_per_tenant:
+                return self._pending.pop(i)
+        return None
+
+    async def _worker(self, index: int):
+        """Take runnable jobs off the queue and execute them."""
+        while True:
+            async with self._condition:
+                job = self._next_runnable()
+                while job is None:
+                    await self._condition.wait()
+                    job = self._next_runnable()
+                self._running_per_tenant[job.tenant_id] += 1
+
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.task = asyncio.create_task(self._runner(job))
+                await job.task
+                job.status = "completed"
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                if self._stopping:
+                    # The worker itself is shutting down
+                    raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                print(f"[JobQueue] Job {job.test_id} failed: {e}")
+            finally:
+                job.finished_at = time.time()
+                job.current_node = None
+                job.task = None
+                self._retire(job)
+                async with self._condition:
+                    self._running_per_tenant[job.tenant_id] -= 1
+                    self._condition.notify_all()
+
+    def get_stats(self) -> dict:
+        """Get queue depth and running job counts.
+
+        Returns:
+            Dict with worker count, queued and running jobs per tenant
+        """
+        return {
+            "workers": self.max_workers,
+            "max_per_tenant": self.max_per_tenant,
+            "queued": len(self._pending),
+            "running": sum(self._running_per_tenant.values()),
+            "running_per_tenant": {
+                tenant: count for tenant, count in self._running_per_tenant.items() if count
+            },
+        }
+
+
+# Global instance
+job_queue = JobQueue(
+    max_workers=settings.JOB_WORKERS,
+    max_per_tenant=settings.JOB_MAX_PER_TENANT,
+    max_queued=settings.JOB_MAX_QUEUED,
+)
@@ -0,0 +1,171 @@
+"""Shared JSON extraction and repair for LLM output.
+
+Gemini occasionally wraps JSON in markdown fences or stops mid-output when it
+hits the token limit. ``parse_json`` handles the fences; ``salvage_json``
+additionally recovers every complete element before a truncation point, so a
+cut-off edge or event list keeps everything that arrived intact.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _loads(text: str) -> Any:
+    """Decode JSON with orjson when available, falling back to the stdlib.
+
+    Both decoders raise ValueError subclasses on invalid input.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def strip_fences(text: str) -> str:
+    """Remove surrounding whitespace and markdown code fences.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Text with a leading ```/```json line and trailing ``` removed
+    """
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        newline = cleaned.find("\n")
+        cleaned = cleaned[newline + 1:] if newline != -1 else cleaned[3:]
+        if cleaned.startswith("json"):
+            cleaned = cleaned[4:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    return cleaned.strip()
+
+
+def parse_json(text: str) -> Any:
+    """Parse model output as JSON.
+
+    Args:
+        text: Raw model output, optionally fenced
+
+    Returns:
+        Decoded JSON value
+
+    Raises:
+        ValueError: If the output is not valid JSON
+    """
+    return _loads(strip_fences(text))
+
+
+def parse_json_object(text: str) -> dict:
+    """Parse model output that must be a JSON object.
+
+    Args:
+        text: Raw model output, optionally fenced
+
+    Returns:
+        Decoded JSON object
+
+    Raises:
+        ValueError: If the output is not valid JSON or not an object
+    """
+    parsed = parse_json(text)
+    if not isinstance(parsed, dict):
+        raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
+    return parsed
+
+
+def _is_element_boundary(stack: list[str]) -> bool:
+    """Whether cutting here leaves no object inside an array half-written."""
+    in_array = False
+    for closer in stack:
+        if closer == "]":
+            in_array = True
+        elif in_array:
+            return False
+    return True
+
+
+def _cut_points(text: str) -> list[tuple[int, str]]:
+    """Find positions where truncated JSON can be cut and closed.
+
+    A cut point is reached right after a value ends: after a closing bracket
+    or before a comma. Inside arrays only whole elements count, which keeps
+    half-written elements (an edge without its target) out of the result.
+    Each point is returned with the closing brackets needed at that position.
+
+    Args:
+        text: JSON text, possibly truncated
+
+    Returns:
+        List of (cut index, closing brackets) in text order
+    """
+    points = []
+    stack = []
+    i = 0
+    length = len(text)
+
+    while i < length:
+        char = text[i]
+        if char == '"':
+            # Jump to the closing quote, skipping escaped quotes
+            end = i + 1
+            while True:
+                end = text.find('"', end)
+                if end == -1:
+                    return points
+                backslashes = 0
+                j = end - 1
+                while text[j] == "\\":
+                    backslashes += 1
+                    j -= 1
+                if backslashes % 2 == 0:
+                    break
+                end += 1
+            i = end + 1
+            continue
+
+        if char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack:
+                return points
+            stack.pop()
+            if _is_element_boundary(stack):
+                points.append((i + 1, "".join(reversed(stack))))
+        elif char == "," and stack and _is_element_boundary(stack):
+            points.append((i, "".join(reversed(stack))))
+        i += 1
+
+    return points
+
+
+def salvage_json(text: str) -> tuple[Any, bool]:
+    """Parse model output, recovering complete elements if it was truncated.
+
+    Args:
+        text: Raw model output, optionally fenced and possibly cut off
+
+    Returns:
+        Tuple of (decoded JSON value, whether the output had to be repaired)
+
+    Raises:
+        ValueError: If nothing could be recovered
+    """
+    cleaned = strip_fences(text)
+    try:
+        return _loads(cleaned), False
+    except ValueError as error:
+        original_error = error
+
+    # Walk back from the latest cut point until the closed prefix parses
+    for cut, closers in reversed(_cut_points(cleaned)):
+        try:
+            return _loads(cleaned[:cut] + closers), True
+        except ValueError:
+            continue
+
+    raise original_error
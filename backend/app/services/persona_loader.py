@@ -2,7 +2,7 @@
 
 import json
 import os
-from typing import List
+from typing import List, Union
 from pathlib import Path
 
 from app.models.persona import Persona
@@ -25,6 +25,7 @@ class PersonaLoader:
 
         self.data_dir = Path(data_dir)
         self._persona_cache: dict[str, List[Persona]] = {}
+        self._context_cache: dict[str, str] = {}
 
     def load_personas(self, platform: str) -> List[Persona]:
         """Load personas for a specific platform.
@@ -95,9 +96,30 @@ class PersonaLoader:
         personas = self.load_personas(platform)
         return len(personas)
 
+    def persona_context(self, persona: Union[Persona, dict]) -> str:
+        """Get a persona's profile formatted for prompts, cached by persona ID.
+
+        Every reaction prompt embeds the persona's profile; sweeps and
+        multi-run tests format the same personas many times over.
+
+        Args:
+            persona: Persona object or its dict form
+
+        Returns:
+            Indented JSON of the persona's profile
+        """
+        persona_id = persona.persona_id if isinstance(persona, Persona) else persona["persona_id"]
+        context = self._context_cache.get(persona_id)
+        if context is None:
+            data = persona.model_dump() if isinstance(persona, Persona) else persona
+            context = json.dumps(data, indent=2)
+            self._context_cache[persona_id] = context
+        return context
+
     def clear_cache(self):
         """Clear the persona cache."""
         self._persona_cache.clear()
+        self._context_cache.clear()
 
     def get_available_platforms(self) -> List[str]:
         """Get list of platforms with persona data available.
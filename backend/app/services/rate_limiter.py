@@ -0,0 +1,203 @@
+"""Per-model token-bucket rate limiting for Gemini requests and tokens."""
+
+import asyncio
+import re
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Continuously refilling bucket sized to a per-minute budget."""
+
+    def __init__(self, per_minute: float):
+        """Initialize a full bucket.
+
+        Args:
+            per_minute: Budget replenished every 60 seconds
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """Take tokens from the bucket. May go negative to record debt."""
+        self.tokens -= amount
+
+
+class _ModelBudget:
+    """Request and token buckets plus a FIFO queue for one model."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        # asyncio.Lock wakes waiters in FIFO order, which keeps the queue fair
+        self.lock = asyncio.Lock()
+        self.total_wait = 0.0
+        self.acquired = 0
+        self.throttled = 0
+
+
+class ModelRateLimiter:
+    """Enforces requests-per-minute and tokens-per-minute budgets per model.
+
+    Callers queue in arrival order; the head of the queue sleeps until both
+    buckets can cover its request. Server retry hints pause the model's queue
+    so every caller backs off together instead of retrying blindly.
+    """
+
+    def __init__(self, limits: dict[str, dict], default_rpm: int, default_tpm: int):
+        """Initialize the limiter.
+
+        Args:
+            limits: Map of model name to {"rpm": int, "tpm": int}
+            default_rpm: RPM budget for models missing from ``limits``
+            default_tpm: TPM budget for models missing from ``limits``
+        """
+        self.limits = limits
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self._budgets: dict[str, _ModelBudget] = {}
+
+    def _budget(self, model: str) -> _ModelBudget:
+        """Get or lazily create the budget for a model."""
+        budget = self._budgets.get(model)
+        if budget is None:
+            limit = self.limits.get(model, {})
+            budget = _ModelBudget(
+                rpm=limit.get("rpm", self.default_rpm),
+                tpm=limit.get("tpm", self.default_tpm),
+            )
+            self._budgets[model] = budget
+        return budget
+
+    async def acquire(self, model: str, estimated_tokens: int) -> float:
+        """Wait until the model has budget for one request of the given size.
+
+        Args:
+            model: Model name
+            estimated_tokens: Estimated prompt + output tokens
+
+        Returns:
+            Seconds spent waiting for budget
+        """
+        budget = self._budget(model)
+        started_at = time.monotonic()
+
+        async with budget.lock:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    budget.paused_until - now,
+                    budget.requests.time_until(1, now),
+                    budget.tokens.time_until(estimated_tokens, now),
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            budget.requests.consume(1)
+            budget.tokens.consume(estimated_tokens)
+
+        waited = time.monotonic() - started_at
+        budget.total_wait += waited
+        budget.acquired += 1
+        return waited
+
+    def record_usage(self, model: str, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the real usage is known.
+
+        Args:
+            model: Model name
+            estimated_tokens: Tokens reserved in acquire()
+            actual_tokens: Tokens reported by the API (None if unknown)
+        """
+        if actual_tokens is None:
+            return
+        budget = self._budget(model)
+        budget.tokens.consume(actual_tokens - estimated_tokens)
+
+    def pause(self, model: str, seconds: float):
+        """Stop handing out budget for a model (e.g. after a 429).
+
+        Args:
+            model: Model name
+            seconds: How long to pause the model's queue
+        """
+        budget = self._budget(model)
+        budget.paused_until = max(budget.paused_until, time.monotonic() + seconds)
+        budget.throttled += 1
+
+    def is_throttled(self, model: str) -> bool:
+        """Whether callers for a model are currently waiting for budget.
+
+        Args:
+            model: Model name
+
+        Returns:
+            True while the model is paused or a caller is queued for budget
+        """
+        budget = self._budget(model)
+        # acquire() only holds the lock across a sleep when budget is short
+        return budget.paused_until > time.monotonic() or budget.lock.locked()
+
+    def get_stats(self) -> dict:
+        """Get per-model limiter metrics.
+
+        Returns:
+            Dict of model name to limits, waits and throttle counts
+        """
+        return {
+            model: {
+                "rpm": budget.requests.capacity,
+                "tpm": budget.tokens.capacity,
+                "acquired": budget.acquired,
+                "avg_wait": round(budget.total_wait / budget.acquired, 4)
+                if budget.acquired
+                else 0.0,
+                "throttled": budget.throttled,
+            }
+            for model, budget in self._budgets.items()
+        }
+
+
+_RETRY_PATTERNS = [
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)"),
+    re.compile(r"retry in\s*([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry-after:\s*([\d.]+)", re.IGNORECASE),
+]
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an API error is a quota / rate-limit rejection."""
+    code = getattr(error, "code", None)
+    if code == 429:
+        return True
+    message = str(error)
+    return "429" in message or "ResourceExhausted" in type(error).__name__ or (
+        "quota" in message.lower()
+    )
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract the server's retry hint from an API error, if present."""
+    message = str(error)
+    for pattern in _RETRY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
@@ -0,0 +1,263 @@
+"""Content-addressed cache for Gemini responses (in-memory LRU + SQLite)."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Optional
+
+
+class ResponseCache:
+    """Two-tier response cache keyed on a hash of the full request.
+
+    The memory tier is a small LRU in front of a SQLite file that survives
+    restarts. Disk entries expire after ``ttl_seconds`` and the least recently
+    used entries are evicted once the table grows past ``max_disk_entries``.
+
+    Lookups run on the event loop, so they never write: new entries and
+    access times are buffered and committed in batches by a background
+    writer thread on its own connection.
+    """
+
+    # Run disk eviction every N writes instead of on every insert
+    EVICTION_INTERVAL = 100
+
+    # Seconds between batched commits of buffered writes and access times
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: int,
+        max_memory_entries: int,
+        max_disk_entries: int,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the SQLite database
+            ttl_seconds: Time-to-live for cached responses
+            max_memory_entries: Size of the in-memory LRU tier
+            max_disk_entries: Maximum number of rows kept on disk
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        # Buffered until the next flush: key -> (response, expires_at, last_access)
+        # for new entries, key -> last_access for disk hits
+        self._pending_writes: dict[str, tuple[str, float, float]] = {}
+        self._pending_access: dict[str, float] = {}
+        self._stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0}
+        )
+
+        db_dir = Path(cache_dir)
+        db_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_dir / "responses.sqlite3"
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+        # WAL lets lookups read while the writer thread commits
+        self._write_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._write_lock = threading.Lock()
+        self._closing = threading.Event()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="response-cache-writer", daemon=True
+        )
+        self._writer.start()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        generation_config: dict,
+        seed: Optional[int] = None,
+    ) -> str:
+        """Build the cache key for a request.
+
+        Args:
+            model: Model name
+            prompt: Full prompt text
+            generation_config: Generation parameters sent with the request
+            seed: User-provided seed / replicate index
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+                "config": generation_config,
+                "seed": seed,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, tag: str = "default") -> Optional[str]:
+        """Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+            tag: Caller name used for hit/miss accounting (usually the node)
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats[tag]["hits"] += 1
+                    return response
+                del self._memory[key]
+
+            pending = self._pending_writes.get(key)
+            if pending is not None:
+                row = pending[:2]
+            else:
+                row = self._conn.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+
+            if row is None or row[1] <= now:
+                self._stats[tag]["misses"] += 1
+                return None
+
+            response, expires_at = row
+            self._pending_access[key] = now
+            self._remember(key, expires_at, response)
+            self._stats[tag]["hits"] += 1
+            return response
+
+    def set(self, key: str, response: str):
+        """Store a response in both tiers.
+
+        Args:
+            key: Cache key from make_key
+            response: Response text to cache
+        """
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+
+        with self._lock:
+            self._remember(key, expires_at, response)
+            self._pending_writes[key] = (response, expires_at, now)
+            self._pending_access.pop(key, None)
+
+    def flush(self):
+        """Commit buffered entries and access times to disk in one transaction."""
+        with self._write_lock:
+            with self._lock:
+                writes, self._pending_writes = self._pending_writes, {}
+                accesses, self._pending_access = self._pending_access, {}
+            if not writes and not accesses:
+                return
+
+            now = time.time()
+            self._write_conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, *entry) for key, entry in writes.items()],
+            )
+            self._write_conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(last_access, key) for key, last_access in accesses.items()],
+            )
+            self._writes_since_eviction += len(writes)
+            if self._writes_since_eviction >= self.EVICTION_INTERVAL:
+                self._evict(now)
+            self._write_conn.commit()
+
+    def _write_loop(self):
+        """Flush buffered writes every FLUSH_INTERVAL until the cache is closed."""
+        while not self._closing.wait(self.FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"[ResponseCache] Warning: failed to flush cache writes: {e}")
+
+    def _remember(self, key: str, expires_at: float, response: str):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        """Drop expired rows and trim the disk tier to max_disk_entries."""
+        self._writes_since_eviction = 0
+        self._write_conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._write_conn.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_disk_entries,),
+        )
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters per tag.
+
+        Returns:
+            Dict of tag to {"hits", "misses", "hit_rate"}
+        """
+        with self._lock:
+            return {
+                tag: {
+                    **counts,
+                    "hit_rate": round(
+                        counts["hits"] / (counts["hits"] + counts["misses"]), 3
+                    )
+                    if counts["hits"] + counts["misses"]
+                    else 0.0,
+                }
+                for tag, counts in self._stats.items()
+            }
+
+    def clear(self):
+        """Remove all cached responses and reset counters."""
+        with self._write_lock, self._lock:
+            self._memory.clear()
+            self._pending_writes.clear()
+            self._pending_access.clear()
+            self._write_conn.execute("DELETE FROM responses")
+            self._write_conn.commit()
+            self._stats.clear()
+
+    def close(self):
+        """Flush buffered writes and close the SQLite connections."""
+        self._closing.set()
+        self._writer.join()
+        self.flush()
+        with self._write_lock, self._lock:
+            self._write_conn.close()
+            self._conn.close()
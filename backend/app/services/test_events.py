@@ -0,0 +1,237 @@
+"""Per-test event streams for live pipeline progress.
+
+Queued tests get a stream that the job runner and the fan-out nodes publish
+to: node start/finish, each persona's reaction as it lands with running
+engagement totals, and partial state such as the network and metrics.
+Subscribers (the SSE endpoint) receive the stream's history first, then live
+events until the test ends.
+"""
+
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+from app.services.call_profiler import current_test_id
+
+# Events that end a stream
+TERMINAL_EVENTS = {"test_completed", "test_failed", "test_cancelled"}
+
+# Finished streams kept for late subscribers
+MAX_CLOSED_STREAMS = 50
+
+# Tags (e.g. the platform of a multi-platform test, the variant of a sweep)
+# added to every event the current task emits
+current_event_tags: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "current_event_tags", default=None
+)
+
+
+class _TestStream:
+    """Event history and live subscribers for one test."""
+
+    def __init__(self, history_limit: int):
+        self.history: deque[dict] = deque(maxlen=history_limit)
+        self.subscribers: set[asyncio.Queue] = set()
+        self.next_id = 1
+        self.closed = False
+
+
+class TestEventBroker:
+    """Fans pipeline events out to subscribers of each test."""
+
+    def __init__(self, history_limit: int, keepalive: float):
+        """Initialize the broker.
+
+        Args:
+            history_limit: Events kept per test for late subscribers
+            keepalive: Seconds of silence before subscribe() yields a keepalive
+        """
+        self.history_limit = history_limit
+        self.keepalive = keepalive
+        self._streams: dict[str, _TestStream] = {}
+        self._closed: OrderedDict[str, None] = OrderedDict()
+
+    def open(self, test_id: str):
+        """Create the event stream for a test."""
+        self._streams[test_id] = _TestStream(self.history_limit)
+
+    def reopen(self, test_id: str):
+        """Continue a finished test's stream when the test runs again.
+
+        The history and event IDs carry on, so clients reconnecting with the
+        last ID they saw receive only the new events. A stream that is no
+        longer kept starts afresh.
+        """
+        stream = self._streams.get(test_id)
+        if stream is None:
+            self.open(test_id)
+            return
+        stream.closed = False
+        self._closed.pop(test_id, None)
+
+    def has_stream(self, test_id: str) -> bool:
+        """Whether events were ever published for a test (and are still kept)."""
+        return test_id in self._streams
+
+    def publish(self, test_id: str, event: str, data: dict):
+        """Publish an event to a test's stream.
+
+        Terminal events close the stream. Events for tests without an open
+        stream are dropped.
+
+        Args:
+            test_id: Test identifier
+            event: Event name
+            data: JSON-serializable payload
+        """
+        stream = self._streams.get(test_id)
+        if stream is None or stream.closed:
+            return
+
+        message = {"id": stream.next_id, "event": event, "data": data}
+        stream.next_id += 1
+        stream.history.append(message)
+        for queue in stream.subscribers:
+            queue.put_nowait(message)
+
+        if event in TERMINAL_EVENTS:
+            self._close(test_id, stream)
+
+    def emit(self, event: str, data: dict):
+        """Publish an event for the test the current task is working for, with its tags."""
+        test_id = current_test_id.get()
+        if test_id is None:
+            return
+        tags = current_event_tags.get()
+        if tags:
+            data = {**data, **tags}
+        self.publish(test_id, event, data)
+
+    def _close(self, test_id: str, stream: _TestStream):
+        """Mark a stream finished and forget the oldest finished streams."""
+        stream.closed = True
+        for queue in stream.subscribers:
+            queue.put_nowait(None)
+
+        self._closed[test_id] = None
+        while len(self._closed) > MAX_CLOSED_STREAMS:
+            old_id, _ = self._closed.popitem(last=False)
+            self._streams.pop(old_id, None)
+
+    async def subscribe(
+        self, test_id: str, after_id: int = 0
+    ) -> AsyncIterator[Optional[dict]]:
+        """Iterate over a test's events until its stream closes.
+
+        Yields None after ``keepalive`` seconds without events so callers can
+        keep idle connections open.
+
+        Args:
+            test_id: Test identifier
+            after_id: Skip history up to and including this event ID
+
+        Yields:
+            Event dicts with id, event and data, or None as a keepalive
+        """
+        stream = self._streams.get(test_id)
+        if stream is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in stream.history:
+            if message["id"] > after_id:
+                queue.put_nowait(message)
+        if stream.closed:
+            queue.put_nowait(None)
+        else:
+            stream.subscribers.add(queue)
+
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            stream.subscribers.discard(queue)
+
+
+class ReactionTally:
+    """Running engagement totals for a fan-out stage, published per persona."""
+
+    def __init__(self, node: str, total: int):
+        """Initialize the tally.
+
+        Args:
+            node: Node producing the reactions
+            total: Number of personas the stage will report
+        """
+        self.node = node
+        self.total = total
+        self.completed = 0
+        self.counts = {"views": 0, "likes": 0, "shares": 0, "comments": 0}
+
+    def _count(self, reaction: dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) a reaction's actions from the totals."""
+        for action in self.counts:
+            # will_view, will_like, ...
+            if reaction.get(f"will_{action[:-1]}"):
+                self.counts[action] += sign
+
+    def add(self, reaction: dict):
+        """Count one persona's reaction and publish it with the running totals."""
+        if not isinstance(reaction, dict):
+            return
+
+        self.completed += 1
+        self._count(reaction, 1)
+        self._publish(reaction)
+
+    def revise(self, previous: dict, reaction: dict):
+        """Replace a persona's already-counted reaction and publish the new one."""
+        if isinstance(previous, dict):
+            self._count(previous, -1)
+        else:
+            self.completed += 1
+        if isinstance(reaction, dict):
+            self._count(reaction, 1)
+            self._publish(reaction)
+
+    def _publish(self, reaction: dict):
+        """Publish a persona's reaction with the running totals."""
+        test_event_broker.emit(
+            "persona_reaction",
+            {
+                "node": self.node,
+                "persona_id": reaction.get("persona_id"),
+                "will_view": reaction.get("will_view", False),
+                "will_like": reaction.get("will_like", False),
+                "will_share": reaction.get("will_share", False),
+                "will_comment": reaction.get("will_comment", False),
+                "sentiment": reaction.get("updated_sentiment", reaction.get("sentiment")),
+                "timed_out": reaction.get("timed_out", False),
+                "partial_metrics": {
+                    "completed": self.completed,
+                    "total": self.total,
+                    **self.counts,
+                },
+            },
+        )
+
+    def add_all(self, reactions: list):
+        """Count a batch of reactions."""
+        for reaction in reactions:
+            self.add(reaction)
+
+
+# Global instance
+test_event_broker = TestEventBroker(
+    history_limit=settings.TEST_EVENT_HISTORY,
+    keepalive=settings.TEST_EVENT_KEEPALIVE,
+)
@@ -0,0 +1,115 @@
+"""Registry of processed Gemini video files keyed by video content."""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class VideoFileRegistry:
+    """Maps video content identifiers to already-processed Gemini files.
+
+    Entries are keyed by ``sha256:<digest>`` of the video bytes and, for R2
+    objects, ``etag:<etag>`` so a known object can be matched without
+    downloading it again. Each entry remembers when the Gemini file expires
+    (uploaded files are deleted by the API after 48 hours).
+    """
+
+    def __init__(self, registry_path: str, default_ttl_seconds: int):
+        """Initialize the registry, loading any persisted entries.
+
+        Args:
+            registry_path: JSON file used to persist entries across restarts
+            default_ttl_seconds: Lifetime assumed when the API reports no expiry
+        """
+        self.registry_path = Path(registry_path)
+        self.default_ttl_seconds = default_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if self.registry_path.exists():
+            try:
+                with open(self.registry_path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception as e:
+                print(f"[VideoFileRegistry] Warning: Could not load registry: {e}")
+                self._entries = {}
+
+    def lookup(self, *keys: Optional[str]) -> Optional[str]:
+        """Find an unexpired Gemini file for any of the given keys.
+
+        Args:
+            *keys: Content keys to try in order (None values are skipped)
+
+        Returns:
+            Gemini file name, or None if no live entry exists
+        """
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                if not key:
+                    continue
+                entry = self._entries.get(key)
+                if entry and entry["expires_at"] > now:
+                    self.hits += 1
+                    return entry["file_name"]
+            self.misses += 1
+            return None
+
+    def register(
+        self, file_name: str, keys: list[Optional[str]], expires_at: Optional[float] = None
+    ):
+        """Record a processed Gemini file under one or more content keys.
+
+        Args:
+            file_name: Gemini file name (e.g. "files/abc123")
+            keys: Content keys for the video (None values are skipped)
+            expires_at: Unix expiry time reported by the API, if known
+        """
+        if expires_at is None:
+            expires_at = time.time() + self.default_ttl_seconds
+
+        with self._lock:
+            for key in keys:
+                if key:
+                    self._entries[key] = {"file_name": file_name, "expires_at": expires_at}
+            self._save()
+
+    def forget(self, file_name: str):
+        """Drop every entry pointing at a Gemini file (e.g. it was deleted).
+
+        Args:
+            file_name: Gemini file name
+        """
+        with self._lock:
+            self._entries = {
+                key: entry
+                for key, entry in self._entries.items()
+                if entry["file_name"] != file_name
+            }
+            self._save()
+
+    def _save(self):
+        """Persist live entries to disk."""
+        now = time.time()
+        live = {k: v for k, v in self._entries.items() if v["expires_at"] > now}
+        try:
+            self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.registry_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(live, f)
+            tmp_path.replace(self.registry_path)
+        except Exception as e:
+            print(f"[VideoFileRegistry] Warning: Could not save registry: {e}")
+
+    def get_stats(self) -> dict:
+        """Get registry hit/miss counters.
+
+        Returns:
+            Dict with entry count, hits and misses
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmark the LangGraph pipeline offline against the fake Gemini backend.
+
+Personas are replicated from a platform's persona file up to each requested
+size, and the full pipeline is timed with no network access.
+
+Usage:
+    python benchmark_pipeline.py [platform] [sizes...]
+
+Example:
+    python benchmark_pipeline.py tiktok 50 500 5000
+    FAKE_GEMINI_LATENCY_MEDIAN=0.05 FAKE_GEMINI_ERROR_RATE=0.02 python benchmark_pipeline.py
+
+The fake backend is configured through the FAKE_GEMINI_* settings.
+"""
+
+import os
+import sys
+import asyncio
+import time
+from pathlib import Path
+
+# Force the offline backend; no real credentials are needed
+os.environ["GEMINI_BACKEND"] = "fake"
+# Benchmark runs are not analyses; keep their reports out of analysis_exports
+os.environ["ANALYSIS_EXPORT_ENABLED"] = "false"
+for key in ("GEMINI_API_KEY", "R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY",
+            "R2_BUCKET_NAME", "R2_PUBLIC_URL"):
+    os.environ.setdefault(key, "offline")
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.graph.graph import video_test_graph
+from app.graph.state import VideoTestState
+from app.services.call_profiler import call_profiler, current_test_id
+from app.services.gemini_client import gemini_client
+from app.services.persona_loader import persona_loader
+
+DEFAULT_SIZES = [50, 500, 5000]
+
+SAMPLE_TEXT = (
+    "Excited to share that our team just shipped the feature we've been "
+    "building for six months. Huge thanks to everyone who helped along the way!"
+)
+
+
+def scale_personas(platform: str, count: int):
+    """Replicate a platform's personas up to ``count`` with unique IDs.
+
+    Args:
+        platform: Platform whose persona file seeds the synthetic population
+        count: Number of personas to generate
+    """
+    base = persona_loader.load_personas(platform)
+    personas = []
+    for i in range(count):
+        persona = base[i % len(base)]
+        replica = i // len(base)
+        persona_id = persona.persona_id if replica == 0 else f"{persona.persona_id}_r{replica}"
+        personas.append(persona.model_copy(update={"persona_id": persona_id}))
+
+    # Seed the loader cache so the initial reaction node picks these up
+    persona_loader._persona_cache[platform] = personas
+
+
+async def run_benchmark(platform: str, count: int) -> dict:
+    """Run the pipeline once with ``count`` synthetic personas.
+
+    Args:
+        platform: Platform to simulate
+        count: Number of personas
+
+    Returns:
+        Dict with timing and result counts
+    """
+    scale_personas(platform, count)
+
+    initial_state: VideoTestState = {
+        "video_id": f"bench_{count}",
+        "video_url": "",
+        "platform": platform,
+        "content_type": "text",
+        "text_content": SAMPLE_TEXT,
+        "simulation_params": {"seed": 0},
+        "user_context": None,
+        "platform_metrics": None,
+        "video_analysis": None,
+        "text_analysis": None,
+        "personas": None,
+        "initial_reactions": None,
+        "persona_network": None,
+        "interaction_results": None,
+        "interaction_events": None,
+        "second_reactions": None,
+        "final_metrics": None,
+        "node_graph_data": None,
+        "engagement_timeline": None,
+        "reaction_insights": None,
+        "platform_predictions": None,
+        "errors": [],
+        "status": "initializing",
+    }
+
+    test_id = f"bench_{count}"
+    token = current_test_id.set(test_id)
+    start_time = time.perf_counter()
+    try:
+        final_state = await video_test_graph.ainvoke(initial_state)
+    finally:
+        current_test_id.reset(token)
+    duration = time.perf_counter() - start_time
+
+    return {
+        "profile": call_profiler.pop_profile(test_id),
+        "personas": count,
+        "duration": duration,
+        "status": final_state.get("status"),
+        "initial_reactions": len(final_state.get("initial_reactions") or []),
+        "second_reactions": len(final_state.get("second_reactions") or []),
+        "errors": len(final_state.get("errors") or []),
+    }
+
+
+async def main():
+    """Main benchmark function."""
+    platform = sys.argv[1] if len(sys.argv) > 1 else "tiktok"
+    sizes = [int(arg) for arg in sys.argv[2:]] or DEFAULT_SIZES
+
+    # Unwrap a recorder (GEMINI_CASSETTE_MODE=record) to report the fake's settings
+    backend = getattr(gemini_client.backend, "inner", gemini_client.backend)
+    print("=" * 70)
+    print("OFFLINE PIPELINE BENCHMARK")
+    print("=" * 70)
+    print(f"Platform: {platform}")
+    print(
+        f"Fake backend: median latency {backend.latency_median}s, sigma {backend.latency_sigma}, "
+        f"error rate {backend.error_rate}, truncation rate {backend.truncation_rate}"
+    )
+    print(f"Text workers: {gemini_client.text_workers}")
+    print("=" * 70 + "\n")
+
+    results = []
+    try:
+        for count in sizes:
+            results.append(await run_benchmark(platform, count))
+    finally:
+        await gemini_client.aclose()
+
+    print("\n" + "=" * 70)
+    print("RESULTS")
+    print("=" * 70)
+    print(f"{'Personas':>10} {'Seconds':>10} {'Initial':>10} {'Second':>10} {'Errors':>8}  Status")
+    for r in results:
+        print(
+            f"{r['personas']:>10} {r['duration']:>10.2f} {r['initial_reactions']:>10} "
+            f"{r['second_reactions']:>10} {r['errors']:>8}  {r['status']}"
+        )
+    print("=" * 70)
+
+    for r in results:
+        print(f"\nPer-node profile ({r['personas']} personas):")
+        print(f"{'Node':<22} {'Wall s':>8} {'Calls':>7} {'Retries':>8} {'p95 s':>7} {'Queue s':>9}")
+        for name, node in r["profile"]["nodes"].items():
+            print(
+                f"{name:<22} {node['wall_time']:>8.2f} {node['calls']:>7} {node['retries']:>8} "
+                f"{node['latency']['p95']:>7.3f} {node['queue_wait']['total']:>9.2f}"
+            )
+    print()
+    print(f"Executors: {gemini_client.get_executor_stats()}")
+    print(f"Rate limits: {gemini_client.rate_limiter.get_stats()}")
+    print(f"Hedging: {gemini_client.hedge_stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
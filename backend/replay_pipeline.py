@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Replay a recorded pipeline run offline from a Gemini cassette.
+
+Record a run by starting the API (or test_pipeline.py) with
+GEMINI_CASSETTE_MODE=record. The test's saved results file provides the
+inputs, and the cassette serves every Gemini response, so the run can be
+repeated and profiled locally with no network access.
+
+Usage:
+    python replay_pipeline.py <results.json> <cassette.jsonl.gz> [--zero-latency] [--profile]
+
+Example:
+    python replay_pipeline.py test_results/tiktok_test_abc_20250101_120000.json \\
+        .cache/gemini/cassette.jsonl.gz --zero-latency --profile
+"""
+
+import os
+import sys
+import asyncio
+import cProfile
+import json
+import pstats
+import time
+from pathlib import Path
+
+if len(sys.argv) < 3:
+    print(__doc__)
+    sys.exit(1)
+
+RESULTS_PATH = Path(sys.argv[1])
+CASSETTE_PATH = sys.argv[2]
+ZERO_LATENCY = "--zero-latency" in sys.argv
+PROFILE = "--profile" in sys.argv
+
+# Serve Gemini calls from the cassette; no real credentials are needed
+os.environ["GEMINI_CASSETTE_MODE"] = "replay"
+os.environ["GEMINI_CASSETTE_PATH"] = CASSETTE_PATH
+os.environ["GEMINI_REPLAY_LATENCY"] = "zero" if ZERO_LATENCY else "original"
+os.environ["GEMINI_CACHE_ENABLED"] = "false"
+# Replays are not analyses; keep their reports out of analysis_exports
+os.environ["ANALYSIS_EXPORT_ENABLED"] = "false"
+for key in ("GEMINI_API_KEY", "R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY",
+            "R2_BUCKET_NAME", "R2_PUBLIC_URL"):
+    os.environ.setdefault(key, "offline")
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.graph.graph import video_test_graph
+from app.graph.state import VideoTestState
+from app.services.gemini_client import gemini_client
+
+# Input fields copied from the recorded state; everything else is recomputed
+INPUT_FIELDS = [
+    "video_id",
+    "video_url",
+    "platform",
+    "content_type",
+    "text_content",
+    "simulation_params",
+    "user_context",
+    "platform_metrics",
+]
+
+
+def build_initial_state(recorded_state: dict) -> VideoTestState:
+    """Rebuild the initial pipeline state from a saved results file.
+
+    Args:
+        recorded_state: Final state saved by the recorded run
+
+    Returns:
+        Initial state with the recorded inputs
+    """
+    state = {field: recorded_state.get(field) for field in INPUT_FIELDS}
+    state["simulation_params"] = state["simulation_params"] or {}
+    state["content_type"] = state["content_type"] or "video"
+    state.update(
+        {
+            "video_analysis": None,
+            "text_analysis": None,
+            "personas": None,
+            "initial_reactions": None,
+            "persona_network": None,
+            "interaction_results": None,
+            "interaction_events": None,
+            "second_reactions": None,
+            "final_metrics": None,
+            "node_graph_data": None,
+            "engagement_timeline": None,
+            "reaction_insights": None,
+            "platform_predictions": None,
+            "errors": [],
+            "status": "initializing",
+        }
+    )
+    return state
+
+
+async def main():
+    """Main replay function."""
+    with open(RESULTS_PATH, "r", encoding="utf-8") as f:
+        recorded_state = json.load(f)
+
+    initial_state = build_initial_state(recorded_state)
+
+    print("=" * 70)
+    print("PIPELINE REPLAY")
+    print("=" * 70)
+    print(f"Results: {RESULTS_PATH}")
+    print(f"Cassette: {CASSETTE_PATH}")
+    print(f"Latency: {'zero' if ZERO_LATENCY else 'original'}")
+    print("=" * 70 + "\n")
+
+    profiler = cProfile.Profile() if PROFILE else None
+    start_time = time.perf_counter()
+    try:
+        if profiler:
+            profiler.enable()
+        final_state = await video_test_graph.ainvoke(initial_state)
+    finally:
+        if profiler:
+            profiler.disable()
+        await gemini_client.aclose()
+    duration = time.perf_counter() - start_time
+
+    print("\n" + "=" * 70)
+    print("REPLAY COMPLETE")
+    print("=" * 70)
+    print(f"Status: {final_state.get('status')}")
+    print(f"Execution time: {duration:.2f} seconds")
+    print(f"Errors: {len(final_state.get('errors', []))}")
+    print(f"Cassette: {gemini_client.backend.get_stats()}")
+
+    recorded_metrics = recorded_state.get("final_metrics") or {}
+    replayed_metrics = final_state.get("final_metrics") or {}
+    for key in ("total_views", "total_likes", "total_shares", "total_comments"):
+        print(f"  {key}: recorded {recorded_metrics.get(key)}, replayed {replayed_metrics.get(key)}")
+    print("=" * 70)
+
+    if profiler:
+        print("\nTop functions by cumulative time:")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
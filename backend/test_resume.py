@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Test resuming a pipeline run from its checkpoints, offline.
+
+Runs a text test against the fake Gemini backend with the network generated
+alongside the initial reactions, makes only network generation fail, and
+checks that resuming reruns the network without paying for the initial
+reactions again.
+
+Usage:
+    python test_resume.py [platform]
+
+Example:
+    python test_resume.py tiktok
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+# Force the offline backend; no real credentials are needed
+os.environ["GEMINI_BACKEND"] = "fake"
+os.environ["ANALYSIS_EXPORT_ENABLED"] = "false"
+for key in ("GEMINI_API_KEY", "R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY",
+            "R2_BUCKET_NAME", "R2_PUBLIC_URL"):
+    os.environ.setdefault(key, "offline")
+os.environ.setdefault("FAKE_GEMINI_LATENCY_MEDIAN", "0.01")
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.graph.checkpointing import PipelineCheckpointer
+from app.graph.graph import create_video_test_graph, new_test_deadline
+from app.graph.nodes.network_generation.node import network_generation_node
+from app.graph.state import VideoTestState
+from app.services.call_profiler import call_profiler, current_test_id
+
+SAMPLE_TEXT = (
+    "Excited to share that our team just shipped the feature we've been "
+    "building for six months. Huge thanks to everyone who helped along the way!"
+)
+
+
+def fail_network_generation(times: int):
+    """Make the next ``times`` network generations fail."""
+    create_personas_summary = network_generation_node.create_personas_summary
+    remaining = {"failures": times}
+
+    def failing(personas):
+        if remaining["failures"] > 0:
+            remaining["failures"] -= 1
+            raise RuntimeError("simulated network failure")
+        return create_personas_summary(personas)
+
+    network_generation_node.create_personas_summary = failing
+
+
+async def run_nodes(checkpointer: PipelineCheckpointer, test_id: str, graph_input, config):
+    """Run the graph and return its final state and the nodes that executed."""
+    token = current_test_id.set(test_id)
+    try:
+        final_state = None
+        async for final_state in checkpointer.graph.astream(graph_input, config, stream_mode="values"):
+            pass
+    finally:
+        current_test_id.reset(token)
+    profile = call_profiler.pop_profile(test_id) or {}
+    return final_state, set(profile.get("nodes", {}))
+
+
+async def run_test(platform: str = "tiktok"):
+    """Fail network generation in a parallel run, then resume it.
+
+    Args:
+        platform: Platform to test (default: tiktok)
+    """
+    print("\n" + "=" * 70)
+    print("PIPELINE RESUME TEST (parallel network generation)")
+    print("=" * 70)
+
+    checkpointer = PipelineCheckpointer(
+        db_path=str(Path(tempfile.mkdtemp()) / "checkpoints.sqlite")
+    )
+    await checkpointer.open()
+    # The network runs alongside the initial reactions, in one superstep
+    checkpointer.graph = create_video_test_graph(
+        checkpointer=checkpointer.saver, parallel_network=True
+    )
+
+    test_id = f"resume_{int(time.time())}"
+    initial_state: VideoTestState = {
+        "video_id": test_id,
+        "video_url": "",
+        "platform": platform,
+        "content_type": "text",
+        "text_content": SAMPLE_TEXT,
+        "simulation_params": {"seed": 0},
+        "user_context": None,
+        "platform_metrics": None,
+        "video_analysis": None,
+        "text_analysis": None,
+        "personas": None,
+        "initial_reactions": None,
+        "persona_network": None,
+        "interaction_results": None,
+        "interaction_events": None,
+        "second_reactions": None,
+        "final_metrics": None,
+        "node_graph_data": None,
+        "engagement_timeline": None,
+        "reaction_insights": None,
+        "platform_predictions": None,
+        "errors": [],
+        "status": "initializing",
+    }
+
+    try:
+        fail_network_generation(times=1)
+        first_state, first_nodes = await run_nodes(
+            checkpointer, test_id, initial_state, checkpointer.thread_config(test_id)
+        )
+        print(f"First run errors: {first_state['errors']}")
+        assert any("Network generation failed" in error for error in first_state["errors"])
+        assert "initial_reactions" in first_nodes
+
+        resume_point = await checkpointer.find_resume_point(test_id)
+        assert resume_point is not None, "no resume point after a failed network"
+        print(f"Resume at: {resume_point['next_nodes']}, reusing {list(resume_point['reused_tasks'])}")
+        assert resume_point["next_nodes"] == ["network_generation"]
+        assert list(resume_point["reused_tasks"]) == ["initial_reactions"]
+
+        resume_config = await checkpointer.update_resume_point(
+            resume_point, {"deadline": new_test_deadline(initial_state["simulation_params"])}
+        )
+        final_state, resumed_nodes = await run_nodes(checkpointer, test_id, None, resume_config)
+        print(f"Resumed run executed: {sorted(resumed_nodes)}")
+        assert "network_generation" in resumed_nodes
+        assert "initial_reactions" not in resumed_nodes, "initial reactions were paid for again"
+        assert final_state["status"] == "completed", final_state["status"]
+        assert len(final_state["initial_reactions"]) == len(first_state["initial_reactions"])
+
+        assert await checkpointer.find_resume_point(test_id) is None
+    finally:
+        del network_generation_node.create_personas_summary
+        await checkpointer.close()
+
+    print("\n✓ Resume reran only network generation")
+
+
+async def main():
+    """Main entry point."""
+    platform = sys.argv[1] if len(sys.argv) > 1 else "tiktok"
+    await run_test(platform)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Test per-call timeouts against a slow backend, offline.
+
+Runs a text test against the fake Gemini backend with a short GEMINI_TIMEOUT
+and makes the interaction simulation (which allows a long output) slower than
+it. The interaction call must get time to finish, while an ordinary call that
+is just as slow still times out.
+
+Usage:
+    python test_timeouts.py [platform]
+
+Example:
+    python test_timeouts.py tiktok
+"""
+
+import os
+import sys
+import asyncio
+import time
+from pathlib import Path
+
+# Force the offline backend; no real credentials are needed
+os.environ["GEMINI_BACKEND"] = "fake"
+os.environ["GEMINI_CACHE_ENABLED"] = "false"
+os.environ["ANALYSIS_EXPORT_ENABLED"] = "false"
+for key in ("GEMINI_API_KEY", "R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY",
+            "R2_BUCKET_NAME", "R2_PUBLIC_URL"):
+    os.environ.setdefault(key, "offline")
+os.environ.setdefault("FAKE_GEMINI_LATENCY_MEDIAN", "0.01")
+
+# One second per ordinary call; 16384 output tokens at 8192 tokens/s get two
+os.environ["GEMINI_TIMEOUT"] = "1"
+os.environ["GEMINI_MIN_OUTPUT_RATE"] = "8192"
+os.environ["GEMINI_MAX_RETRIES"] = "1"
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.graph.graph import video_test_graph
+from app.graph.nodes.interaction.node import interaction_node
+from app.graph.state import VideoTestState
+from app.services.gemini_backends import BackendResponse, GeminiBackend
+from app.services.gemini_client import gemini_client
+
+SLOW_CALL_SECONDS = 1.5
+
+SAMPLE_TEXT = (
+    "Excited to share that our team just shipped the feature we've been "
+    "building for six months. Huge thanks to everyone who helped along the way!"
+)
+
+
+class SlowBackend(GeminiBackend):
+    """Backend that delays the calls allowing long outputs, or every call."""
+
+    name = "slow"
+
+    def __init__(self, inner: GeminiBackend):
+        self.inner = inner
+        self.uses_media = inner.uses_media
+        self.slow_everything = False
+        self.slow_calls = 0
+
+    def generate(self, model_name, contents, config_params: dict) -> BackendResponse:
+        if self.slow_everything or config_params.get("max_output_tokens"):
+            self.slow_calls += 1
+            time.sleep(SLOW_CALL_SECONDS)
+        return self.inner.generate(model_name, contents, config_params)
+
+    def upload_file(self, file_path: str):
+        return self.inner.upload_file(file_path)
+
+    def get_file(self, file_name: str):
+        return self.inner.get_file(file_name)
+
+    def close(self):
+        self.inner.close()
+
+
+async def run_test(platform: str = "tiktok"):
+    """Run a test whose interaction call outlasts GEMINI_TIMEOUT.
+
+    Args:
+        platform: Platform to test (default: tiktok)
+    """
+    print("\n" + "=" * 70)
+    print("PER-CALL TIMEOUT TEST (slow interaction simulation)")
+    print("=" * 70)
+
+    backend = SlowBackend(gemini_client.backend)
+    gemini_client.backend = backend
+
+    initial_state: VideoTestState = {
+        "video_id": f"timeouts_{int(time.time())}",
+        "video_url": "",
+        "platform": platform,
+        "content_type": "text",
+        "text_content": SAMPLE_TEXT,
+        "simulation_params": {"seed": 0},
+        "user_context": None,
+        "platform_metrics": None,
+        "video_analysis": None,
+        "text_analysis": None,
+        "personas": None,
+        "initial_reactions": None,
+        "persona_network": None,
+        "interaction_results": None,
+        "interaction_events": None,
+        "second_reactions": None,
+        "final_metrics": None,
+        "node_graph_data": None,
+        "engagement_timeline": None,
+        "reaction_insights": None,
+        "platform_predictions": None,
+        "errors": [],
+        "status": "initializing",
+    }
+
+    try:
+        final_state = await video_test_graph.ainvoke(initial_state)
+        print(f"Slow calls: {backend.slow_calls}, errors: {final_state['errors']}")
+        assert backend.slow_calls >= 1, "the interaction call was not slowed down"
+        assert final_state["status"] == "completed", final_state["status"]
+        assert final_state["interaction_results"] != interaction_node.create_fallback_interactions(), (
+            "the interaction call was cut off at GEMINI_TIMEOUT"
+        )
+
+        # An ordinary call gets no more than GEMINI_TIMEOUT
+        backend.slow_everything = True
+        try:
+            await gemini_client.generate_async("Say hello.", json_mode=False, use_cache=False)
+        except TimeoutError as e:
+            print(f"Ordinary slow call timed out: {e}")
+        else:
+            raise AssertionError("an ordinary call outlasted GEMINI_TIMEOUT")
+    finally:
+        gemini_client.backend = backend.inner
+
+    print("\n✓ Long-output calls get time to finish; ordinary calls still time out")
+
+
+async def main():
+    """Main entry point."""
+    platform = sys.argv[1] if len(sys.argv) > 1 else "tiktok"
+    await run_test(platform)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())